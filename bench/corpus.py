@@ -0,0 +1,81 @@
+"""
+Offline HTML corpus for the benchmarks.
+
+Captured-style pages live in bench/fixtures/*.html. Synthetic pages are
+generated deterministically at several sizes, with the same structures the
+extractors look for (JSON-LD, meta tags, <dl> facts, employee and update
+sections) buried in realistic amounts of unrelated markup and inline script.
+"""
+import random
+from pathlib import Path
+from typing import Dict
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+# name -> (filler blocks, employees, updates, inline script KB)
+SYNTHETIC_SIZES = {
+    "synthetic-small": (20, 4, 3, 8),
+    "synthetic-medium": (400, 25, 10, 120),
+    "synthetic-large": (3000, 100, 40, 800),
+}
+
+WORDS = (
+    "data platform scraping automation cloud team product launch customers "
+    "engineering growth research market insight open programmable web"
+).split()
+
+def _sentence(rnd: random.Random, n: int) -> str:
+    return " ".join(rnd.choice(WORDS) for _ in range(n)).capitalize() + "."
+
+def synthetic_page(filler: int, employees: int, updates: int, script_kb: int, seed: int = 0) -> str:
+    rnd = random.Random(seed)
+    parts = [
+        "<!DOCTYPE html><html><head><meta charset='utf-8'>",
+        "<title>Synthetic Corp | LinkedIn</title>",
+        '<meta property="og:title" content="Synthetic Corp">',
+        '<meta property="og:description" content="%s">' % _sentence(rnd, 10),
+        '<meta property="og:image" content="https://media.example.com/cover.jpg">',
+        '<meta name="followersCount" content="%d followers">' % rnd.randint(100, 10**6),
+        '<script type="application/ld+json">{"@type": "Organization", "name": "Synthetic Corp", '
+        '"description": "%s", "url": "https://example.com"}</script>' % _sentence(rnd, 20),
+        "<script>window.__state__ = '%s';</script>" % ("x" * (script_kb * 1024)),
+        "<style>%s</style>" % (".c{color:red}" * 200),
+        "</head><body>",
+        "<section><h2>About us</h2><p>%s</p></section>" % _sentence(rnd, 30),
+        "<dl><dt>Website</dt><dd><a href='https://example.com'>example.com</a></dd>"
+        "<dt>Industry</dt><dd>Software Development</dd>"
+        "<dt>Company size</dt><dd>201-500 employees</dd>"
+        "<dt>Headquarters</dt><dd>Berlin, Germany</dd>"
+        "<dt>Type</dt><dd>Privately Held</dd><dt>Founded</dt><dd>2012</dd></dl>",
+        "<address>Street %d, Berlin <a href='https://maps.example.com/?q=%d'>Get directions</a></address>"
+        % (rnd.randint(1, 99), rnd.randint(1, 999)),
+    ]
+    for i in range(filler):
+        parts.append(
+            "<div class='feed-shared'><div><span>%s</span><a href='/feed/%d'>link</a></div>"
+            "<ul><li>%s</li><li>%s</li></ul><svg><path d='M0 0L%d %d'/></svg></div>"
+            % (_sentence(rnd, 12), i, _sentence(rnd, 5), _sentence(rnd, 5), i, i)
+        )
+        if i == filler // 2:
+            parts.append("<section><h3>People at Synthetic Corp</h3>")
+            for e in range(employees):
+                parts.append(
+                    "<div><a href='/in/person-%d'>Person %d</a><span>%s</span></div>"
+                    % (e, e, _sentence(rnd, 4))
+                )
+            parts.append("</section>")
+    for u in range(updates):
+        parts.append(
+            "<article data-urn='urn:li:activity:%d'><p>%s</p><span>%dw</span><span>%d likes</span></article>"
+            % (u, _sentence(rnd, 15), rnd.randint(1, 52), rnd.randint(0, 5000))
+        )
+    parts.append("</body></html>")
+    return "".join(parts)
+
+def load_corpus() -> Dict[str, str]:
+    corpus: Dict[str, str] = {}
+    for path in sorted(FIXTURES_DIR.glob("*.html")):
+        corpus[f"fixture-{path.stem}"] = path.read_text(encoding="utf-8")
+    for name, (filler, employees, updates, script_kb) in SYNTHETIC_SIZES.items():
+        corpus[name] = synthetic_page(filler, employees, updates, script_kb)
+    return corpus
@@ -0,0 +1,145 @@
+"""
+Offline throughput benchmarks for the parser and cleaner hot paths.
+
+Usage (from the repository root):
+
+    python bench/run_bench.py                          # run and print results
+    python bench/run_bench.py --save results.json      # also save them
+    python bench/run_bench.py --baseline results.json  # compare, exit 1 on regression
+
+Fetching is mocked, so nothing touches the network. For every stage and
+corpus page it reports pages/sec, p50/p99 latency and peak memory as seen
+by tracemalloc (Python allocations only; libxml2's C heap is not included).
+"""
+import argparse
+import gc
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parents[0] / "src"))
+sys.path.insert(0, str(BENCH_DIR))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from corpus import load_corpus  # noqa: E402
+from extractors.employee_extractor import EmployeeExtractor  # noqa: E402
+from extractors.linkedin_parser import LinkedinCompanyParser  # noqa: E402
+from utils.data_cleaner import normalize_company_data  # noqa: E402
+from utils.serialization import get_codec  # noqa: E402
+
+SOURCE_URL = "https://www.linkedin.com/company/benchmark/"
+
+def make_parser(backend: str, html: str) -> LinkedinCompanyParser:
+    parser = LinkedinCompanyParser(settings={"parser": {"backend": backend}})
+    # Mock the network: every fetch returns the corpus page
+    parser._fetch_html = lambda url: html
+    return parser
+
+def build_stages(html: str) -> Dict[str, Callable[[], Any]]:
+    bs4_parser = make_parser("bs4", html)
+    lxml_parser = make_parser("lxml", html)
+    soup = BeautifulSoup(html, "lxml")
+    raw = bs4_parser.parse_company_profile(SOURCE_URL)
+    record = normalize_company_data(raw)
+    stdlib_codec, fast_codec = get_codec("json"), get_codec("auto")
+    return {
+        "parse_company_profile[bs4]": lambda: bs4_parser.parse_company_profile(SOURCE_URL),
+        "parse_company_profile[lxml]": lambda: lxml_parser.parse_company_profile(SOURCE_URL),
+        "extract_employees_from_soup": lambda: EmployeeExtractor.extract_employees_from_soup(soup),
+        "normalize_company_data": lambda: normalize_company_data(raw),
+        "encode_record[json]": lambda: stdlib_codec.pretty(record.to_dict()),
+        "encode_record[auto]": lambda: fast_codec.pretty(record.to_dict()),
+    }
+
+def measure(fn: Callable[[], Any], min_time: float, min_rounds: int) -> Dict[str, float]:
+    fn()  # warm-up
+    latencies: List[float] = []
+    started = time.perf_counter()
+    while len(latencies) < min_rounds or time.perf_counter() - started < min_time:
+        t0 = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - t0)
+    total = sum(latencies)
+
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "rounds": len(latencies),
+        "pages_per_sec": len(latencies) / total if total else 0.0,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        "peak_mem_kb": peak / 1024,
+    }
+
+def run(min_time: float, min_rounds: int, only: Optional[str]) -> Dict[str, Dict[str, float]]:
+    results: Dict[str, Dict[str, float]] = {}
+    for page_name, html in load_corpus().items():
+        for stage_name, fn in build_stages(html).items():
+            key = f"{stage_name}/{page_name}"
+            if only and only not in key:
+                continue
+            results[key] = measure(fn, min_time, min_rounds)
+            results[key]["page_kb"] = len(html.encode("utf-8")) / 1024
+            print_row(key, results[key])
+    return results
+
+def print_row(key: str, r: Dict[str, float], note: str = "") -> None:
+    print(
+        f"{key:<62} {r['pages_per_sec']:>10.1f}/s  p50 {r['p50_ms']:>8.2f}ms  "
+        f"p99 {r['p99_ms']:>8.2f}ms  peak {r['peak_mem_kb']:>9.0f}KB {note}"
+    )
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            tolerance: float) -> List[str]:
+    """Return the benchmarks whose p50 latency regressed by more than `tolerance`."""
+    regressions: List[str] = []
+    print("\nComparison against baseline (p50 latency):")
+    for key, r in results.items():
+        base = baseline.get(key)
+        if not base or not base.get("p50_ms"):
+            continue
+        change = r["p50_ms"] / base["p50_ms"] - 1
+        flag = "REGRESSION" if change > tolerance else ""
+        print(f"{key:<62} {base['p50_ms']:>8.2f}ms -> {r['p50_ms']:>8.2f}ms ({change:+.1%}) {flag}")
+        if flag:
+            regressions.append(key)
+    return regressions
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline parser/cleaner benchmarks.")
+    parser.add_argument("--min-time", type=float, default=1.0, help="Seconds to run each benchmark.")
+    parser.add_argument("--min-rounds", type=int, default=5, help="Minimum calls per benchmark.")
+    parser.add_argument("--only", default=None, help="Only run benchmarks whose name contains this.")
+    parser.add_argument("--save", default=None, help="Write results as JSON to this path.")
+    parser.add_argument("--baseline", default=None, help="Compare against a saved results file.")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed p50 slowdown against the baseline (0.2 = 20%%).")
+    args = parser.parse_args(argv)
+
+    results = run(args.min_time, args.min_rounds, args.only)
+
+    if args.save:
+        Path(args.save).write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"\nSaved results to {args.save}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) regressed beyond {args.tolerance:.0%}.")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
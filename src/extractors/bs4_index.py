@@ -0,0 +1,32 @@
+from typing import Iterable, Optional
+
+from bs4 import BeautifulSoup, Tag
+
+from extractors.dom_index import BaseDomIndex
+
+class DomIndex(BaseDomIndex):
+    """DomIndex over a BeautifulSoup tree."""
+
+    def __init__(self, soup: BeautifulSoup) -> None:
+        super().__init__(soup)
+
+    def _child_elements(self, node: Tag) -> Iterable[Tag]:
+        return (child for child in node.contents if isinstance(child, Tag))
+
+    def name(self, el: Tag) -> str:
+        return el.name
+
+    def attr(self, el: Tag, key: str, default: Optional[str] = None) -> Optional[str]:
+        return el.get(key, default)
+
+    def has_attr(self, el: Tag, key: str) -> bool:
+        return el.has_attr(key)
+
+    def string(self, el: Tag) -> Optional[str]:
+        return el.string
+
+    def text(self, el: Tag, separator: str = " ") -> str:
+        return el.get_text(separator, strip=True)
+
+    def parent(self, el: Tag) -> Optional[Tag]:
+        return el.parent
@@ -0,0 +1,152 @@
+from bisect import bisect_left, bisect_right
+from heapq import merge
+from operator import itemgetter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+HEADING_TAGS = frozenset({"h2", "h3", "h4"})
+
+class BaseDomIndex:
+    """
+    Single-pass index over a parsed document.
+
+    The tree is walked once, in document order, and every element is bucketed
+    by tag name together with its pre-order position and subtree span. Field
+    extractors then query these buckets instead of running their own
+    `find_all` over the whole tree:
+
+    - `all("a", "span")` is equivalent to `soup.find_all(["a", "span"])`
+    - `within(el, "a")` is equivalent to `el.find_all("a")`, answered by a
+      bisect over positions rather than a subtree walk
+    - `meta_by_property` / `meta_by_name` hold the first matching <meta> tag
+    - `first_heading(el)` is equivalent to
+      `el.find(["h2", "h3", "h4"], string=True)`
+    - `cached_text(el)` is `text(el)` computed once per element
+
+    Extractors only touch elements through the index (`attr`, `text`,
+    `string`, ...), so the same rules run on any tree backend.
+    Subclasses adapt a concrete tree by implementing the node accessors:
+    `extractors.bs4_index.DomIndex` and `extractors.lxml_index.LxmlDomIndex`,
+    each in its own module so only the backend in use is imported.
+    """
+
+    def __init__(self, root: Any) -> None:
+        self.root = root
+        self.meta_by_property: Dict[str, Any] = {}
+        self.meta_by_name: Dict[str, Any] = {}
+        self._tags: Dict[str, List[Any]] = {}
+        self._positions: Dict[str, List[int]] = {}
+        self._spans: Dict[int, Tuple[int, int]] = {}
+        self._first_heading: Dict[int, Any] = {}
+        self._text_cache: Dict[int, str] = {}
+        self._build()
+
+    # -------------------- Backend hooks --------------------
+
+    def _child_elements(self, node: Any) -> Iterable[Any]:
+        raise NotImplementedError
+
+    def name(self, el: Any) -> str:
+        raise NotImplementedError
+
+    def attr(self, el: Any, key: str, default: Optional[str] = None) -> Optional[str]:
+        raise NotImplementedError
+
+    def has_attr(self, el: Any, key: str) -> bool:
+        raise NotImplementedError
+
+    def string(self, el: Any) -> Optional[str]:
+        """Equivalent to bs4's `Tag.string`."""
+        raise NotImplementedError
+
+    def text(self, el: Any, separator: str = " ") -> str:
+        """Equivalent to bs4's `Tag.get_text(separator, strip=True)`."""
+        raise NotImplementedError
+
+    def parent(self, el: Any) -> Optional[Any]:
+        raise NotImplementedError
+
+    def children(self, el: Any, *names: str) -> List[Any]:
+        """Direct child elements with any of `names`, in document order."""
+        return [child for child in self._child_elements(el) if self.name(child) in names]
+
+    # -------------------- Index --------------------
+
+    def _build(self) -> None:
+        # Iterative pre-order walk; the explicit stacks give every element's
+        # ancestors and subtree end without recursion or repeated traversal.
+        position = 0
+        ancestors: List[Any] = [self.root]
+        iterators = [iter(self._child_elements(self.root))]
+        starts = [-1]
+
+        while iterators:
+            child = next(iterators[-1], None)
+            if child is None:
+                iterators.pop()
+                node = ancestors.pop()
+                self._spans[id(node)] = (starts.pop(), position)
+                continue
+
+            name = self.name(child)
+            self._tags.setdefault(name, []).append(child)
+            self._positions.setdefault(name, []).append(position)
+
+            if name == "meta":
+                prop = self.attr(child, "property")
+                if isinstance(prop, str):
+                    self.meta_by_property.setdefault(prop, child)
+                meta_name = self.attr(child, "name")
+                if isinstance(meta_name, str):
+                    self.meta_by_name.setdefault(meta_name, child)
+            elif name in HEADING_TAGS and self.string(child) is not None:
+                # The first heading seen under an ancestor is its first in
+                # document order; once an ancestor has one, so do all above it.
+                for ancestor in reversed(ancestors):
+                    key = id(ancestor)
+                    if key in self._first_heading:
+                        break
+                    self._first_heading[key] = child
+
+            ancestors.append(child)
+            iterators.append(iter(self._child_elements(child)))
+            starts.append(position)
+            position += 1
+
+    def _slice(self, name: str, start: int, end: int) -> Tuple[List[int], List[Any]]:
+        positions = self._positions.get(name)
+        if not positions:
+            return [], []
+        lo = bisect_right(positions, start)
+        hi = bisect_left(positions, end)
+        return positions[lo:hi], self._tags[name][lo:hi]
+
+    def within(self, el: Any, *names: str) -> List[Any]:
+        """Descendants of `el` with any of `names`, in document order."""
+        start, end = self._spans[id(el)]
+        if len(names) == 1:
+            return self._slice(names[0], start, end)[1]
+        slices = [zip(*self._slice(name, start, end)) for name in names]
+        return [el for _, el in merge(*slices, key=itemgetter(0))]
+
+    def all(self, *names: str) -> List[Any]:
+        """All elements with any of `names`, in document order."""
+        return self.within(self.root, *names)
+
+    def first(self, *names: str) -> Optional[Any]:
+        found = self.all(*names)
+        return found[0] if found else None
+
+    def first_heading(self, el: Any) -> Optional[Any]:
+        return self._first_heading.get(id(el))
+
+    def span(self, el: Any) -> Tuple[int, int]:
+        """Pre-order (start, end) of `el`; descendants start inside this range."""
+        return self._spans[id(el)]
+
+    def cached_text(self, el: Any) -> str:
+        # The tree is never modified after indexing, so a node's text is fixed
+        key = id(el)
+        text = self._text_cache.get(key)
+        if text is None:
+            text = self._text_cache[key] = self.text(el)
+        return text
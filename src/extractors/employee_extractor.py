@@ -1,7 +1,18 @@
-thonfrom typing import Dict, List
+thonfrom typing import TYPE_CHECKING, Any, Iterator, List, Optional
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
+from extractors.dom_index import BaseDomIndex
+from utils.metrics import METRICS
+from utils.records import Employee
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+
+DEFAULT_MAX_EMPLOYEES = 4
+# Parent and grandparent, as the position heuristic has always looked
+DEFAULT_POSITION_DEPTH = 2
+
+SECTION_KEYWORDS = ("employees", "people", "team")
 
 class EmployeeExtractor:
     """
@@ -11,79 +22,119 @@ class EmployeeExtractor:
     generic HTML heuristics:
     - Look for links to /in/<profile> under sections related to employees/people.
     - Infer the employee's position from nearby text.
+
+    Section headings come from the DOM index (found in its single build
+    pass) and element text is memoized on the index, so nested containers
+    sharing a heading or a sibling are never re-read. A candidate section
+    nested inside one already scanned is skipped, and work stops as soon as
+    `max_employees` have been found.
     """
 
     @staticmethod
     def extract_employees_from_soup(
-        soup: BeautifulSoup,
+        soup: "BeautifulSoup",
         base_url: str = "https://www.linkedin.com",
-        max_employees: int = 4,
-    ) -> List[Dict[str, str]]:
-        employees: List[Dict[str, str]] = []
-
-        # Narrow down to containers mentioning "Employees" or "People"
-        candidate_sections = []
-        for section in soup.find_all(["section", "div"]):
-            heading = section.find(["h2", "h3", "h4"], string=True)
-            if not heading:
-                continue
-            heading_txt = heading.get_text(" ", strip=True).lower()
-            if any(keyword in heading_txt for keyword in ("employees", "people", "team")):
-                candidate_sections.append(section)
+        max_employees: int = DEFAULT_MAX_EMPLOYEES,
+        position_depth: int = DEFAULT_POSITION_DEPTH,
+    ) -> List[Employee]:
+        from extractors.bs4_index import DomIndex
+
+        return EmployeeExtractor.extract_employees(
+            DomIndex(soup), base_url=base_url, max_employees=max_employees, position_depth=position_depth
+        )
 
-        # If none were found, fall back to the whole soup
-        if not candidate_sections:
-            candidate_sections = [soup]
+    @staticmethod
+    @METRICS.timed("parser_extract_seconds", extractor="employees")
+    def extract_employees(
+        index: BaseDomIndex,
+        base_url: str = "https://www.linkedin.com",
+        max_employees: int = DEFAULT_MAX_EMPLOYEES,
+        position_depth: int = DEFAULT_POSITION_DEPTH,
+    ) -> List[Employee]:
+        employees: List[Employee] = []
+        if max_employees <= 0:
+            return employees
 
         seen_urls = set()
+        found_section = False
+        # Containers mentioning "Employees" or "People", or the whole document if none do
+        for container in EmployeeExtractor._iter_candidate_sections(index):
+            found_section = True
+            if EmployeeExtractor._collect(index, container, base_url, max_employees, position_depth,
+                                          employees, seen_urls):
+                return employees
+        if not found_section:
+            EmployeeExtractor._collect(index, index.root, base_url, max_employees, position_depth,
+                                       employees, seen_urls)
+        return employees
 
-        for container in candidate_sections:
-            for a in container.find_all("a", href=True):
-                href = a["href"]
-                if "/in/" not in href:
-                    continue
+    @staticmethod
+    def _iter_candidate_sections(index: BaseDomIndex) -> Iterator[Any]:
+        """Outermost <section>/<div> elements whose first heading names a people section."""
+        covered_until = -1
+        for section in index.all("section", "div"):
+            start, end = index.span(section)
+            if start < covered_until:
+                # Nested in a candidate already yielded; its links were all seen there
+                continue
+            heading = index.first_heading(section)
+            if heading is None:
+                continue
+            heading_txt = index.cached_text(heading).lower()
+            if any(keyword in heading_txt for keyword in SECTION_KEYWORDS):
+                covered_until = end
+                yield section
 
-                full_url = urljoin(base_url, href)
-                if full_url in seen_urls:
-                    continue
+    @staticmethod
+    def _collect(
+        index: BaseDomIndex,
+        container: Any,
+        base_url: str,
+        max_employees: int,
+        position_depth: int,
+        employees: List[Employee],
+        seen_urls: set,
+    ) -> bool:
+        """Append employees linked from `container`; True once `max_employees` is reached."""
+        for a in index.within(container, "a"):
+            href = index.attr(a, "href")
+            if href is None:
+                continue
+            if "/in/" not in href:
+                continue
 
-                name = a.get_text(" ", strip=True)
-                if not name:
-                    continue
+            full_url = urljoin(base_url, href)
+            if full_url in seen_urls:
+                continue
 
-                # Position / role often around the link in parent or sibling nodes
-                position = EmployeeExtractor._infer_position(a)
+            name = index.cached_text(a)
+            if not name:
+                continue
 
-                employees.append(
-                    {
-                        "employee_name": name,
-                        "employee_position": position or "",
-                        "employee_profile_url": full_url,
-                    }
-                )
-                seen_urls.add(full_url)
+            # Position / role often around the link in parent or sibling nodes
+            position = EmployeeExtractor._infer_position(index, a, position_depth)
 
-                if len(employees) >= max_employees:
-                    return employees
+            employees.append(Employee(name, position or "", full_url))
+            seen_urls.add(full_url)
 
-        return employees
+            if len(employees) >= max_employees:
+                return True
+        return False
 
     @staticmethod
-    def _infer_position(link_tag) -> str:
-        # Look at sibling spans or divs for position text
-        for sibling in link_tag.parent.find_all(["span", "div"], recursive=False):
-            if sibling is link_tag:
-                continue
-            txt = sibling.get_text(" ", strip=True)
-            if txt and 5 < len(txt) < 120:
-                return txt
-
-        # If not found, look slightly higher up
-        parent = link_tag.parent
-        if parent and parent.parent:
-            for el in parent.parent.find_all(["span", "div"], recursive=False):
-                txt = el.get_text(" ", strip=True)
+    def _infer_position(index: BaseDomIndex, link_tag: Any, depth: int = DEFAULT_POSITION_DEPTH) -> str:
+        # Look at span/div children of the link's parent (its siblings), then of
+        # each ancestor above it, at most `depth` levels up
+        node: Optional[Any] = index.parent(link_tag)
+        for _ in range(depth):
+            if node is None:
+                break
+            for el in index.children(node, "span", "div"):
+                if el is link_tag:
+                    continue
+                txt = index.cached_text(el)
                 if txt and 5 < len(txt) < 120:
                     return txt
+            node = index.parent(node)
 
-        return ""
\ No newline at end of file
+        return ""
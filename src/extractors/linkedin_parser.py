@@ -1,15 +1,54 @@
 thonimport json
 import logging
+import threading
 import time
-from typing import Any, Dict, List, Optional
-from urllib.parse import urljoin
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+from extractors.dom_index import BaseDomIndex
+from extractors.employee_extractor import DEFAULT_MAX_EMPLOYEES, DEFAULT_POSITION_DEPTH, EmployeeExtractor
+from extractors.prefilter import strip_unused_markup
+from extractors.rules import load_rules
+from utils.data_cleaner import extract_universal_name_id
+from utils.html_archive import HtmlArchive
+from utils.http_cache import HttpCache, canonical_cache_url
+from utils.metrics import METRICS
+from utils.proxy_pool import ProxyPool, proxy_label
+from utils.records import Employee, Location, Update
+from utils.rate_limiter import RateLimiter
+from utils.transport import Response, ResponseTooLarge, Transport, TransportError, open_transport
 
-import requests
-from bs4 import BeautifulSoup
+logger = logging.getLogger(__name__)
 
-from extractors.employee_extractor import EmployeeExtractor
+PARSER_BACKENDS = ("bs4", "lxml")
 
-logger = logging.getLogger(__name__)
+# Company subpages that can be crawled next to the main page, in merge order
+SUBPAGES = ("about", "people", "posts")
+MAIN_PAGE = "company"
+
+DEFAULT_MAX_UPDATES = 5
+
+# Fetched HTML of one company, keyed by MAIN_PAGE or a subpage name
+CompanyPages = Dict[str, str]
+
+def page_signature(pages: CompanyPages) -> str:
+    """What the change tracker hashes: the main page alone, or every page of a multi-page crawl."""
+    if len(pages) == 1:
+        return next(iter(pages.values()))
+    return "\x00".join(f"{name}\x00{pages[name]}" for name in sorted(pages))
+
+def _index_factory(backend: str) -> Callable[[str], BaseDomIndex]:
+    """HTML -> DomIndex for `backend`, importing only that backend's tree library."""
+    if backend == "lxml":
+        from extractors.lxml_index import LxmlDomIndex
+
+        return LxmlDomIndex
+    from bs4 import BeautifulSoup
+
+    from extractors.bs4_index import DomIndex
+
+    return lambda html: DomIndex(BeautifulSoup(html, "lxml"))
 
 class LinkedinCompanyParser:
     """
@@ -18,6 +57,18 @@ class LinkedinCompanyParser:
     Note: LinkedIn changes its markup frequently. This parser focuses on:
     - JSON-LD data (if present)
     - Common meta tags and visible text blocks
+
+    JSON-LD, meta and <dt>/<dd> label mappings come from a declarative rules
+    file (see extractors/rules.py), so markup changes can often be handled
+    by shipping new rules rather than code.
+
+    With `parser.subpages` set, each company is expanded into its /about/,
+    /people/ and /posts/ pages. They are fetched concurrently with the main
+    page over the shared transport, parsed separately and merged into one
+    raw record: the main page wins for single fields, list fields are
+    combined without duplicates up to their limits. Every fetch of a
+    company fetches all of its pages again, so a retried or re-queued
+    company comes back complete; cached pages cost no request at all.
     """
 
     def __init__(self, settings: Optional[Dict[str, Any]] = None) -> None:
@@ -26,6 +77,43 @@ class LinkedinCompanyParser:
         self.timeout = http_settings.get("timeout_seconds", 15)
         self.max_retries = http_settings.get("max_retries", 2)
         self.sleep_between_retries = http_settings.get("sleep_between_retries_seconds", 2)
+        self.concurrency = max(1, int(http_settings.get("concurrency", 1)))
+        self.rate_limiter = RateLimiter(
+            http_settings.get("rate_limit"), base_delay=self.sleep_between_retries
+        )
+        self.cache = HttpCache.from_settings(http_settings.get("cache"))
+        # Egress proxies are used only when http.proxies lists some
+        self.proxies = ProxyPool.from_settings(http_settings.get("proxies"))
+        # Raw pages are archived only when http.archive.dir is set
+        self.archive = HtmlArchive.from_settings(http_settings.get("archive"))
+        # Last HTTP status seen per URL, for callers that track job state
+        self.last_status: Dict[str, int] = {}
+
+        parser_settings = self.settings.get("parser", {})
+        self.backend = parser_settings.get("backend", "bs4")
+        if self.backend not in PARSER_BACKENDS:
+            logger.warning("Unknown parser backend %r; falling back to bs4.", self.backend)
+            self.backend = "bs4"
+        self._new_index = _index_factory(self.backend)
+        # Strip non-LD scripts, styles and SVG icons before building the tree. By
+        # default only for bs4: libxml2 skips raw text so fast that the extra pass
+        # costs more than the smaller tree saves.
+        prefilter = parser_settings.get("prefilter")
+        self.prefilter = self.backend == "bs4" if prefilter is None else bool(prefilter)
+        # Compiled once per process; raises ValueError/OSError on a bad rules file
+        self.rules = load_rules(parser_settings.get("rules_file"))
+        self.max_employees = int(parser_settings.get("max_employees", DEFAULT_MAX_EMPLOYEES))
+        self.max_updates = int(parser_settings.get("max_updates", DEFAULT_MAX_UPDATES))
+        self.subpages = [name for name in SUBPAGES if name in (parser_settings.get("subpages") or ())]
+        unknown = set(parser_settings.get("subpages") or ()) - set(SUBPAGES)
+        if unknown:
+            raise ValueError(f"Unknown subpages {sorted(unknown)}; expected any of {list(SUBPAGES)}")
+        self._subpage_pool: Optional[ThreadPoolExecutor] = None
+        self._subpage_workers = max(1, int(http_settings.get("subpage_concurrency", len(self.subpages) or 1)))
+        self._lock = threading.Lock()
+        self.employee_position_depth = int(
+            parser_settings.get("employee_position_depth", DEFAULT_POSITION_DEPTH)
+        )
 
         headers = http_settings.get("headers") or {
             "User-Agent": (
@@ -36,74 +124,300 @@ class LinkedinCompanyParser:
             "Accept-Language": "en-US,en;q=0.9",
         }
 
-        self.session = requests.Session()
-        self.session.headers.update(headers)
-
+        # Pooled keep-alive client shared by all fetch threads (see utils/transport.py).
+        # Opened on first use: parser workers and archive replays never fetch.
+        self._headers = headers
+        self._transport: Optional[Transport] = None
+
+    @property
+    def transport(self) -> Transport:
+        if self._transport is None:
+            self.connect()
+        return self._transport
+
+    def connect(self) -> None:
+        """Open the HTTP transport now, so a bad `http.transport` fails before the first fetch."""
+        with self._lock:
+            if self._transport is None:
+                self._transport = open_transport(
+                    self.settings.get("http", {}).get("transport"), self._headers, self.concurrency
+                )
+
+    @METRICS.timed("fetch_seconds")
     def _fetch_html(self, url: str) -> Optional[str]:
-        """Fetch HTML with basic retry logic."""
+        """Fetch HTML with caching, rate limiting, throttle-aware retries and backoff."""
+        cached = self.cache.lookup(url) if self.cache else None
+        if cached and self.cache.is_fresh(cached):
+            logger.debug("Serving %s from cache", url)
+            METRICS.inc("http_cache_total", result="hit")
+            return self._archived(url, cached["html"])
+        conditional_headers = HttpCache.conditional_headers(cached)
+
         for attempt in range(1, self.max_retries + 1):
+            # A retry usually goes out through a different proxy
+            proxy = None
+            if self.proxies:
+                proxy = self.proxies.choose(url)
+                if proxy is None:
+                    # Never fall back to going direct, or through a blocked egress
+                    logger.error("No proxy available for %s; every proxy is quarantined.", url)
+                    return None
+            with METRICS.timer("rate_limit_wait_seconds"):
+                self.rate_limiter.acquire(url, egress=proxy)
             try:
                 logger.debug("Fetching URL (attempt %d/%d): %s", attempt, self.max_retries, url)
-                resp = self.session.get(url, timeout=self.timeout)
+                started = time.perf_counter()
+                resp = self.transport.get(url, timeout=self.timeout, headers=conditional_headers, proxy=proxy)
+                self._record_response_metrics(resp, time.perf_counter() - started)
+                self.last_status[url] = resp.status_code
+                if proxy and self.proxies.is_block_redirect(resp.url):
+                    self.proxies.record_block(proxy, "a login wall redirect")
+                    # Treated like a throttle: the host pauses for this proxy before any retry through it
+                    delay = self.rate_limiter.record_throttle(url, attempt, egress=proxy)
+                    logger.warning(
+                        "Redirected to a login wall via %s: %s; backing off %.1fs",
+                        proxy_label(proxy), url, delay,
+                    )
+                    continue
+                if resp.status_code == 304 and cached:
+                    self.rate_limiter.record_success(url)
+                    if proxy:
+                        self.proxies.record_success(proxy, resp.to_headers_seconds)
+                    self.cache.revalidated(url, cached)
+                    METRICS.inc("http_cache_total", result="revalidated")
+                    return self._archived(url, cached["html"])
+                if self.rate_limiter.is_throttled(resp.status_code):
+                    # The limiter pauses the host (for this proxy only, if any), so the
+                    # next acquire() waits it out
+                    delay = self.rate_limiter.record_throttle(
+                        url, attempt, resp.headers.get("Retry-After"), egress=proxy
+                    )
+                    if proxy:
+                        self.proxies.record_block(proxy, f"HTTP {resp.status_code}")
+                    logger.warning(
+                        "Throttled with HTTP %d by %s; backing off %.1fs",
+                        resp.status_code, url, delay,
+                    )
+                    continue
                 if resp.status_code >= 400:
                     logger.warning(
                         "Received HTTP %d from %s", resp.status_code, url
                     )
+                    if attempt < self.max_retries:
+                        time.sleep(self.rate_limiter.backoff_delay(attempt))
                     continue
-                return resp.text
-            except requests.RequestException as e:
+                self.rate_limiter.record_success(url)
+                if proxy:
+                    self.proxies.record_success(proxy, resp.to_headers_seconds)
+                if self.cache:
+                    self.cache.store(
+                        url,
+                        resp.text,
+                        etag=resp.headers.get("ETag"),
+                        last_modified=resp.headers.get("Last-Modified"),
+                    )
+                return self._archived(url, resp.text)
+            except ResponseTooLarge as e:
+                # The same page will be just as large on a retry
+                METRICS.inc("http_errors_total", error=e.kind)
+                logger.error("Skipping oversized response: %s", e)
+                return None
+            except TransportError as e:
+                METRICS.inc("http_errors_total", error=e.kind)
+                if proxy:
+                    self.proxies.record_failure(proxy)
                 logger.warning("Request error while fetching %s: %s", url, e)
                 if attempt < self.max_retries:
-                    time.sleep(self.sleep_between_retries)
+                    time.sleep(self.rate_limiter.backoff_delay(attempt))
         logger.error("Failed to fetch URL after %d attempts: %s", self.max_retries, url)
         return None
 
+    def _archived(self, url: str, html: str) -> str:
+        # Every page handed to the parser is archived, cached or not, so a replay sees the whole run
+        if self.archive:
+            self.archive.append(url, html)
+        return html
+
+    @staticmethod
+    def _record_response_metrics(resp: Response, total_seconds: float) -> None:
+        # Time to headers covers DNS, connect, TLS and server time.
+        # The remainder of the call is spent reading the body.
+        to_headers = resp.to_headers_seconds
+        METRICS.inc("http_requests_total", status=resp.status_code)
+        METRICS.inc("http_response_bytes_total", resp.body_bytes)
+        METRICS.observe("http_time_to_headers_seconds", to_headers)
+        METRICS.observe("http_body_transfer_seconds", max(0.0, total_seconds - to_headers))
+
+    def pop_last_status(self, url: str) -> Optional[int]:
+        return self.last_status.pop(url, None)
+
+    def close(self) -> None:
+        """Release the HTTP transport and flush cache housekeeping at the end of a run."""
+        if self.cache:
+            self.cache.log_stats()
+            self.cache.evict()
+        if self.archive:
+            self.archive.close()
+        if self.proxies:
+            self.proxies.log_stats()
+        if self._subpage_pool is not None:
+            self._subpage_pool.shutdown()
+        if self._transport is not None:
+            self._transport.close()
+
     def parse_company_profile(self, url: str) -> Optional[Dict[str, Any]]:
-        html = self._fetch_html(url)
-        if not html:
+        pages = self.fetch_pages(url)
+        if not pages:
             return None
+        return self.parse_pages(url, pages)
+
+    # -------------------- Multi-page crawl --------------------
+
+    def subpage_urls(self, url: str) -> Dict[str, str]:
+        """Configured subpages of the company behind `url`, other than `url` itself."""
+        slug = extract_universal_name_id(url)
+        if not self.subpages or not slug:
+            return {}
+        parts = urlsplit(url)
+        base = f"{parts.scheme}://{parts.netloc}/company/{slug}/"
+        main = canonical_cache_url(url)
+        wanted: Dict[str, str] = {}
+        for name in self.subpages:
+            sub_url = base + name + "/"
+            if canonical_cache_url(sub_url) != main:
+                wanted[name] = sub_url
+        return wanted
+
+    def page_of(self, url: str) -> Tuple[str, str]:
+        """
+        (company key, page name) of a fetched URL, to regroup archived subpages.
 
-        soup = BeautifulSoup(html, "lxml")
+        Any known subpage is named, configured or not, so a replay can tell
+        an unwanted subpage from a company page.
+        """
+        slug = extract_universal_name_id(url)
+        name = urlsplit(url).path.rstrip("/").rsplit("/", 1)[-1]
+        if slug and name != slug and name in SUBPAGES:
+            return slug, name
+        return slug or canonical_cache_url(url), MAIN_PAGE
+
+    def fetch_pages(self, url: str) -> Optional[CompanyPages]:
+        """Fetch the company page and, if configured, its subpages concurrently."""
+        subpages = self.subpage_urls(url)
+        futures: Dict[str, "Future[Optional[str]]"] = {}
+        if subpages:
+            with self._lock:
+                if self._subpage_pool is None:
+                    self._subpage_pool = ThreadPoolExecutor(
+                        max_workers=self._subpage_workers, thread_name_prefix="subpage"
+                    )
+            futures = {name: self._subpage_pool.submit(self._fetch_html, sub_url)
+                       for name, sub_url in subpages.items()}
+        html = self._fetch_html(url)
+        pages: CompanyPages = {MAIN_PAGE: html} if html else {}
+        for name, future in futures.items():
+            sub_html = future.result()
+            # Callers only ever pop the status of the company URL itself
+            self.last_status.pop(subpages[name], None)
+            if sub_html:
+                pages[name] = sub_html
+            else:
+                METRICS.inc("subpages_failed_total", page=name)
+        return pages if html else None
+
+    def parse_pages(self, url: str, pages: CompanyPages) -> Dict[str, Any]:
+        """Parse the main page and merge in whatever its subpages add."""
+        company_data = self.parse_html(url, pages[MAIN_PAGE])
+        for name in self.subpages:
+            if name in pages:
+                self._merge_subpage(company_data, self.parse_html(url, pages[name]))
+        return company_data
+
+    @staticmethod
+    def _list_item_key(item: Any) -> Any:
+        # The same person may be listed with a different position on /people/
+        if isinstance(item, Employee) and item.employee_profile_url:
+            return item.employee_profile_url
+        return item if isinstance(item, tuple) else json.dumps(item, sort_keys=True)
+
+    def _merge_subpage(self, company_data: Dict[str, Any], extra: Dict[str, Any]) -> None:
+        limits = {"employees": self.max_employees, "updates": self.max_updates}
+        for key, value in extra.items():
+            current = company_data.get(key)
+            if isinstance(value, list):
+                merged = list(current or [])
+                seen = {self._list_item_key(item) for item in merged}
+                limit = limits.get(key)
+                for item in value:
+                    if limit is not None and len(merged) >= limit:
+                        break
+                    item_key = self._list_item_key(item)
+                    if item_key not in seen:
+                        seen.add(item_key)
+                        merged.append(item)
+                if merged:
+                    company_data[key] = merged
+            elif current in (None, "") and value not in (None, ""):
+                company_data[key] = value
+
+    def _build_index(self, html: str) -> BaseDomIndex:
+        if self.prefilter:
+            with METRICS.timer("parser_prefilter_seconds"):
+                html = strip_unused_markup(html)
+        with METRICS.timer("parser_build_seconds", backend=self.backend):
+            return self._new_index(html)
+
+    def parse_html(self, url: str, html: str) -> Dict[str, Any]:
+        """Run every field extractor over an already-fetched page."""
+        # Walk the tree once; every extractor below reads from this index
+        index = self._build_index(html)
 
         company_data: Dict[str, Any] = {
             "source_url": url,
         }
 
         # JSON-LD (if present)
-        json_ld_data = self._extract_json_ld(soup)
+        json_ld_data = self._extract_json_ld(index)
         if json_ld_data:
             company_data.update(json_ld_data)
 
         # Meta tags and visible sections
-        company_data.update(self._extract_meta_based_fields(soup))
-        company_data.update(self._extract_visible_sections(soup))
+        company_data.update(self._extract_meta_based_fields(index))
+        company_data.update(self._extract_visible_sections(index))
 
         # Employees from page (best-effort)
-        employees = EmployeeExtractor.extract_employees_from_soup(
-            soup, base_url="https://www.linkedin.com", max_employees=4
+        employees = EmployeeExtractor.extract_employees(
+            index,
+            base_url="https://www.linkedin.com",
+            max_employees=self.max_employees,
+            position_depth=self.employee_position_depth,
         )
         if employees:
             company_data["employees"] = employees
 
         # Updates / posts (best-effort scraping)
-        updates = self._extract_updates(soup)
+        updates = self._extract_updates(index)
         if updates:
             company_data["updates"] = updates
 
         # Fallback for company_name if still missing
         if not company_data.get("company_name"):
-            company_data["company_name"] = self._fallback_company_name(soup)
+            company_data["company_name"] = self._fallback_company_name(index)
 
         return company_data
 
     # -------------------- JSON-LD --------------------
 
-    def _extract_json_ld(self, soup: BeautifulSoup) -> Dict[str, Any]:
+    @METRICS.timed("parser_extract_seconds", extractor="json_ld")
+    def _extract_json_ld(self, index: BaseDomIndex) -> Dict[str, Any]:
         data: Dict[str, Any] = {}
-        scripts = soup.find_all("script", type="application/ld+json")
+        scripts = [
+            script for script in index.all("script")
+            if index.attr(script, "type") == "application/ld+json"
+        ]
         for script in scripts:
             try:
-                raw_text = script.string or script.get_text(strip=True)
+                raw_text = index.string(script) or index.text(script, "")
                 if not raw_text:
                     continue
                 parsed = json.loads(raw_text)
@@ -115,56 +429,22 @@ class LinkedinCompanyParser:
                 items = parsed
             else:
                 items = [parsed]
-
-            for item in items:
-                if not isinstance(item, dict):
-                    continue
-                if item.get("@type") in {"Organization", "Corporation"}:
-                    name = item.get("name")
-                    description = item.get("description")
-                    url = item.get("url")
-
-                    if name:
-                        data.setdefault("company_name", name)
-                    if description:
-                        data.setdefault("about", description)
-                    if url:
-                        data.setdefault("website", url)
+            self.rules.apply_json_ld(items, data)
         return data
 
     # -------------------- Meta-based fields --------------------
 
-    def _extract_meta_based_fields(self, soup: BeautifulSoup) -> Dict[str, Any]:
+    @METRICS.timed("parser_extract_seconds", extractor="meta")
+    def _extract_meta_based_fields(self, index: BaseDomIndex) -> Dict[str, Any]:
+        # Title, tagline, cover image, follower count and industry from <meta> tags
         data: Dict[str, Any] = {}
-
-        # Title / tagline from <meta> and <title>
-        og_title = soup.find("meta", property="og:title")
-        if og_title and og_title.get("content"):
-            data["company_name"] = data.get("company_name") or og_title["content"]
-
-        og_desc = soup.find("meta", property="og:description")
-        if og_desc and og_desc.get("content"):
-            data.setdefault("tagline", og_desc["content"])
-
-        cover_img = soup.find("meta", property="og:image")
-        if cover_img and cover_img.get("content"):
-            data["background_cover_image_url"] = cover_img["content"]
-
-        # Follower count is sometimes present in meta tags or visible text
-        follower_meta = soup.find("meta", attrs={"name": "followersCount"})
-        if follower_meta and follower_meta.get("content"):
-            data["follower_count"] = follower_meta["content"]
-
-        # Industry may show up in meta tags
-        industry_meta = soup.find("meta", attrs={"name": "industry"})
-        if industry_meta and industry_meta.get("content"):
-            data["industry"] = industry_meta["content"]
-
+        self.rules.apply_meta(index, data)
         return data
 
     # -------------------- Visible sections --------------------
 
-    def _extract_visible_sections(self, soup: BeautifulSoup) -> Dict[str, Any]:
+    @METRICS.timed("parser_extract_seconds", extractor="visible_sections")
+    def _extract_visible_sections(self, index: BaseDomIndex) -> Dict[str, Any]:
         """
         Best-effort scraping of visible sections like About, Headquarters, etc.
         LinkedIn often uses <dt>/<dd> pairs for company info.
@@ -172,141 +452,123 @@ class LinkedinCompanyParser:
         data: Dict[str, Any] = {}
 
         # About section (look for a section with "About")
-        about_text = self._extract_about_section(soup)
+        about_text = self._extract_about_section(index)
         if about_text:
             data.setdefault("about", about_text)
 
         # Definition lists with labels (e.g., Headquarters, Founded, Company size)
-        for dl in soup.find_all("dl"):
-            terms = dl.find_all("dt")
-            defs = dl.find_all("dd")
-            if len(terms) != len(defs) or not terms:
-                continue
-            for dt, dd in zip(terms, defs):
-                label = (dt.get_text(" ", strip=True) or "").lower()
-                value = dd.get_text(" ", strip=True) or ""
-                if not label or not value:
-                    continue
-
-                if "headquarters" in label:
-                    data["headquarters"] = value
-                elif "founded" in label:
-                    data["founded"] = value
-                elif "company size" in label:
-                    data["company_size"] = value
-                elif "industry" in label and "industry" not in data:
-                    data["industry"] = value
-                elif "website" in label and "website" not in data:
-                    # May contain a link
-                    a = dd.find("a", href=True)
-                    if a:
-                        data["website"] = a["href"]
-                    else:
-                        data["website"] = value
-                elif "type" in label:
-                    data["type"] = value
+        for dl in index.all("dl"):
+            self.rules.apply_definition_list(index, dl, data)
 
         # Locations list - best-effort search for address blocks
-        locations = self._extract_locations(soup)
+        locations = self._extract_locations(index)
         if locations:
             data["locations"] = locations
 
         return data
 
-    def _extract_about_section(self, soup: BeautifulSoup) -> Optional[str]:
+    @METRICS.timed("parser_extract_seconds", extractor="about")
+    def _extract_about_section(self, index: BaseDomIndex) -> Optional[str]:
         # Look for headings containing "About"
-        heading_candidates = soup.find_all(["h2", "h3"], string=True)
+        heading_candidates = [h for h in index.all("h2", "h3") if index.string(h) is not None]
         for heading in heading_candidates:
-            if "about" in heading.get_text(" ", strip=True).lower():
+            if "about" in index.text(heading).lower():
                 # About text is often the next sibling or within a nearby div
-                parent = heading.parent
-                if not parent:
+                parent = index.parent(heading)
+                if parent is None:
                     continue
                 # Look for paragraphs or spans following the heading
                 text_chunks: List[str] = []
-                for p in parent.find_all(["p", "span"], recursive=True):
-                    txt = p.get_text(" ", strip=True)
+                for p in index.within(parent, "p", "span"):
+                    txt = index.text(p)
                     if txt and len(txt) > 30:
                         text_chunks.append(txt)
                 if text_chunks:
                     return " ".join(text_chunks)
         return None
 
-    def _extract_locations(self, soup: BeautifulSoup) -> List[Dict[str, Any]]:
-        locations: List[Dict[str, Any]] = []
+    @METRICS.timed("parser_extract_seconds", extractor="locations")
+    def _extract_locations(self, index: BaseDomIndex) -> List[Location]:
+        locations: List[Location] = []
         # This is intentionally generic: search for elements that look like addresses
-        address_blocks = soup.find_all("address")
+        address_blocks = index.all("address")
         for addr in address_blocks:
-            text = addr.get_text(" ", strip=True)
+            text = index.text(addr)
             if not text:
                 continue
-            loc: Dict[str, Any] = {"address": text}
-            link = addr.find("a", href=True)
-            if link:
-                loc["map_url"] = link["href"]
-            locations.append(loc)
+            link = next((a for a in index.within(addr, "a") if index.has_attr(a, "href")), None)
+            locations.append(Location(text, index.attr(link, "href") if link is not None else None))
 
         # If no <address> tags, heuristically look for elements mentioning "Directions" or "Get directions"
         if not locations:
-            for a in soup.find_all("a", href=True):
-                label = a.get_text(" ", strip=True).lower()
+            for a in index.all("a"):
+                if not index.has_attr(a, "href"):
+                    continue
+                label = index.text(a).lower()
                 if "directions" in label:
-                    loc: Dict[str, Any] = {
-                        "address": a.get("aria-label", a.get_text(" ", strip=True)),
-                        "map_url": a["href"],
-                    }
-                    locations.append(loc)
+                    locations.append(Location(index.attr(a, "aria-label", index.text(a)), index.attr(a, "href")))
 
         return locations
 
     # -------------------- Updates / posts --------------------
 
-    def _extract_updates(self, soup: BeautifulSoup) -> List[Dict[str, Any]]:
+    @METRICS.timed("parser_extract_seconds", extractor="updates")
+    def _extract_updates(self, index: BaseDomIndex) -> List[Update]:
         """
         Try to scrape recent updates/posts.
 
         This is highly heuristic: look for post containers that include text,
         relative timestamps (e.g. '1w', '2mo') and engagement counts.
         """
-        updates: List[Dict[str, Any]] = []
+        updates: List[Update] = []
+        if self.max_updates <= 0:
+            return updates
 
         # Common pattern: <div> or <article> for feed items.
-        candidates = soup.find_all(["article", "div"], attrs={"data-urn": True})
+        candidates = [el for el in index.all("article", "div") if index.has_attr(el, "data-urn")]
         for container in candidates:
-            text_el = container.find(["p", "span"], string=True)
-            if not text_el:
+            text_el = next(
+                (el for el in index.within(container, "p", "span") if index.string(el) is not None),
+                None,
+            )
+            if text_el is None:
                 continue
-            text = text_el.get_text(" ", strip=True)
+            text = index.text(text_el)
             if not text or len(text) < 20:
                 continue
 
-            update: Dict[str, Any] = {"text": text}
+            posted: Optional[str] = None
+            likes: Optional[str] = None
 
             # Find something that looks like a relative timestamp (e.g. '1w', '3mo')
-            time_el = container.find("span", string=True)
-            if time_el:
-                ts = time_el.get_text(" ", strip=True)
+            spans = [span for span in index.within(container, "span") if index.string(span) is not None]
+            time_el = spans[0] if spans else None
+            if time_el is not None:
+                ts = index.text(time_el)
                 if ts and any(ch.isdigit() for ch in ts):
-                    update["articlePostedDate"] = ts
+                    posted = ts
 
             # Simple like count heuristics: numbers followed by 'like' / 'likes'
-            for span in container.find_all("span", string=True):
-                s_txt = span.get_text(" ", strip=True).lower()
+            for span in spans:
+                s_txt = index.text(span).lower()
                 if "like" in s_txt and any(ch.isdigit() for ch in s_txt):
-                    update["totalLikes"] = span.get_text(" ", strip=True)
+                    likes = index.text(span)
                     break
 
-            updates.append(update)
-            if len(updates) >= 5:
+            updates.append(Update(text, posted, likes))
+            if len(updates) >= self.max_updates:
                 break
 
         return updates
 
     # -------------------- Fallbacks --------------------
 
-    def _fallback_company_name(self, soup: BeautifulSoup) -> Optional[str]:
-        if soup.title and soup.title.string:
-            title_text = soup.title.string.strip()
+    @METRICS.timed("parser_extract_seconds", extractor="fallback_name")
+    def _fallback_company_name(self, index: BaseDomIndex) -> Optional[str]:
+        title = index.first("title")
+        title_string = index.string(title) if title is not None else None
+        if title_string:
+            title_text = title_string.strip()
             # LinkedIn titles often end with "| LinkedIn"
             parts = title_text.split("|")
             return parts[0].strip() if parts else title_text
@@ -0,0 +1,96 @@
+from typing import Iterable, List, Optional, Set
+
+import lxml.html
+from lxml import etree
+
+from extractors.dom_index import BaseDomIndex
+
+# Text inside these elements is not "visible" text for bs4's get_text() unless
+# get_text() is called on that element itself.
+RAW_TEXT_TAGS = frozenset({"script", "style", "template"})
+
+class LxmlDomIndex(BaseDomIndex):
+    """
+    DomIndex over a native lxml.html tree.
+
+    Skips BeautifulSoup tree construction entirely. The accessors reproduce
+    bs4's `.string` and `get_text(strip=True)` semantics (comments, script,
+    style and template strings excluded) so the extraction rules return the
+    same values on either backend.
+    """
+
+    def __init__(self, html: str) -> None:
+        try:
+            document = lxml.html.document_fromstring(html)
+        except (etree.ParserError, ValueError):
+            document = lxml.html.document_fromstring("<html></html>")
+        self._template_ids: Set[int] = set()
+        super().__init__(document.getroottree())
+
+    def _child_elements(self, node) -> Iterable[etree._Element]:
+        if isinstance(node, etree._ElementTree):
+            return [node.getroot()]
+        return (child for child in node if isinstance(child.tag, str))
+
+    def _build(self) -> None:
+        super()._build()
+        # Remember which elements live inside <template> so text() can drop them
+        for template in self.all("template"):
+            self._template_ids.add(id(template))
+            self._template_ids.update(id(el) for el in template.iterdescendants())
+
+    def name(self, el: etree._Element) -> str:
+        return el.tag
+
+    def attr(self, el: etree._Element, key: str, default: Optional[str] = None) -> Optional[str]:
+        return el.get(key, default)
+
+    def has_attr(self, el: etree._Element, key: str) -> bool:
+        return key in el.attrib
+
+    def string(self, el: etree._Element) -> Optional[str]:
+        while True:
+            text = el.text
+            if len(el) == 0:
+                return text or None
+            if len(el) > 1 or text or el[0].tail:
+                return None
+            el = el[0]
+            if not isinstance(el.tag, str):
+                # A lone comment is still a string child in bs4
+                return el.text or ""
+
+    def _string_kind(self, owner: etree._Element) -> Optional[str]:
+        if id(owner) in self._template_ids:
+            return "template"
+        if owner.tag in RAW_TEXT_TAGS:
+            return owner.tag
+        return None
+
+    def text(self, el: etree._Element, separator: str = " ") -> str:
+        wanted = el.tag if el.tag in RAW_TEXT_TAGS else None
+        parts: List[str] = []
+
+        def collect(owner: etree._Element, value: Optional[str]) -> None:
+            if value and self._string_kind(owner) == wanted:
+                value = value.strip()
+                if value:
+                    parts.append(value)
+
+        # Iterative walk; a child's tail is visited after the child's subtree
+        stack = [(el, None)]
+        while stack:
+            node, tail_owner = stack.pop()
+            if tail_owner is not None:
+                collect(tail_owner, node.tail)
+                continue
+            if not isinstance(node.tag, str):
+                continue
+            collect(node, node.text)
+            for child in reversed(node):
+                stack.append((child, node))
+                stack.append((child, None))
+        return separator.join(parts)
+
+    def parent(self, el: etree._Element) -> Optional[etree._Element]:
+        return el.getparent()
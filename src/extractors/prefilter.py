@@ -0,0 +1,69 @@
+import re
+from typing import Dict, List
+
+RAW_TAGS = ("title", "textarea", "script", "style", "svg")
+
+def _any_case(word: str) -> str:
+    # Explicit [sS][cC]... classes keep sre on its literal-prefix fast path,
+    # which re.IGNORECASE gives up
+    return "".join(f"[{c.lower()}{c.upper()}]" for c in word)
+
+# Start of every construct the pre-pass has to look at. Comments and the
+# raw-text title/textarea elements are skipped whole, so markup that merely
+# mentions "<script" or "<svg" inside them is left alone.
+_OPEN_RE = re.compile(r"<(?:(!--)|(%s)\b([^>]*)>)" % "|".join(_any_case(tag) for tag in RAW_TAGS))
+_CLOSE_RE: Dict[str, "re.Pattern[str]"] = {
+    tag: re.compile(r"</%s\s*>" % _any_case(tag)) for tag in RAW_TAGS
+}
+_TAG_RE = re.compile(r"<[^>]*>")
+_NESTED_SVG_RE = re.compile(r"<%s\b" % _any_case("svg"))
+
+def strip_unused_markup(html: str) -> str:
+    """
+    Drop markup that no extractor reads before the page is parsed.
+
+    Inline scripts (except application/ld+json), styles and text-free SVG
+    icons are cut out in a single forward scan, which shrinks the tree the
+    parser builds. Their replacements keep the surrounding element structure,
+    so every extractor sees the same strings and text as on the full page.
+    """
+    parts: List[str] = []
+    last = scan = 0
+    while True:
+        m = _OPEN_RE.search(html, scan)
+        if m is None:
+            break
+        if m.group(1):
+            end = html.find("-->", m.end())
+            scan = len(html) if end < 0 else end + 3
+            continue
+        tag = m.group(2).lower()
+        if tag == "svg" and m.group(3).rstrip().endswith("/"):
+            # Self-closing <svg/>: nothing to strip
+            scan = m.end()
+            continue
+        close = _CLOSE_RE[tag].search(html, m.end())
+        if close is None:
+            # Unterminated element: leave the rest of the page to the parser
+            break
+        scan = close.end()
+        if tag in ("title", "textarea"):
+            continue
+        if tag == "svg":
+            body = html[m.end():close.start()]
+            # Icons only: an SVG carrying text or a nested SVG stays in the tree
+            if _NESTED_SVG_RE.search(body) or _TAG_RE.sub("", body).strip():
+                continue
+            replacement = "<svg></svg>"
+        elif tag == "script" and "ld+json" in m.group(3).lower():
+            continue
+        else:
+            # An empty comment keeps the parent's child count, so `.string` checks behave as before
+            replacement = "<!---->"
+        parts.append(html[last:m.start()])
+        parts.append(replacement)
+        last = scan
+    if not parts:
+        return html
+    parts.append(html[last:])
+    return "".join(parts)
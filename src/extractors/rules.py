@@ -0,0 +1,142 @@
+import json
+import logging
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from extractors.dom_index import BaseDomIndex
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RULES_FILE = Path(__file__).resolve().parents[1] / "config" / "extraction_rules.json"
+
+LABEL_VALUE_MODES = ("text", "link_href")
+
+def _import_yaml() -> Any:
+    try:
+        import yaml
+    except ImportError as e:
+        raise RuntimeError("YAML extraction rules require the 'PyYAML' package") from e
+    return yaml
+
+class MetaRule(NamedTuple):
+    field: str
+    attribute: str  # "property" or "name"
+    key: str
+
+class LabelRule(NamedTuple):
+    field: str
+    keep_existing: bool
+    value: str
+
+class ExtractionRules:
+    """
+    Declarative field extraction, compiled once from a JSON or YAML spec.
+
+    The spec has three sections:
+
+    - `json_ld`: schema.org @types to accept and a field -> JSON-LD key map;
+      the first item providing a field wins.
+    - `meta`: ordered <meta> lookups by `property` or `name`; later rules for
+      the same field override earlier ones.
+    - `definition_list`: ordered <dt> label rules. A label matches the first
+      rule with one of its keywords as a case-insensitive substring;
+      `keep_existing` rules are skipped once their field is set, and
+      `value: link_href` takes the first link in the <dd> instead of its text.
+
+    Keywords are lower-cased once at compile time, so matching a <dt> only
+    lower-cases its label and runs plain substring checks in rule order.
+    """
+
+    def __init__(self, spec: Dict[str, Any]) -> None:
+        if not isinstance(spec, dict):
+            raise ValueError("extraction rules must be a mapping")
+
+        json_ld = spec.get("json_ld") or {}
+        self.json_ld_types = frozenset(json_ld.get("types") or ())
+        self.json_ld_fields: List[Tuple[str, str]] = list((json_ld.get("fields") or {}).items())
+
+        self.meta_rules: List[MetaRule] = []
+        for rule in spec.get("meta") or ():
+            if "property" in rule:
+                self.meta_rules.append(MetaRule(rule["field"], "property", rule["property"]))
+            elif "name" in rule:
+                self.meta_rules.append(MetaRule(rule["field"], "name", rule["name"]))
+            else:
+                raise ValueError(f"meta rule for {rule.get('field')!r} needs 'property' or 'name'")
+
+        self.label_rules: List[LabelRule] = []
+        self._label_keywords: List[Tuple[str, ...]] = []
+        for rule in spec.get("definition_list") or ():
+            value = rule.get("value", "text")
+            if value not in LABEL_VALUE_MODES:
+                raise ValueError(f"unknown value mode {value!r} for field {rule.get('field')!r}")
+            self.label_rules.append(LabelRule(rule["field"], bool(rule.get("keep_existing")), value))
+            self._label_keywords.append(tuple(keyword.lower() for keyword in rule.get("keywords") or ()))
+
+    @classmethod
+    def from_file(cls, path: Path) -> "ExtractionRules":
+        with path.open("r", encoding="utf-8") as f:
+            if path.suffix in (".yaml", ".yml"):
+                spec = _import_yaml().safe_load(f)
+            else:
+                spec = json.load(f)
+        return cls(spec)
+
+    def match_label(self, label: str, data: Dict[str, Any]) -> Optional[LabelRule]:
+        """The first rule with a keyword in the lower-cased `label`, if any."""
+        label = label.lower()
+        for rule, keywords in zip(self.label_rules, self._label_keywords):
+            if rule.keep_existing and rule.field in data:
+                continue
+            if any(keyword in label for keyword in keywords):
+                return rule
+        return None
+
+    # -------------------- Rule application --------------------
+
+    def apply_json_ld(self, items: List[Any], data: Dict[str, Any]) -> None:
+        for item in items:
+            if not isinstance(item, dict) or item.get("@type") not in self.json_ld_types:
+                continue
+            for field, key in self.json_ld_fields:
+                value = item.get(key)
+                if value:
+                    data.setdefault(field, value)
+
+    def apply_meta(self, index: BaseDomIndex, data: Dict[str, Any]) -> None:
+        for rule in self.meta_rules:
+            lookup = index.meta_by_property if rule.attribute == "property" else index.meta_by_name
+            meta = lookup.get(rule.key)
+            if meta is None:
+                continue
+            content = index.attr(meta, "content")
+            if content:
+                data[rule.field] = content
+
+    def apply_definition_list(self, index: BaseDomIndex, dl: Any, data: Dict[str, Any]) -> None:
+        terms = index.within(dl, "dt")
+        defs = index.within(dl, "dd")
+        if len(terms) != len(defs) or not terms:
+            return
+        for dt, dd in zip(terms, defs):
+            label = index.text(dt) or ""
+            value = index.text(dd) or ""
+            if not label or not value:
+                continue
+            rule = self.match_label(label, data)
+            if rule is None:
+                continue
+            if rule.value == "link_href":
+                a = next((a for a in index.within(dd, "a") if index.has_attr(a, "href")), None)
+                data[rule.field] = index.attr(a, "href") if a is not None else value
+            else:
+                data[rule.field] = value
+
+@lru_cache(maxsize=None)
+def load_rules(path: Optional[str] = None) -> ExtractionRules:
+    """Load and compile a rules file once per process (default: the bundled rules)."""
+    rules_path = Path(path) if path else DEFAULT_RULES_FILE
+    rules = ExtractionRules.from_file(rules_path)
+    logger.debug("Compiled extraction rules from %s", rules_path.as_posix())
+    return rules
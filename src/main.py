@@ -1,12 +1,26 @@
 thonimport argparse
 import json
 import logging
+import sqlite3
 import sys
+from contextlib import nullcontext
+from itertools import chain
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
-from extractors.linkedin_parser import LinkedinCompanyParser
-from utils.data_cleaner import normalize_company_data
+from utils.change_tracker import EMIT_MODES, ChangeTracker
+from utils.html_archive import INDEX_FILE, iter_archived_companies
+from utils.job_ledger import JobLedger
+from utils.metrics import METRICS
+from utils.output_writer import COMPRESSIONS, OUTPUT_FORMATS, JsonLinesWriter
+from utils.records import CompanyRecord
+from utils.serialization import get_codec
+from utils.sinks import SINKS, SinkError, open_sink
+from utils.url_reader import iter_input_urls, iter_url_batches
+from utils.work_queue import LeasedUrls, default_worker_id, open_work_queue
+
+if TYPE_CHECKING:
+    from extractors.linkedin_parser import CompanyPages
 
 def setup_logging(level: str = "INFO") -> None:
     numeric_level = getattr(logging, level.upper(), logging.INFO)
@@ -40,33 +54,59 @@ def load_settings(settings_path: Path) -> Dict[str, Any]:
         logging.error("Failed to read settings file %s: %s", settings_path, e)
         return {}
 
-def read_input_urls(input_path: Path) -> List[str]:
-    if not input_path.exists():
-        logging.error("Input URL file %s not found.", input_path.as_posix())
-        return []
-
-    urls: List[str] = []
-    with input_path.open("r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line or line.startswith("#"):
-                continue
-            urls.append(line)
-
-    if not urls:
-        logging.warning("No URLs found in %s.", input_path.as_posix())
-    else:
-        logging.info("Loaded %d URL(s) from %s.", len(urls), input_path.as_posix())
-    return urls
+def read_input_urls(
+    input_source: str, input_settings: Dict[str, Any], on_invalid: Optional[Callable[[str], None]] = None
+) -> Optional[Iterator[str]]:
+    """Stream canonical, de-duplicated URLs from a file, or stdin when the source is "-"."""
+    if input_source != "-" and not Path(input_source).exists():
+        logging.error("Input URL file %s not found.", Path(input_source).as_posix())
+        return None
 
-def write_output(output_path: Path, data: List[Dict[str, Any]]) -> None:
-    try:
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        with output_path.open("w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-        logging.info("Wrote scraped data for %d company(ies) to %s.", len(data), output_path.as_posix())
-    except OSError as e:
-        logging.error("Failed to write output file %s: %s", output_path.as_posix(), e)
+    urls = iter_input_urls(
+        input_source,
+        dedup=input_settings.get("dedup", "exact"),
+        csv_column=input_settings.get("csv_column"),
+        bloom_capacity=int(input_settings.get("bloom_capacity", 10_000_000)),
+        bloom_error_rate=float(input_settings.get("bloom_error_rate", 1e-6)),
+        on_invalid=on_invalid,
+    )
+    first = next(urls, None)
+    if first is None:
+        logging.warning("No URLs found in %s.", input_source)
+        return None
+    return chain([first], urls)
+
+def iter_job_urls(urls: Iterable[str], ledger: JobLedger, skip: Set[str]) -> Iterator[str]:
+    """Drop URLs that are already done and register the rest as pending."""
+    for url in urls:
+        if url in skip:
+            continue
+        ledger.add_pending(url)
+        yield url
+
+def iter_job_pages(
+    pages: Iterable[Tuple[str, "CompanyPages"]], ledger: JobLedger, skip: Set[str]
+) -> Iterator[Tuple[str, "CompanyPages"]]:
+    """`iter_job_urls` for archived (url, pages) companies."""
+    for url, company_pages in pages:
+        if url in skip:
+            continue
+        ledger.add_pending(url)
+        yield url, company_pages
+
+def iter_worker_rounds(
+    leased: LeasedUrls,
+    process: Callable[[Iterable[str]], Iterator[Tuple[str, Optional[CompanyRecord]]]],
+    commit: Optional[Callable[[], None]],
+) -> Iterator[Tuple[str, Optional[CompanyRecord]]]:
+    """Run the pipeline over one round of leased URLs at a time until the worker is done."""
+    while True:
+        yield from process(leased)
+        # Acknowledge the whole round before polling, so no lease is held while idle
+        if commit is not None:
+            commit()
+        if not leased.wait_for_work():
+            return
 
 def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(
@@ -75,55 +115,603 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     parser.add_argument(
         "--input-file",
         default="data/input_urls.txt",
-        help="Path to text file containing LinkedIn company URLs (one per line).",
+        help=(
+            "Path to a file of LinkedIn company URLs: one per line or CSV, optionally "
+            "gzip-compressed; use - for stdin."
+        ),
+    )
+    parser.add_argument(
+        "--dedup",
+        choices=("exact", "bloom", "none"),
+        default=None,
+        help="How duplicate companies in the input are dropped (overrides input.dedup).",
     )
     parser.add_argument(
         "--output-file",
         default="data/sample_output.json",
-        help="Path to JSON file where output will be stored.",
+        help="Path to the JSON file (or Parquet/SQLite file for those sinks) where output will be stored.",
+    )
+    parser.add_argument(
+        "--output-format",
+        choices=OUTPUT_FORMATS,
+        default=None,
+        help="Output format: pretty JSON array or JSON Lines (overrides output.format).",
+    )
+    parser.add_argument(
+        "--sink",
+        choices=SINKS,
+        default=None,
+        help="Where records go: the JSON/JSONL file, a Parquet file, or a SQLite/Postgres table "
+             "(overrides output.sink).",
+    )
+    parser.add_argument(
+        "--output-compression",
+        choices=COMPRESSIONS,
+        default=None,
+        help="Compress the output stream (overrides output.compression).",
+    )
+    parser.add_argument(
+        "--ledger-file",
+        default=None,
+        help="SQLite job ledger tracking per-URL status (default: <output-file>.ledger.sqlite).",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip URLs the ledger marks as done and append to the existing output.",
     )
     parser.add_argument(
         "--settings-file",
         default="src/config/settings.example.json",
         help="Path to JSON settings file.",
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        help="Number of URLs to fetch in parallel (overrides http.concurrency).",
+    )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=None,
+        help="Number of parser processes; 0 parses in the fetch threads (overrides parser.workers).",
+    )
+    parser.add_argument(
+        "--emit",
+        choices=EMIT_MODES,
+        default=None,
+        help="Write every record, or only companies that are new or changed since the last run "
+             "(overrides output.emit).",
+    )
+    parser.add_argument(
+        "--changes-file",
+        default=None,
+        help="Write field-level diffs of new and changed companies here as JSON Lines "
+             "(overrides output.changes_file).",
+    )
+    parser.add_argument(
+        "--fingerprint-file",
+        default=None,
+        help="SQLite store of per-company fingerprints used for change detection "
+             "(default: <output-file>.fingerprints.sqlite).",
+    )
+    parser.add_argument(
+        "--archive-dir",
+        default=None,
+        help="Archive every fetched page into this directory for later replay (overrides http.archive.dir).",
+    )
+    parser.add_argument(
+        "--replay",
+        metavar="ARCHIVE",
+        default=None,
+        help="Re-extract records from an HTML archive directory instead of fetching; --input-file is ignored.",
+    )
+    parser.add_argument(
+        "--queue",
+        default=None,
+        help="Shared work queue for distributed runs: a redis:// URL or a SQLite file (overrides queue.url).",
+    )
+    parser.add_argument(
+        "--enqueue",
+        action="store_true",
+        help="Add the input URLs to the work queue and exit.",
+    )
+    parser.add_argument(
+        "--worker",
+        action="store_true",
+        help="Process URLs leased from the work queue instead of reading --input-file.",
+    )
+    parser.add_argument(
+        "--dry-run",
+        "--validate-input",
+        dest="dry_run",
+        action="store_true",
+        help="Read, validate and de-duplicate the input, print the canonical URLs and exit without fetching.",
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Read URL batches from stdin (a blank line ends each) and write their records to stdout "
+             "as JSON Lines, keeping the parser warm until stdin closes.",
+    )
+    parser.add_argument(
+        "--rules-file",
+        default=None,
+        help="JSON or YAML extraction rules to use instead of the bundled ones (overrides parser.rules_file).",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Directory for the on-disk HTTP response cache (overrides http.cache.dir).",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=None,
+        help="Seconds a cached page is served without revalidation (overrides http.cache.ttl_seconds).",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        default=None,
+        help="Write Prometheus text-format metrics here at the end of the run (overrides metrics.prometheus_file).",
+    )
+    parser.add_argument(
+        "--metrics-report",
+        default=None,
+        help="Write a JSON timing report here at the end of the run (overrides metrics.report_file).",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=None,
+        help="Serve live Prometheus metrics on this port while running (overrides metrics.port).",
+    )
     return parser.parse_args(argv)
 
+def apply_cli_overrides(settings: Dict[str, Any], args: argparse.Namespace, project_root: Path) -> None:
+    """Fold command-line flags into the settings dict so components only read settings."""
+    http_settings = settings.setdefault("http", {})
+    if args.concurrency is not None:
+        http_settings["concurrency"] = args.concurrency
+
+    parser_settings = settings.setdefault("parser", {})
+    if args.parse_workers is not None:
+        parser_settings["workers"] = args.parse_workers
+    if args.rules_file is not None:
+        parser_settings["rules_file"] = args.rules_file
+    if parser_settings.get("rules_file"):
+        parser_settings["rules_file"] = (project_root / parser_settings["rules_file"]).resolve().as_posix()
+
+    cache_settings = http_settings.setdefault("cache", {})
+    if args.cache_dir is not None:
+        cache_settings["dir"] = args.cache_dir
+    if args.cache_ttl is not None:
+        cache_settings["ttl_seconds"] = args.cache_ttl
+    if cache_settings.get("dir"):
+        cache_settings["dir"] = (project_root / cache_settings["dir"]).resolve().as_posix()
+
+    archive_settings = http_settings.setdefault("archive", {})
+    if args.archive_dir is not None:
+        archive_settings["dir"] = args.archive_dir
+    if archive_settings.get("dir"):
+        archive_settings["dir"] = (project_root / archive_settings["dir"]).resolve().as_posix()
+
+    input_settings = settings.setdefault("input", {})
+    if args.dedup is not None:
+        input_settings["dedup"] = args.dedup
+
+    output_settings = settings.setdefault("output", {})
+    if args.output_format is not None:
+        output_settings["format"] = args.output_format
+    if args.sink is not None:
+        output_settings["sink"] = args.sink
+    if args.output_compression is not None:
+        output_settings["compression"] = args.output_compression
+    if args.emit is not None:
+        output_settings["emit"] = args.emit
+    if args.changes_file is not None:
+        output_settings["changes_file"] = args.changes_file
+    if args.fingerprint_file is not None:
+        output_settings["fingerprint_file"] = args.fingerprint_file
+    for key in ("changes_file", "fingerprint_file"):
+        if output_settings.get(key):
+            output_settings[key] = (project_root / output_settings[key]).resolve().as_posix()
+
+    queue_settings = settings.setdefault("queue", {})
+    if args.queue is not None:
+        queue_settings["url"] = args.queue
+    queue_url = queue_settings.get("url")
+    if queue_url and "://" not in queue_url:
+        queue_settings["url"] = (project_root / queue_url).resolve().as_posix()
+
+    metrics_settings = settings.setdefault("metrics", {})
+    if args.metrics_file is not None:
+        metrics_settings["prometheus_file"] = args.metrics_file
+    if args.metrics_report is not None:
+        metrics_settings["report_file"] = args.metrics_report
+    if args.metrics_port is not None:
+        metrics_settings["port"] = args.metrics_port
+    for key in ("prometheus_file", "report_file"):
+        if metrics_settings.get(key):
+            metrics_settings[key] = (project_root / metrics_settings[key]).resolve().as_posix()
+
+def export_metrics(metrics_settings: Dict[str, Any]) -> None:
+    """Write the end-of-run metrics files that are configured."""
+    prometheus_file = metrics_settings.get("prometheus_file")
+    report_file = metrics_settings.get("report_file")
+    try:
+        if prometheus_file:
+            METRICS.write_prometheus(Path(prometheus_file))
+            logging.info("Wrote Prometheus metrics to %s.", prometheus_file)
+        if report_file:
+            METRICS.write_report(Path(report_file))
+            logging.info("Wrote timing report to %s.", report_file)
+    except OSError as e:
+        logging.error("Failed to write metrics: %s", e)
+
+def enqueue_urls(input_source: str, settings: Dict[str, Any]) -> None:
+    """Push the input URLs into the shared work queue for `--worker` processes."""
+    urls = read_input_urls(input_source, settings["input"])
+    if urls is None:
+        logging.error("No URLs to enqueue. Exiting.")
+        return
+    try:
+        queue = open_work_queue(settings["queue"])
+    except (ValueError, RuntimeError, sqlite3.Error) as e:
+        logging.error("Invalid queue configuration: %s", e)
+        return
+    try:
+        added = queue.enqueue(urls)
+        counts = queue.counts()
+    finally:
+        queue.close()
+    logging.info(
+        "Enqueued %d new URL(s); queue now has %d pending, %d leased, %d done, %d dead.",
+        added, counts.get("pending", 0), counts.get("leased", 0), counts.get("done", 0), counts.get("dead", 0),
+    )
+
+def validate_input(input_source: str, settings: Dict[str, Any]) -> bool:
+    """
+    Print the URLs a run would process, one per line; nothing is fetched or parsed.
+
+    Every line that is not a LinkedIn company URL is reported. Returns False
+    if there was any such line, or no URL at all.
+    """
+    invalid: List[str] = []
+
+    def report(raw_url: str) -> None:
+        invalid.append(raw_url)
+        logging.error("Not a LinkedIn company URL: %s", raw_url)
+
+    urls = read_input_urls(input_source, settings["input"], on_invalid=report)
+    count = 0
+    for url in urls or ():
+        sys.stdout.write(url + "\n")
+        count += 1
+    sys.stdout.flush()
+    if invalid:
+        logging.error("Input is invalid: %d line(s) are not LinkedIn company URLs.", len(invalid))
+        return False
+    if not count:
+        logging.error("No valid URLs in the input.")
+        return False
+    logging.info("Input is valid: %d URL(s) would be processed.", count)
+    return True
+
+def serve(settings: Dict[str, Any]) -> None:
+    """
+    Process URL batches from stdin with one long-lived parser.
+
+    Each batch is one URL per line, ended by a blank line (or the end of
+    stdin). Its records go to stdout as JSON Lines, followed by a blank line
+    once the whole batch is done; URLs without a record failed, as logged on
+    stderr. The HTTP connections, cache, rate limiter and any parser worker
+    processes stay up between batches, so small batches do not pay start-up
+    costs. No job ledger or change tracking is kept; the caller owns retries.
+    """
+    # Imported here so --dry-run and --enqueue never load the parser and its dependencies
+    from extractors.linkedin_parser import LinkedinCompanyParser
+    from pipeline import iter_pipelined, iter_processed, open_parse_pool
+
+    concurrency = max(1, int(settings["http"].get("concurrency", 1)))
+    parse_workers = max(0, int(settings["parser"].get("workers", 0)))
+    chunk_size = max(1, int(settings["parser"].get("chunk_size", 8)))
+    dedup = settings["input"].get("dedup", "exact") != "none"
+    try:
+        codec = get_codec(settings["output"].get("json_library", "auto"))
+        parser = LinkedinCompanyParser(settings=settings)
+        parser.connect()
+    except (OSError, ValueError, KeyError, RuntimeError) as e:
+        logging.error("Invalid parser configuration: %s", e)
+        return
+
+    metrics_settings = settings["metrics"]
+    metrics_server = None
+    if metrics_settings.get("port"):
+        try:
+            metrics_server = METRICS.serve(int(metrics_settings["port"]))
+        except OSError as e:
+            logging.error("Cannot serve metrics on port %s: %s", metrics_settings["port"], e)
+
+    out = sys.stdout.buffer
+    batches = 0
+    try:
+        with open_parse_pool(parser, parse_workers) if parse_workers > 0 else nullcontext() as parse_pool:
+            logging.info("Serving: reading URL batches from stdin.")
+            for batch in iter_url_batches(sys.stdin, dedup=dedup):
+                if parse_pool is not None:
+                    processed = iter_pipelined(
+                        parser, batch, concurrency=concurrency, parse_workers=parse_workers,
+                        chunk_size=chunk_size, total=len(batch), parse_pool=parse_pool,
+                    )
+                else:
+                    processed = iter_processed(parser, batch, concurrency=concurrency, total=len(batch))
+                written = 0
+                for url, cleaned in processed:
+                    parser.pop_last_status(url)
+                    if not cleaned:
+                        METRICS.inc("urls_failed_total")
+                        continue
+                    with METRICS.timer("write_seconds"):
+                        out.write(codec.line(cleaned.to_dict()) + b"\n")
+                    METRICS.inc("records_written_total")
+                    written += 1
+                out.write(b"\n")
+                out.flush()
+                batches += 1
+                logging.info("Batch %d: %d done, %d failed.", batches, written, len(batch) - written)
+    except BrokenPipeError:
+        logging.error("stdout was closed; stopping.")
+    finally:
+        parser.close()
+        export_metrics(metrics_settings)
+        if metrics_server is not None:
+            metrics_server.shutdown()
+    logging.info("Served %d batch(es).", batches)
+
 def main(argv: Optional[List[str]] = None) -> None:
     args = parse_args(argv)
 
     project_root = Path(__file__).resolve().parents[1]
 
     settings_path = (project_root / args.settings_file).resolve()
-    input_path = (project_root / args.input_file).resolve()
+    if args.input_file == "-":
+        input_source = "-"
+    else:
+        input_source = (project_root / args.input_file).resolve().as_posix()
     output_path = (project_root / args.output_file).resolve()
+    if args.ledger_file:
+        ledger_path = (project_root / args.ledger_file).resolve()
+    else:
+        ledger_path = output_path.with_name(output_path.name + ".ledger.sqlite")
 
     settings = load_settings(settings_path)
     log_level = settings.get("logging", {}).get("level", "INFO")
     setup_logging(log_level)
+    apply_cli_overrides(settings, args, project_root)
 
-    urls = read_input_urls(input_path)
-    if not urls:
-        logging.error("No URLs to process. Exiting.")
+    if args.enqueue:
+        enqueue_urls(input_source, settings)
+        return
+    if args.dry_run:
+        if not validate_input(input_source, settings):
+            sys.exit(1)
+        return
+    if args.worker and (args.replay or args.resume):
+        logging.error("--worker cannot be combined with --replay or --resume.")
+        return
+    if args.serve:
+        if args.worker or args.replay or args.resume:
+            logging.error("--serve cannot be combined with --worker, --replay or --resume.")
+            return
+        serve(settings)
         return
 
-    parser = LinkedinCompanyParser(settings=settings)
-    results: List[Dict[str, Any]] = []
+    # Imported only for a run, which keeps the modes above quick to start
+    from extractors.linkedin_parser import MAIN_PAGE, LinkedinCompanyParser
+    from pipeline import UNCHANGED, iter_pipelined, iter_processed, iter_replayed, open_parse_pool
 
-    for idx, url in enumerate(urls, start=1):
-        logging.info("Processing %d/%d: %s", idx, len(urls), url)
+    queue = None
+    leased: Optional[LeasedUrls] = None
+    replay_dir = (project_root / args.replay).resolve() if args.replay else None
+    if args.worker:
+        queue_settings = settings["queue"]
         try:
-            raw_data = parser.parse_company_profile(url)
-            if not raw_data:
-                logging.warning("No data extracted for URL: %s", url)
-                continue
-            cleaned = normalize_company_data(raw_data)
-            results.append(cleaned)
-        except Exception as e:  # Catch-all to avoid breaking the loop
-            logging.exception("Unexpected error while processing %s: %s", url, e)
-
-    if results:
-        write_output(output_path, results)
+            queue = open_work_queue(queue_settings)
+        except (ValueError, RuntimeError, sqlite3.Error) as e:
+            logging.error("Invalid queue configuration: %s", e)
+            return
+        leased = LeasedUrls(
+            queue,
+            owner=queue_settings.get("worker_id") or default_worker_id(),
+            lease_size=int(queue_settings.get("lease_size", 16)),
+            poll_interval=float(queue_settings.get("poll_interval_seconds", 5)),
+            exit_when_idle=bool(queue_settings.get("exit_when_idle", True)),
+        )
+    elif replay_dir is None:
+        urls = read_input_urls(input_source, settings["input"])
+        if urls is None:
+            logging.error("No URLs to process. Exiting.")
+            return
+    elif not (replay_dir / INDEX_FILE).exists():
+        logging.error("No HTML archive index found in %s.", replay_dir.as_posix())
+        return
+
+    concurrency = max(1, int(settings["http"].get("concurrency", 1)))
+    parse_workers = max(0, int(settings["parser"].get("workers", 0)))
+    chunk_size = max(1, int(settings["parser"].get("chunk_size", 8)))
+    output_settings = settings["output"]
+
+    try:
+        writer = open_sink(output_path, output_settings)
+    except (ValueError, RuntimeError, sqlite3.Error) as e:
+        logging.error("Invalid output configuration: %s", e)
+        if queue is not None:
+            queue.close()
+        return
+    logging.debug("Encoding JSON with %s.", writer.codec.describe())
+
+    tracker: Optional[ChangeTracker] = None
+
+    def checkpoint() -> None:
+        # Batching sinks flush before each ledger commit so "done" always means written;
+        # fingerprints and queue leases are committed only after that
+        writer.checkpoint()
+        if tracker is not None:
+            tracker.commit()
+        if leased is not None:
+            leased.flush()
+
+    # A sink that cannot make records durable mid-run (Parquet has no footer until
+    # close) holds back every commit, and with it fingerprints and queue acks, until then
+    ledger = JobLedger(
+        ledger_path, commit_every=50 if writer.durable_checkpoints else 0, before_commit=checkpoint
+    )
+    done: Set[str] = set()
+    if args.resume:
+        done = ledger.done_urls()
+        try:
+            writer.append_from(ledger.committed_output_end(), len(done))
+        except ValueError as e:
+            logging.error("Cannot resume: %s", e)
+            ledger.close()
+            return
+        logging.info("Resuming: skipping %d URL(s) already done.", len(done))
+    else:
+        ledger.reset()
+
+    try:
+        parser = LinkedinCompanyParser(settings=settings)
+        if replay_dir is None:
+            parser.connect()
+    except (OSError, ValueError, KeyError, RuntimeError) as e:
+        logging.error("Invalid parser configuration: %s", e)
+        ledger.close()
+        if queue is not None:
+            queue.close()
+        return
+
+    # Change detection is only needed to filter output or to report diffs
+    emit = output_settings.get("emit", "all")
+    changes_file = output_settings.get("changes_file")
+    changes_writer: Optional[JsonLinesWriter] = None
+    if emit == "changed" or changes_file:
+        fingerprint_file = output_settings.get("fingerprint_file")
+        tracker = ChangeTracker(
+            Path(fingerprint_file) if fingerprint_file
+            else output_path.with_name(output_path.name + ".fingerprints.sqlite"),
+            skip_unchanged_html=bool(output_settings.get("skip_unchanged_html", True)),
+            codec=writer.codec,
+        )
+    if changes_file:
+        changes_writer = JsonLinesWriter(Path(changes_file), codec=writer.codec)
+        if args.resume and Path(changes_file).exists():
+            changes_writer.append_from(Path(changes_file).stat().st_size, 0)
+
+    metrics_settings = settings["metrics"]
+    metrics_server = None
+    if metrics_settings.get("port"):
+        try:
+            metrics_server = METRICS.serve(int(metrics_settings["port"]))
+        except OSError as e:
+            logging.error("Cannot serve metrics on port %s: %s", metrics_settings["port"], e)
+
+    # A worker runs the pipeline once per lease round; like serve(), it keeps one
+    # pool of parser processes for all of them instead of spawning a pool per round
+    parse_pool = open_parse_pool(parser, parse_workers) if parse_workers > 0 and replay_dir is None else None
+
+    def process_urls(job_urls: Iterable[str]) -> Iterator[Tuple[str, Optional[CompanyRecord]]]:
+        if parse_pool is not None:
+            return iter_pipelined(
+                parser, iter_job_urls(job_urls, ledger, skip=done),
+                concurrency=concurrency, parse_workers=parse_workers, chunk_size=chunk_size, tracker=tracker,
+                parse_pool=parse_pool,
+            )
+        return iter_processed(
+            parser, iter_job_urls(job_urls, ledger, skip=done), concurrency=concurrency, tracker=tracker
+        )
+
+    try:
+        if replay_dir is not None:
+            archived = iter_archived_companies(replay_dir, parser.page_of, MAIN_PAGE, parser.subpages)
+            pages = iter_job_pages(archived, ledger, skip=done)
+            processed = iter_replayed(parser, pages, parse_workers=parse_workers, chunk_size=chunk_size)
+        elif leased is not None:
+            processed = iter_worker_rounds(
+                leased, process_urls, ledger.commit if writer.durable_checkpoints else None
+            )
+        else:
+            processed = process_urls(urls)
+        with writer, changes_writer or nullcontext():
+            for url, cleaned in processed:
+                http_code = parser.pop_last_status(url)
+                if cleaned is UNCHANGED:
+                    # Same page as last run: reuse the stored record instead of parsing
+                    METRICS.inc("urls_unchanged_total")
+                    cleaned = tracker.previous_record(url) if emit == "all" else None
+                elif not cleaned:
+                    METRICS.inc("urls_failed_total")
+                    ledger.record_failed(url, http_code)
+                    if leased is not None:
+                        leased.failed(url, f"HTTP {http_code}" if http_code else "no data extracted")
+                    continue
+                elif tracker is not None:
+                    change = tracker.update(url, cleaned)
+                    if change is None:
+                        METRICS.inc("urls_unchanged_total")
+                        if emit == "changed":
+                            cleaned = None
+                    elif changes_writer is not None:
+                        changes_writer.write(change)
+                offset = writer.bytes_written
+                if cleaned:
+                    with METRICS.timer("write_seconds"):
+                        writer.write(cleaned)
+                    METRICS.inc("records_written_total")
+                ledger.record_done(url, http_code, offset, writer.bytes_written)
+                if leased is not None:
+                    leased.done(url)
+    except (OSError, SinkError) as e:
+        logging.error("Failed to write output to %s: %s", writer.target, e)
+        # Records since the last checkpoint may never have reached the output, so
+        # neither their ledger rows, their fingerprints nor their queue acks may be kept
+        ledger.rollback()
+        if tracker is not None:
+            tracker.rollback()
+        if leased is not None:
+            leased.rollback()
+    finally:
+        if parse_pool is not None:
+            parse_pool.shutdown()
+        parser.close()
+        counts = ledger.counts()
+        ledger.close()
+        if tracker is not None:
+            tracker.close()
+        if queue is not None:
+            leased.close()
+            counts_in_queue = queue.counts()
+            queue.close()
+            logging.info(
+                "Work queue: leased %d URL(s); %d pending, %d leased, %d done, %d dead overall.",
+                leased.leased, counts_in_queue.get("pending", 0), counts_in_queue.get("leased", 0),
+                counts_in_queue.get("done", 0), counts_in_queue.get("dead", 0),
+            )
+        export_metrics(metrics_settings)
+        if metrics_server is not None:
+            metrics_server.shutdown()
+    logging.info(
+        "Job ledger %s: %d done, %d failed, %d pending.",
+        ledger_path.as_posix(), counts.get("done", 0), counts.get("failed", 0), counts.get("pending", 0),
+    )
+
+    if writer.count:
+        logging.info(
+            "Wrote scraped data for %d company(ies) to %s.", writer.count, writer.target
+        )
+    elif emit == "changed" and counts.get("done", 0):
+        logging.info("No company changed since the last run.")
     else:
         logging.warning("No company data was successfully scraped.")
 
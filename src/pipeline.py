@@ -0,0 +1,285 @@
+import logging
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from extractors.linkedin_parser import CompanyPages, LinkedinCompanyParser, page_signature
+from utils.data_cleaner import normalize_company_batch, normalize_company_data
+from utils.change_tracker import ChangeTracker
+from utils.metrics import METRICS
+from utils.records import CompanyRecord, intern_record
+
+logger = logging.getLogger(__name__)
+
+Result = Tuple[str, Optional[CompanyRecord]]
+
+# Yielded in place of a record when the change tracker has seen the exact same page;
+# compared by identity
+UNCHANGED = CompanyRecord()
+
+def _log_progress(idx: int, total: Optional[int], url: str) -> None:
+    if total:
+        logger.info("Processing %d/%d: %s", idx, total, url)
+    else:
+        logger.info("Processing %d: %s", idx, url)
+
+def process_url(
+    parser: LinkedinCompanyParser, url: str, tracker: Optional[ChangeTracker] = None
+) -> Optional[CompanyRecord]:
+    """Scrape and normalize a single URL. Never raises, so one bad URL cannot stop a run."""
+    try:
+        pages = parser.fetch_pages(url)
+        if pages and tracker is not None and tracker.html_unchanged(url, page_signature(pages)):
+            return UNCHANGED
+        raw_data = parser.parse_pages(url, pages) if pages else None
+        if not raw_data:
+            logger.warning("No data extracted for URL: %s", url)
+            return None
+        return normalize_company_data(raw_data)
+    except Exception as e:  # Catch-all to avoid breaking the loop
+        logger.exception("Unexpected error while processing %s: %s", url, e)
+        return None
+
+def iter_processed(
+    parser: LinkedinCompanyParser,
+    urls: Iterable[str],
+    concurrency: int = 1,
+    total: Optional[int] = None,
+    tracker: Optional[ChangeTracker] = None,
+) -> Iterator[Result]:
+    """
+    Yield (url, cleaned_record) pairs in input order.
+
+    With concurrency > 1 the URLs are processed by a bounded thread pool. At most
+    2 * concurrency URLs are in flight at once, and results are yielded strictly in
+    input order so the output stays deterministic. `urls` may be a lazy
+    stream; `total`, if known, is only used for progress logging. With a
+    `tracker`, pages identical to the previous run yield `UNCHANGED`.
+    """
+    if concurrency <= 1:
+        for idx, url in enumerate(urls, start=1):
+            _log_progress(idx, total, url)
+            yield url, process_url(parser, url, tracker)
+        return
+
+    window = concurrency * 2
+    pending: Deque[Tuple[str, "Future[Optional[CompanyRecord]]"]] = deque()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="fetch") as executor:
+        for idx, url in enumerate(urls, start=1):
+            if len(pending) >= window:
+                done_url, future = pending.popleft()
+                yield done_url, future.result()
+            _log_progress(idx, total, url)
+            pending.append((url, executor.submit(process_url, parser, url, tracker)))
+        while pending:
+            done_url, future = pending.popleft()
+            yield done_url, future.result()
+
+# -------------------- Process-pool pipeline --------------------
+
+_worker_parser: Optional[LinkedinCompanyParser] = None
+
+def _init_parse_worker(settings: Dict[str, Any], log_level: int) -> None:
+    global _worker_parser
+    logging.basicConfig(
+        level=log_level,
+        format="%(asctime)s [%(levelname)s] %(name)s - %(message)s",
+    )
+    # Workers only parse, so they get the parser settings and nothing that opens files
+    _worker_parser = LinkedinCompanyParser(settings={"parser": settings.get("parser", {})})
+
+def _parse_raw(parser: LinkedinCompanyParser, url: str, pages: Optional[CompanyPages]) -> Optional[CompanyRecord]:
+    if not pages:
+        return None
+    try:
+        return parser.parse_pages(url, pages) or None
+    except Exception as e:  # Catch-all so one page cannot fail its whole chunk
+        logger.exception("Unexpected error while parsing %s: %s", url, e)
+        return None
+
+def _parse_chunk(
+    parser: LinkedinCompanyParser, batch: List[Tuple[str, Optional[CompanyPages]]]
+) -> List[Optional[CompanyRecord]]:
+    """Parse a chunk of pages, then normalize all of them in one batch."""
+    raws = [_parse_raw(parser, url, pages) for url, pages in batch]
+    try:
+        cleaned = iter(normalize_company_batch(raw for raw in raws if raw))
+        return [next(cleaned) if raw else None for raw in raws]
+    except Exception:
+        # Redo record by record so a bad record only loses itself
+        results: List[Optional[CompanyRecord]] = []
+        for (url, _), raw in zip(batch, raws):
+            try:
+                results.append(normalize_company_data(raw) if raw else None)
+            except Exception as e:
+                logger.exception("Unexpected error while normalizing %s: %s", url, e)
+                results.append(None)
+        return results
+
+def _parse_batch(
+    batch: List[Tuple[str, Optional[CompanyPages]]],
+) -> Tuple[List[Optional[CompanyRecord]], Dict[str, Any]]:
+    """
+    Parse and normalize a chunk of fetched pages inside a worker process.
+
+    Returns the records together with the metrics gathered while parsing
+    them, which the parent merges into its own registry.
+    """
+    return _parse_chunk(_worker_parser, batch), METRICS.snapshot(reset=True)
+
+def _fetch(parser: LinkedinCompanyParser, url: str) -> Optional[CompanyPages]:
+    try:
+        return parser.fetch_pages(url)
+    except Exception as e:  # Catch-all to avoid breaking the loop
+        logger.exception("Unexpected error while fetching %s: %s", url, e)
+        return None
+
+def open_parse_pool(parser: LinkedinCompanyParser, parse_workers: int) -> ProcessPoolExecutor:
+    """Spawn the parser worker processes; each builds its own parser from `parser.settings`."""
+    return ProcessPoolExecutor(
+        max_workers=parse_workers,
+        # Never fork while fetch threads may be holding locks
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_parse_worker,
+        initargs=(parser.settings, logging.getLogger().getEffectiveLevel()),
+    )
+
+class _ParseStage:
+    """
+    Ordered hand-off of fetched pages to the parser worker pool.
+
+    Pages are sent in chunks of `chunk_size`; once `window` chunks are in
+    flight, adding more first yields the oldest chunk's results, so the
+    caller sees (url, record) pairs in the order it added them.
+    """
+
+    def __init__(self, pool: ProcessPoolExecutor, chunk_size: int, window: int) -> None:
+        self.pool = pool
+        self.chunk_size = chunk_size
+        self.window = max(1, window)
+        self._batch: List[Tuple[str, Optional[CompanyPages]]] = []
+        self._unchanged: List[bool] = []
+        self._parsing: Deque[
+            Tuple[List[str], List[bool], "Future[Tuple[List[Optional[CompanyRecord]], Dict[str, Any]]]"]
+        ] = deque()
+
+    def add(self, url: str, pages: Optional[CompanyPages], unchanged: bool = False) -> Iterator[Result]:
+        # Unchanged pages ride along without their HTML to keep their place in the order
+        self._batch.append((url, None if unchanged else pages))
+        self._unchanged.append(unchanged)
+        if len(self._batch) >= self.chunk_size:
+            yield from self.flush()
+
+    def flush(self) -> Iterator[Result]:
+        if not self._batch:
+            return
+        if len(self._parsing) >= self.window:
+            yield from self._drain()
+        urls = [url for url, _ in self._batch]
+        self._parsing.append((urls, self._unchanged, self.pool.submit(_parse_batch, self._batch)))
+        self._batch, self._unchanged = [], []
+
+    def _drain(self) -> Iterator[Result]:
+        urls, unchanged, future = self._parsing.popleft()
+        try:
+            records, worker_metrics = future.result()
+            METRICS.merge(worker_metrics)
+        except Exception as e:  # e.g. a worker process died
+            logger.error("Parser worker failed on a chunk of %d page(s): %s", len(urls), e)
+            records = [None] * len(urls)
+        for url, same, record in zip(urls, unchanged, records):
+            if same:
+                yield url, UNCHANGED
+            else:
+                # Unpickled strings are fresh copies; share them with the rest of the run
+                yield url, intern_record(record) if record else None
+
+    def finish(self) -> Iterator[Result]:
+        yield from self.flush()
+        while self._parsing:
+            yield from self._drain()
+
+def iter_pipelined(
+    parser: LinkedinCompanyParser,
+    urls: Iterable[str],
+    concurrency: int,
+    parse_workers: int,
+    chunk_size: int = 8,
+    total: Optional[int] = None,
+    tracker: Optional[ChangeTracker] = None,
+    parse_pool: Optional[ProcessPoolExecutor] = None,
+) -> Iterator[Result]:
+    """
+    Yield (url, cleaned_record) pairs in input order using three stages.
+
+    - fetch: `concurrency` threads download pages (I/O bound)
+    - parse: `parse_workers` processes run parse_pages + normalize_company_data
+      on chunks of `chunk_size` pages (CPU bound, outside this interpreter's GIL)
+    - write: the caller consumes this generator from a single thread
+
+    Each stage keeps a bounded number of items in flight, so a slow stage
+    applies backpressure to the ones before it instead of buffering the run.
+    Pages the `tracker` reports as unchanged skip the parse stage. A
+    `parse_pool` from `open_parse_pool` is used instead of starting one and
+    is left open, so a long-lived caller pays the worker start-up once.
+    """
+    chunk_size = max(1, chunk_size)
+    fetch_window = max(concurrency * 2, chunk_size)
+    fetching: Deque[Tuple[str, "Future[Optional[CompanyPages]]"]] = deque()
+    pool_context = nullcontext(parse_pool) if parse_pool is not None else open_parse_pool(parser, parse_workers)
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="fetch") as fetch_pool, \
+            pool_context as parse_pool:
+        stage = _ParseStage(parse_pool, chunk_size, window=parse_workers * 2)
+
+        def take_fetched() -> Iterator[Result]:
+            done_url, future = fetching.popleft()
+            pages = future.result()
+            if not pages:
+                logger.warning("No data extracted for URL: %s", done_url)
+            unchanged = bool(pages) and tracker is not None and tracker.html_unchanged(done_url, page_signature(pages))
+            yield from stage.add(done_url, pages, unchanged)
+
+        for idx, url in enumerate(urls, start=1):
+            if len(fetching) >= fetch_window:
+                yield from take_fetched()
+            _log_progress(idx, total, url)
+            fetching.append((url, fetch_pool.submit(_fetch, parser, url)))
+        while fetching:
+            yield from take_fetched()
+        yield from stage.finish()
+
+def iter_replayed(
+    parser: LinkedinCompanyParser,
+    pages: Iterable[Tuple[str, CompanyPages]],
+    parse_workers: int = 0,
+    chunk_size: int = 8,
+) -> Iterator[Result]:
+    """
+    Yield (url, cleaned_record) pairs for already-fetched (url, pages) companies.
+
+    Used to re-extract from an HTML archive without touching the network.
+    Pages are parsed in chunks of `chunk_size` and each chunk is normalized
+    with `normalize_company_batch`. With parse_workers > 0 the chunks run in
+    worker processes, at most 2 * parse_workers in flight, in input order.
+    """
+    chunk_size = max(1, chunk_size)
+    if parse_workers <= 0:
+        chunk: List[Tuple[str, Optional[CompanyPages]]] = []
+        for idx, (url, company_pages) in enumerate(pages, start=1):
+            _log_progress(idx, None, url)
+            chunk.append((url, company_pages or None))
+            if len(chunk) >= chunk_size:
+                yield from zip([u for u, _ in chunk], _parse_chunk(parser, chunk))
+                chunk = []
+        yield from zip([u for u, _ in chunk], _parse_chunk(parser, chunk))
+        return
+
+    with open_parse_pool(parser, parse_workers) as parse_pool:
+        stage = _ParseStage(parse_pool, chunk_size, window=parse_workers * 2)
+        for idx, (url, company_pages) in enumerate(pages, start=1):
+            _log_progress(idx, None, url)
+            yield from stage.add(url, company_pages or None)
+        yield from stage.finish()
@@ -0,0 +1,168 @@
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from utils.data_cleaner import extract_universal_name_id
+from utils.records import CompanyRecord
+from utils.serialization import JsonCodec, get_codec
+
+logger = logging.getLogger(__name__)
+
+EMIT_MODES = ("all", "changed")
+
+def _digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+def _canonical_json(value: Any, codec: Optional[JsonCodec] = None) -> bytes:
+    return (codec or get_codec()).compact(value, sort_keys=True)
+
+def record_fingerprint(record: Dict[str, Any], codec: Optional[JsonCodec] = None) -> str:
+    """Stable hash of a normalized record, independent of key order."""
+    return _digest(_canonical_json(record, codec))
+
+def diff_records(old: Dict[str, Any], new: Dict[str, Any], codec: Optional[JsonCodec] = None) -> Dict[str, Any]:
+    """
+    Field-level deltas between two normalized records.
+
+    Scalar fields map to {"old": ..., "new": ...}; list fields such as
+    employees or locations map to {"added": [...], "removed": [...]}.
+    """
+    changes: Dict[str, Any] = {}
+    for field in list(old) + [f for f in new if f not in old]:
+        before, after = old.get(field), new.get(field)
+        if before == after:
+            continue
+        if isinstance(before, list) or isinstance(after, list):
+            before_keys = {_canonical_json(item, codec): item for item in before or []}
+            after_keys = {_canonical_json(item, codec): item for item in after or []}
+            added: List[Any] = [item for key, item in after_keys.items() if key not in before_keys]
+            removed: List[Any] = [item for key, item in before_keys.items() if key not in after_keys]
+            if added or removed:
+                changes[field] = {"added": added, "removed": removed}
+        else:
+            changes[field] = {"old": before, "new": after}
+    return changes
+
+class ChangeTracker:
+    """
+    Per-company fingerprints of the last emitted record, backed by SQLite.
+
+    Companies are keyed by `universal_name_id`. For each one the store keeps
+    a hash of the raw HTML, a hash of the normalized record and the record
+    itself, so a later run can tell whether anything changed and by how much.
+
+    `html_unchanged` is called from fetch threads as soon as a page arrives;
+    when the page is byte-identical to the last run, parsing and normalizing
+    it can be skipped. The new HTML hash is held until the caller reports
+    the finished record with `update`.
+
+    Updates become durable only on `commit()`, which the caller runs once
+    the matching records are safely written (the job ledger's checkpoint).
+    After a failed write, `rollback()` forgets them, so a resumed run does
+    not take companies whose records were lost for unchanged ones.
+    """
+
+    def __init__(self, path: Path, skip_unchanged_html: bool = True,
+                 codec: Optional[JsonCodec] = None) -> None:
+        self.path = path
+        self.codec = codec or get_codec()
+        self.skip_unchanged_html = skip_unchanged_html
+        self._lock = threading.Lock()
+        # HTML hashes of pages fetched in this run, waiting for their record
+        self._pending_html: Dict[str, str] = {}
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path.as_posix(), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS fingerprints (
+                company_id TEXT PRIMARY KEY,
+                html_hash TEXT,
+                record_hash TEXT NOT NULL,
+                record TEXT NOT NULL,
+                updated_at REAL
+            )
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _company_id(url: str) -> str:
+        slug = extract_universal_name_id(url)
+        return slug.lower() if slug else url
+
+    def _row(self, company_id: str) -> Optional[tuple]:
+        return self._conn.execute(
+            "SELECT html_hash, record_hash, record FROM fingerprints WHERE company_id = ?",
+            (company_id,),
+        ).fetchone()
+
+    def html_unchanged(self, url: str, html: str) -> bool:
+        """True if `html` is identical to the page behind the stored record."""
+        html_hash = _digest(html.encode("utf-8"))
+        with self._lock:
+            row = self._row(self._company_id(url))
+            if self.skip_unchanged_html and row is not None and row[0] == html_hash:
+                return True
+            self._pending_html[url] = html_hash
+        return False
+
+    def previous_record(self, url: str) -> Optional[CompanyRecord]:
+        with self._lock:
+            row = self._row(self._company_id(url))
+        return CompanyRecord.from_dict(self.codec.loads(row[2])) if row is not None else None
+
+    def update(self, url: str, record: CompanyRecord) -> Optional[Dict[str, Any]]:
+        """
+        Store `record` as the latest version for its company.
+
+        Returns None if it is identical to the stored one, otherwise a change
+        entry with the field-level diff ("status" is "new" or "changed").
+        """
+        company_id = self._company_id(url)
+        data = record.to_dict()
+        record_hash = record_fingerprint(data, self.codec)
+        with self._lock:
+            html_hash = self._pending_html.pop(url, None)
+            row = self._row(company_id)
+            if row is not None and row[1] == record_hash:
+                if html_hash and html_hash != row[0]:
+                    # Same content behind different markup; remember the new page
+                    self._conn.execute(
+                        "UPDATE fingerprints SET html_hash = ?, updated_at = ? WHERE company_id = ?",
+                        (html_hash, time.time(), company_id),
+                    )
+                return None
+            self._conn.execute(
+                "INSERT OR REPLACE INTO fingerprints VALUES (?, ?, ?, ?, ?)",
+                # Stored in its original key order so a reused record is written unchanged
+                (company_id, html_hash, record_hash,
+                 self.codec.compact(data).decode("utf-8"), time.time()),
+            )
+
+        change: Dict[str, Any] = {
+            "universal_name_id": record.universal_name_id or company_id,
+            "source_url": url,
+            "status": "new" if row is None else "changed",
+        }
+        if row is not None:
+            change["changes"] = diff_records(self.codec.loads(row[2]), data, self.codec)
+        return change
+
+    def commit(self) -> None:
+        with self._lock:
+            self._conn.commit()
+
+    def rollback(self) -> None:
+        with self._lock:
+            self._conn.rollback()
+
+    def close(self) -> None:
+        """Close the store; updates since the last `commit()` are discarded."""
+        with self._lock:
+            self._conn.close()
@@ -1,22 +1,31 @@
 thonimport logging
 import re
-from typing import Any, Dict, Optional
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional, Type, TypeVar
+
+from utils.metrics import METRICS
+from utils.records import CompanyRecord, Employee, Location, SimilarCompany, Update, intern_record
 
 logger = logging.getLogger(__name__)
 
-WHITESPACE_RE = re.compile(r"\s+")
+T = TypeVar("T", Location, Employee, Update)
+
+DIGIT_GROUP_RE = re.compile(r"[\d,]+")
+# Typical company profile format: https://www.linkedin.com/company/<slug>/
+COMPANY_SLUG_RE = re.compile(r"/company/([^/?#]+)/?")
 
 def clean_text(value: Optional[str]) -> Optional[str]:
     if value is None:
         return None
-    value = value.strip()
-    value = WHITESPACE_RE.sub(" ", value)
+    # Same as stripping and collapsing \s+ runs: str.split() uses the same
+    # Unicode whitespace definition as re's \s, without the regex engine
+    value = " ".join(value.split())
     return value or None
 
 def parse_int_from_text(value: Optional[str]) -> Optional[int]:
     if not value:
         return None
-    digits = re.findall(r"[\d,]+", value)
+    digits = DIGIT_GROUP_RE.findall(value)
     if not digits:
         return None
     try:
@@ -24,47 +33,84 @@ def parse_int_from_text(value: Optional[str]) -> Optional[int]:
     except ValueError:
         return None
 
-def normalize_company_data(raw: Dict[str, Any]) -> Dict[str, Any]:
+@METRICS.timed("normalize_seconds")
+def normalize_company_data(raw: Dict[str, Any]) -> CompanyRecord:
     """
     Normalize raw scraped data into a clean, consistent structure.
     """
+    return _normalize(raw, clean_text, parse_int_from_text)
+
+@METRICS.timed("normalize_batch_seconds")
+def normalize_company_batch(
+    records: Iterable[Dict[str, Any]], cache_size: int = 65536
+) -> List[CompanyRecord]:
+    """
+    Normalize many raw records at once; same results as `normalize_company_data`.
+
+    Values such as industry, company size, type or locations repeat heavily
+    across companies, so cleaning is memoized for the whole batch (bounded by
+    `cache_size` distinct strings) instead of re-stripped per record.
+    """
+    cached_clean = lru_cache(maxsize=cache_size)(clean_text)
+    cached_int = lru_cache(maxsize=cache_size)(parse_int_from_text)
+
+    def clean(value: Optional[str]) -> Optional[str]:
+        # Only exact strings are cached; anything else takes the uncached path
+        # so it fails or succeeds exactly like the per-record function
+        return cached_clean(value) if type(value) is str else clean_text(value)
+
+    def to_int(value: Optional[str]) -> Optional[int]:
+        return cached_int(value) if type(value) is str else parse_int_from_text(value)
+
+    return [_normalize(raw, clean, to_int) for raw in records]
+
+def _as_item(value: Any, item_type: Type[T]) -> Optional[T]:
+    """`value` as an `item_type` tuple; raw items may also be plain dicts (e.g. from JSON-LD)."""
+    if isinstance(value, item_type):
+        return value
+    if isinstance(value, dict):
+        return item_type(*(value.get(field) for field in item_type._fields))
+    return None
+
+def _normalize(
+    raw: Dict[str, Any],
+    clean: Callable[[Optional[str]], Optional[str]],
+    to_int: Callable[[Optional[str]], Optional[int]],
+) -> CompanyRecord:
+    # Fields are collected as keyword arguments; list fields stay absent when empty
     data: Dict[str, Any] = {}
 
-    data["company_name"] = clean_text(raw.get("company_name"))
+    data["company_name"] = clean(raw.get("company_name"))
     data["universal_name_id"] = extract_universal_name_id(raw.get("source_url"))
-    data["background_cover_image_url"] = clean_text(raw.get("background_cover_image_url"))
-    data["linkedin_internal_id"] = clean_text(raw.get("linkedin_internal_id"))
-    data["industry"] = clean_text(raw.get("industry"))
-    data["location"] = clean_text(raw.get("location")) or clean_text(raw.get("headquarters"))
-    data["follower_count"] = parse_int_from_text(
+    data["background_cover_image_url"] = clean(raw.get("background_cover_image_url"))
+    data["linkedin_internal_id"] = clean(raw.get("linkedin_internal_id"))
+    data["industry"] = clean(raw.get("industry"))
+    data["location"] = clean(raw.get("location")) or clean(raw.get("headquarters"))
+    data["follower_count"] = to_int(
         raw.get("follower_count") or raw.get("followers")
     )
-    data["tagline"] = clean_text(raw.get("tagline"))
-    data["company_size_on_linkedin"] = clean_text(raw.get("company_size_on_linkedin"))
-    data["about"] = clean_text(raw.get("about"))
-    data["website"] = clean_text(raw.get("website"))
-    data["company_size"] = clean_text(raw.get("company_size"))
-    data["headquarters"] = clean_text(raw.get("headquarters"))
-    data["type"] = clean_text(raw.get("type"))
-    data["founded"] = clean_text(raw.get("founded"))
-    data["specialties"] = clean_text(raw.get("specialties"))
+    data["tagline"] = clean(raw.get("tagline"))
+    data["company_size_on_linkedin"] = clean(raw.get("company_size_on_linkedin"))
+    data["about"] = clean(raw.get("about"))
+    data["website"] = clean(raw.get("website"))
+    data["company_size"] = clean(raw.get("company_size"))
+    data["headquarters"] = clean(raw.get("headquarters"))
+    data["type"] = clean(raw.get("type"))
+    data["founded"] = clean(raw.get("founded"))
+    data["specialties"] = clean(raw.get("specialties"))
 
     locations = raw.get("locations")
     if isinstance(locations, list):
         clean_locations = []
         for loc in locations:
-            if not isinstance(loc, dict):
+            loc = _as_item(loc, Location)
+            if loc is None:
                 continue
-            addr = clean_text(loc.get("address"))
-            map_url = clean_text(loc.get("map_url"))
+            addr = clean(loc.address)
+            map_url = clean(loc.map_url)
             if not addr and not map_url:
                 continue
-            clean_locations.append(
-                {
-                    "address": addr,
-                    "map_url": map_url,
-                }
-            )
+            clean_locations.append(Location(addr, map_url))
         if clean_locations:
             data["locations"] = clean_locations
 
@@ -72,17 +118,14 @@ def normalize_company_data(raw: Dict[str, Any]) -> Dict[str, Any]:
     if isinstance(employees, list):
         clean_employees = []
         for emp in employees:
-            if not isinstance(emp, dict):
+            emp = _as_item(emp, Employee)
+            if emp is None:
                 continue
-            name = clean_text(emp.get("employee_name"))
+            name = clean(emp.employee_name)
             if not name:
                 continue
             clean_employees.append(
-                {
-                    "employee_name": name,
-                    "employee_position": clean_text(emp.get("employee_position")),
-                    "employee_profile_url": clean_text(emp.get("employee_profile_url")),
-                }
+                Employee(name, clean(emp.employee_position), clean(emp.employee_profile_url))
             )
         if clean_employees:
             data["employees"] = clean_employees
@@ -91,18 +134,13 @@ def normalize_company_data(raw: Dict[str, Any]) -> Dict[str, Any]:
     if isinstance(updates, list):
         clean_updates = []
         for upd in updates:
-            if not isinstance(upd, dict):
+            upd = _as_item(upd, Update)
+            if upd is None:
                 continue
-            text = clean_text(upd.get("text"))
+            text = clean(upd.text)
             if not text:
                 continue
-            clean_updates.append(
-                {
-                    "text": text,
-                    "articlePostedDate": clean_text(upd.get("articlePostedDate")),
-                    "totalLikes": clean_text(upd.get("totalLikes")),
-                }
-            )
+            clean_updates.append(Update(text, clean(upd.articlePostedDate), clean(upd.totalLikes)))
         if clean_updates:
             data["updates"] = clean_updates
 
@@ -110,31 +148,34 @@ def normalize_company_data(raw: Dict[str, Any]) -> Dict[str, Any]:
     if isinstance(similar_companies, list):
         clean_similar = []
         for comp in similar_companies:
+            if isinstance(comp, SimilarCompany):
+                comp = comp._asdict()
             if isinstance(comp, dict):
-                name = clean_text(comp.get("name") or comp.get("company_name"))
-                url = clean_text(comp.get("url") or comp.get("profile_url"))
+                name = clean(comp.get("name") or comp.get("company_name"))
+                url = clean(comp.get("url") or comp.get("profile_url"))
                 if not name and not url:
                     continue
-                clean_similar.append({"company_name": name, "profile_url": url})
+                clean_similar.append(SimilarCompany(name, url))
             elif isinstance(comp, str):
-                comp_name = clean_text(comp)
+                comp_name = clean(comp)
                 if comp_name:
-                    clean_similar.append({"company_name": comp_name, "profile_url": None})
+                    clean_similar.append(SimilarCompany(comp_name, None))
         if clean_similar:
             data["similar_companies"] = clean_similar
 
     # Attach original URL at the end for traceability
     if raw.get("source_url"):
-        data["source_url"] = clean_text(raw.get("source_url"))
+        data["source_url"] = clean(raw.get("source_url"))
 
-    logger.debug("Normalized company data: %s", data)
-    return data
+    record = intern_record(CompanyRecord(**data))
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Normalized company data: %s", record)
+    return record
 
 def extract_universal_name_id(url: Optional[str]) -> Optional[str]:
     if not url:
         return None
-    # Typical company profile format: https://www.linkedin.com/company/<slug>/
-    match = re.search(r"/company/([^/?#]+)/?", url)
+    match = COMPANY_SLUG_RE.search(url)
     if not match:
         return None
     return match.group(1)
\ No newline at end of file
@@ -0,0 +1,236 @@
+import json
+import logging
+import mmap
+import struct
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Collection, Dict, Iterator, Optional, TextIO, Tuple
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_COMPRESSIONS = ("gzip", "zstd")
+
+# Frame: magic, codec, URL length, body length, fetch time; then URL and compressed body
+FRAME_MAGIC = b"LIA1"
+FRAME_HEADER = struct.Struct("<4sBHId")
+CODEC_IDS = {"gzip": 1, "zstd": 2}
+
+INDEX_FILE = "index.jsonl"
+
+def _import_zstandard() -> Any:
+    try:
+        import zstandard
+    except ImportError as e:
+        raise RuntimeError("zstd archives require the 'zstandard' package") from e
+    return zstandard
+
+def _segment_name(number: int) -> str:
+    return f"segment-{number:05d}.bin"
+
+class HtmlArchive:
+    """
+    Append-only archive of raw fetched pages.
+
+    Pages are written as self-describing compressed frames into numbered
+    segment files of at most `segment_max_bytes`; `index.jsonl` records the
+    segment, offset and length of every frame so a replay can seek straight
+    to each page. A new run keeps appending to the existing archive.
+    """
+
+    def __init__(self, archive_dir: Path, segment_max_bytes: int = 256 * 1024 * 1024,
+                 compression: str = "gzip") -> None:
+        if compression not in ARCHIVE_COMPRESSIONS:
+            raise ValueError(f"Unsupported archive compression {compression!r}")
+        self._compressor = None
+        if compression == "zstd":
+            self._compressor = _import_zstandard().ZstdCompressor(level=6)
+        self.archive_dir = archive_dir
+        self.segment_max_bytes = max(1, segment_max_bytes)
+        self.codec = CODEC_IDS[compression]
+        self.count = 0
+        self._lock = threading.Lock()
+        # zstd compressor objects are not thread-safe
+        self._compress_lock = threading.Lock()
+        self._segment: Optional[BinaryIO] = None
+        self._segment_number = 0
+        self._index: Optional[TextIO] = None
+
+    @classmethod
+    def from_settings(cls, settings: Optional[Dict[str, Any]]) -> Optional["HtmlArchive"]:
+        settings = settings or {}
+        archive_dir = settings.get("dir")
+        if not archive_dir:
+            return None
+        return cls(
+            Path(archive_dir),
+            segment_max_bytes=int(float(settings.get("segment_max_mb", 256)) * 1024 * 1024),
+            compression=settings.get("compression", "gzip"),
+        )
+
+    def _open(self) -> None:
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        existing = sorted(self.archive_dir.glob("segment-*.bin"))
+        self._segment_number = int(existing[-1].stem.split("-")[1]) if existing else 0
+        self._segment = (self.archive_dir / _segment_name(self._segment_number)).open("ab")
+        self._index = (self.archive_dir / INDEX_FILE).open("a", encoding="utf-8")
+
+    def _roll(self) -> None:
+        self._segment.close()
+        self._segment_number += 1
+        self._segment = (self.archive_dir / _segment_name(self._segment_number)).open("ab")
+
+    def append(self, url: str, html: str) -> None:
+        """Archive one page; safe to call from several fetch threads."""
+        body = html.encode("utf-8")
+        if self._compressor is not None:
+            with self._compress_lock:
+                payload = self._compressor.compress(body)
+        else:
+            payload = zlib.compress(body, 6)
+        url_bytes = url.encode("utf-8")
+        fetched_at = time.time()
+        frame = FRAME_HEADER.pack(FRAME_MAGIC, self.codec, len(url_bytes), len(payload), fetched_at)
+        frame += url_bytes + payload
+
+        with self._lock:
+            try:
+                if self._segment is None:
+                    self._open()
+                if self._segment.tell() and self._segment.tell() + len(frame) > self.segment_max_bytes:
+                    self._roll()
+                offset = self._segment.tell()
+                self._segment.write(frame)
+                # Data before index, so every index entry points at a complete frame
+                self._segment.flush()
+                entry = {
+                    "url": url,
+                    "segment": _segment_name(self._segment_number),
+                    "offset": offset,
+                    "length": len(frame),
+                    "fetched_at": round(fetched_at, 3),
+                }
+                self._index.write(json.dumps(entry) + "\n")
+                self._index.flush()
+            except OSError as e:
+                logger.warning("Failed to archive %s: %s", url, e)
+                return
+            self.count += 1
+
+    def close(self) -> None:
+        with self._lock:
+            if self._segment is not None:
+                self._segment.close()
+                self._index.close()
+                self._segment = self._index = None
+        if self.count:
+            logger.info("Archived %d page(s) to %s.", self.count, self.archive_dir.as_posix())
+
+def _decode_frame(view: "mmap.mmap", offset: int, decompressors: Dict[int, Any]) -> Tuple[str, str]:
+    magic, codec, url_len, body_len, _ = FRAME_HEADER.unpack_from(view, offset)
+    if magic != FRAME_MAGIC:
+        raise ValueError(f"bad frame magic at offset {offset}")
+    start = offset + FRAME_HEADER.size
+    url = view[start:start + url_len].decode("utf-8")
+    payload = view[start + url_len:start + url_len + body_len]
+    if codec == CODEC_IDS["zstd"]:
+        if codec not in decompressors:
+            decompressors[codec] = _import_zstandard().ZstdDecompressor()
+        body = decompressors[codec].decompress(payload)
+    elif codec == CODEC_IDS["gzip"]:
+        body = zlib.decompress(payload)
+    else:
+        raise ValueError(f"unknown codec {codec} at offset {offset}")
+    return url, body.decode("utf-8")
+
+def _latest_entries(archive_dir: Path) -> Dict[str, Tuple[str, int]]:
+    """url -> (segment, offset) of the newest capture, in first-capture order."""
+    latest: Dict[str, Tuple[str, int]] = {}
+    with (archive_dir / INDEX_FILE).open("r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            latest[entry["url"]] = (entry["segment"], entry["offset"])
+    return latest
+
+class _FrameReader:
+    """Reads frames through memory-mapped segments, counting damaged ones."""
+
+    def __init__(self, archive_dir: Path) -> None:
+        self.archive_dir = archive_dir
+        self.skipped = 0
+        self._maps: Dict[str, mmap.mmap] = {}
+        self._decompressors: Dict[int, Any] = {}
+
+    def read(self, url: str, segment: str, offset: int) -> Optional[str]:
+        try:
+            view = self._maps.get(segment)
+            if view is None:
+                with (self.archive_dir / segment).open("rb") as seg:
+                    view = self._maps[segment] = mmap.mmap(seg.fileno(), 0, access=mmap.ACCESS_READ)
+            return _decode_frame(view, offset, self._decompressors)[1]
+        except (OSError, struct.error, ValueError, zlib.error) as e:
+            logger.warning("Skipping damaged archive entry for %s: %s", url, e)
+            self.skipped += 1
+            return None
+
+    def close(self) -> None:
+        for view in self._maps.values():
+            view.close()
+        self._maps.clear()
+
+def iter_archived_companies(
+    archive_dir: Path, page_of: Callable[[str], Tuple[str, str]], main_page: str,
+    subpages: Collection[str] = (),
+) -> Iterator[Tuple[str, Dict[str, str]]]:
+    """
+    Yield (url, {page name: html}) per company in an archive, newest capture per URL.
+
+    `page_of(url)` maps each archived URL to its (company key, page name);
+    pages named `main_page` start a company and those named in `subpages`
+    are grouped under it. Grouping only needs the index, so every page is
+    still read once. Other subpages, and subpages whose main page is not in
+    the archive, are skipped. Index lines that point past the end of a
+    segment (a crash mid-write) are skipped too.
+    """
+    latest = _latest_entries(archive_dir)
+    companies: Dict[str, Tuple[str, Dict[str, Tuple[str, int]]]] = {}
+    orphans: Dict[str, Dict[str, Tuple[str, str, int]]] = {}
+    unwanted = 0
+    for url, location in latest.items():
+        key, name = page_of(url)
+        if name == main_page:
+            # A company archived under several URL variants keeps its first one
+            if key not in companies:
+                companies[key] = (url, {name: location})
+        elif name in subpages:
+            orphans.setdefault(key, {}).setdefault(name, (url,) + location)
+        else:
+            unwanted += 1
+
+    reader = _FrameReader(archive_dir)
+    grouped = 0
+    try:
+        for key, (url, locations) in companies.items():
+            pages: Dict[str, str] = {}
+            html = reader.read(url, *locations[main_page])
+            if html is None:
+                continue
+            pages[main_page] = html
+            for name, (sub_url, segment, offset) in orphans.pop(key, {}).items():
+                sub_html = reader.read(sub_url, segment, offset)
+                if sub_html is not None:
+                    pages[name] = sub_html
+                    grouped += 1
+            yield url, pages
+    finally:
+        reader.close()
+    logger.info(
+        "Replayed %d company page(s) and %d subpage(s) from %s "
+        "(%d damaged, %d subpage(s) without a main page, %d not configured).",
+        len(companies), grouped, archive_dir.as_posix(), reader.skipped, sum(map(len, orphans.values())),
+        unwanted,
+    )
@@ -0,0 +1,184 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+logger = logging.getLogger(__name__)
+
+def canonical_cache_url(url: str) -> str:
+    """Normalize a URL so trivially different spellings share one cache entry."""
+    parts = urlsplit(url.strip())
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, parts.query, ""))
+
+class HttpCache:
+    """
+    On-disk HTTP response cache.
+
+    Each entry is a gzip-compressed JSON document stored under the SHA-256 of
+    the canonical URL, holding the HTML body plus its ETag/Last-Modified
+    validators. Entries younger than `ttl_seconds` are served without any
+    network traffic; older entries are revalidated with a conditional request.
+    Entries not refreshed for `max_stale_seconds` are evicted, as are the
+    least recently written entries once the cache exceeds `max_size_bytes`.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        ttl_seconds: float = 86400,
+        max_stale_seconds: float = 7 * 86400,
+        max_size_bytes: int = 1024 * 1024 * 1024,
+    ) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.ttl_seconds = ttl_seconds
+        self.max_stale_seconds = max(max_stale_seconds, ttl_seconds)
+        self.max_size_bytes = max_size_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {"hits": 0, "revalidated": 0, "misses": 0, "stores": 0}
+
+    @classmethod
+    def from_settings(cls, settings: Optional[Dict[str, Any]]) -> Optional["HttpCache"]:
+        settings = settings or {}
+        cache_dir = settings.get("dir")
+        if not cache_dir:
+            return None
+        return cls(
+            Path(cache_dir),
+            ttl_seconds=float(settings.get("ttl_seconds", 86400)),
+            max_stale_seconds=float(settings.get("max_stale_seconds", 7 * 86400)),
+            max_size_bytes=int(float(settings.get("max_size_mb", 1024)) * 1024 * 1024),
+        )
+
+    def _path_for(self, url: str) -> Path:
+        key = hashlib.sha256(canonical_cache_url(url).encode("utf-8")).hexdigest()
+        return self.cache_dir / key[:2] / f"{key}.json.gz"
+
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self.stats[stat] += 1
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        path = self._path_for(url)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning("Discarding unreadable cache entry %s: %s", path.as_posix(), e)
+            path.unlink(missing_ok=True)
+            return None
+        if not isinstance(entry, dict) or "html" not in entry:
+            return None
+        return entry
+
+    def is_fresh(self, entry: Dict[str, Any]) -> bool:
+        return time.time() - float(entry.get("fetched_at", 0)) < self.ttl_seconds
+
+    def lookup(self, url: str) -> Optional[Dict[str, Any]]:
+        """Return the cached entry for `url`, counting a hit if it is fresh."""
+        entry = self.get(url)
+        if entry is not None and self.is_fresh(entry):
+            self._count("hits")
+        return entry
+
+    @staticmethod
+    def conditional_headers(entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        headers: Dict[str, str] = {}
+        if not entry:
+            return headers
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(
+        self,
+        url: str,
+        html: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        entry = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": time.time(),
+            "html": html,
+        }
+        self._write(self._path_for(url), entry)
+        self._count("misses")
+        self._count("stores")
+
+    def revalidated(self, url: str, entry: Dict[str, Any]) -> None:
+        """Mark a cached entry as fresh again after a 304 Not Modified."""
+        entry = dict(entry, fetched_at=time.time())
+        self._write(self._path_for(url), entry)
+        self._count("revalidated")
+
+    def _write(self, path: Path, entry: Dict[str, Any]) -> None:
+        tmp_name: Optional[str] = None
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temp file and rename, so concurrent readers never see partial entries
+            fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb") as f:
+                f.write(json.dumps(entry, ensure_ascii=False).encode("utf-8"))
+            os.replace(tmp_name, path)
+            tmp_name = None
+        except OSError as e:
+            logger.warning("Failed to write cache entry %s: %s", path.as_posix(), e)
+        finally:
+            # A failed write or rename must not leave its temp file behind
+            if tmp_name is not None:
+                try:
+                    os.unlink(tmp_name)
+                except OSError:
+                    pass
+
+    def evict(self) -> int:
+        """Remove stale entries, then the oldest ones until under the size limit."""
+        now = time.time()
+        entries = []
+        removed = 0
+        for path in self.cache_dir.glob("*/*.json.gz"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if now - stat.st_mtime > self.max_stale_seconds:
+                path.unlink(missing_ok=True)
+                removed += 1
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_size_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+
+        if removed:
+            logger.info("Evicted %d cache entry(ies) from %s.", removed, self.cache_dir.as_posix())
+        return removed
+
+    def log_stats(self) -> None:
+        with self._lock:
+            stats = dict(self.stats)
+        logger.info(
+            "HTTP cache: %d hit(s), %d revalidated, %d miss(es), %d stored.",
+            stats["hits"], stats["revalidated"], stats["misses"], stats["stores"],
+        )
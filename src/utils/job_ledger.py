@@ -0,0 +1,123 @@
+import logging
+import sqlite3
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+STATUS_PENDING = "pending"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+class JobLedger:
+    """
+    Persistent per-URL job state backed by SQLite.
+
+    Each URL row records its status (pending/done/failed), the number of
+    attempts, the last HTTP status code and, for finished URLs, the byte range
+    its record occupies in the output file. A resumed run skips URLs that are
+    done and truncates the output back to the end of the last committed
+    record, so nothing is duplicated or half-written.
+
+    Updates are committed every `commit_every` changes and on close, or only
+    on close when `commit_every` is 0. `before_commit`, if given, runs
+    first; batching output sinks use it to make their records durable before
+    the URLs are recorded as done. If the output fails, `rollback()` drops
+    everything since the last commit so those URLs are not taken for done on
+    resume.
+    """
+
+    def __init__(self, path: Path, commit_every: int = 50,
+                 before_commit: Optional[Callable[[], None]] = None) -> None:
+        self.path = path
+        self.commit_every = max(0, commit_every)
+        self.before_commit = before_commit
+        self._uncommitted = 0
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path.as_posix())
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                url TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_http_code INTEGER,
+                output_offset INTEGER,
+                output_end INTEGER,
+                updated_at REAL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def reset(self) -> None:
+        """Forget all previous state (a fresh run overwrites the output)."""
+        self._conn.execute("DELETE FROM jobs")
+        self._conn.commit()
+
+    def add_pending(self, url: str) -> None:
+        self._conn.execute(
+            "INSERT OR IGNORE INTO jobs (url, status, updated_at) VALUES (?, ?, ?)",
+            (url, STATUS_PENDING, time.time()),
+        )
+        self._count_change()
+
+    def done_urls(self) -> Set[str]:
+        rows = self._conn.execute("SELECT url FROM jobs WHERE status = ?", (STATUS_DONE,))
+        return {url for (url,) in rows}
+
+    def committed_output_end(self) -> int:
+        row = self._conn.execute(
+            "SELECT MAX(output_end) FROM jobs WHERE status = ?", (STATUS_DONE,)
+        ).fetchone()
+        return int(row[0] or 0)
+
+    def _update(self, url: str, status: str, http_code: Optional[int],
+                offset: Optional[int] = None, end: Optional[int] = None) -> None:
+        self._conn.execute(
+            """
+            INSERT INTO jobs (url, status, attempts, last_http_code, output_offset, output_end, updated_at)
+            VALUES (?, ?, 1, ?, ?, ?, ?)
+            ON CONFLICT(url) DO UPDATE SET
+                status = excluded.status,
+                attempts = jobs.attempts + 1,
+                last_http_code = COALESCE(excluded.last_http_code, jobs.last_http_code),
+                output_offset = excluded.output_offset,
+                output_end = excluded.output_end,
+                updated_at = excluded.updated_at
+            """,
+            (url, status, http_code, offset, end, time.time()),
+        )
+        self._count_change()
+
+    def record_done(self, url: str, http_code: Optional[int], offset: int, end: int) -> None:
+        self._update(url, STATUS_DONE, http_code, offset, end)
+
+    def record_failed(self, url: str, http_code: Optional[int]) -> None:
+        self._update(url, STATUS_FAILED, http_code)
+
+    def counts(self) -> Dict[str, int]:
+        rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status")
+        return {status: count for status, count in rows}
+
+    def _count_change(self) -> None:
+        self._uncommitted += 1
+        if self.commit_every and self._uncommitted >= self.commit_every:
+            self.commit()
+
+    def commit(self) -> None:
+        if self.before_commit is not None:
+            self.before_commit()
+        self._conn.commit()
+        self._uncommitted = 0
+
+    def rollback(self) -> None:
+        self._conn.rollback()
+        self._uncommitted = 0
+
+    def close(self) -> None:
+        self.commit()
+        self._conn.close()
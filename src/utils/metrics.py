@@ -0,0 +1,222 @@
+import functools
+import json
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+# Histogram upper bounds in seconds; the implicit last bucket is +Inf
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+MetricKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+def _key(name: str, labels: Dict[str, Any]) -> MetricKey:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def merge(self, counts: List[int], count: int, total: float) -> None:
+        for i, c in enumerate(counts):
+            self.counts[i] += c
+        self.count += count
+        self.sum += total
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Approximate quantile: the upper bound of the bucket holding it."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, c in zip(self.buckets, self.counts):
+            seen += c
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+class MetricsRegistry:
+    """
+    Thread-safe counters and latency histograms.
+
+    Metrics are identified by name plus labels, e.g.
+    `timer("parser_extract_seconds", extractor="json_ld")`. Worker processes
+    ship their metrics to the parent with `snapshot(reset=True)` / `merge()`.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: Dict[MetricKey, float] = {}
+        self._histograms: Dict[MetricKey, Histogram] = {}
+
+    def inc(self, name: str, amount: float = 1, **labels: Any) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels: Any) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def timed(self, name: str, **labels: Any) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+        """Decorator form of `timer`."""
+        def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
+            @functools.wraps(fn)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                with self.timer(name, **labels):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def snapshot(self, reset: bool = False) -> Dict[str, Any]:
+        """Picklable copy of all metrics, optionally clearing them."""
+        with self._lock:
+            snap = {
+                "counters": list(self._counters.items()),
+                "histograms": [
+                    (key, list(h.counts), h.count, h.sum) for key, h in self._histograms.items()
+                ],
+            }
+            if reset:
+                self._counters.clear()
+                self._histograms.clear()
+        return snap
+
+    def merge(self, snap: Dict[str, Any]) -> None:
+        with self._lock:
+            for key, value in snap["counters"]:
+                self._counters[key] = self._counters.get(key, 0) + value
+            for key, counts, count, total in snap["histograms"]:
+                histogram = self._histograms.get(key)
+                if histogram is None:
+                    histogram = self._histograms[key] = Histogram()
+                histogram.merge(counts, count, total)
+
+    # -------------------- Export --------------------
+
+    @staticmethod
+    def _labels(labels: Tuple[Tuple[str, str], ...], extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = list(labels) + ([extra] if extra else [])
+        if not pairs:
+            return ""
+        body = ",".join('%s="%s"' % (k, v.replace("\\", "\\\\").replace('"', '\\"')) for k, v in pairs)
+        return "{" + body + "}"
+
+    def to_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        typed = set()
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted((key, h) for key, h in self._histograms.items())
+            for (name, labels), value in counters:
+                if name not in typed:
+                    lines.append(f"# TYPE {name} counter")
+                    typed.add(name)
+                lines.append(f"{name}{self._labels(labels)} {value:g}")
+            for (name, labels), h in histograms:
+                if name not in typed:
+                    lines.append(f"# TYPE {name} histogram")
+                    typed.add(name)
+                cumulative = 0
+                for bound, c in zip(h.buckets, h.counts):
+                    cumulative += c
+                    lines.append(f"{name}_bucket{self._labels(labels, ('le', f'{bound:g}'))} {cumulative}")
+                lines.append(f"{name}_bucket{self._labels(labels, ('le', '+Inf'))} {h.count}")
+                lines.append(f"{name}_sum{self._labels(labels)} {h.sum:.6f}")
+                lines.append(f"{name}_count{self._labels(labels)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def report(self) -> Dict[str, Any]:
+        """End-of-run summary with histogram buckets and approximate quantiles."""
+        def label_str(labels: Tuple[Tuple[str, str], ...]) -> str:
+            return ",".join(f"{k}={v}" for k, v in labels)
+
+        with self._lock:
+            counters = {
+                f"{name}{{{label_str(labels)}}}" if labels else name: value
+                for (name, labels), value in sorted(self._counters.items())
+            }
+            histograms = {}
+            for (name, labels), h in sorted(self._histograms.items()):
+                histograms[f"{name}{{{label_str(labels)}}}" if labels else name] = {
+                    "count": h.count,
+                    "sum_seconds": round(h.sum, 6),
+                    "mean_seconds": round(h.sum / h.count, 6) if h.count else None,
+                    "p50_seconds": h.quantile(0.5),
+                    "p95_seconds": h.quantile(0.95),
+                    "p99_seconds": h.quantile(0.99),
+                    "buckets": {
+                        **{f"{bound:g}": c for bound, c in zip(h.buckets, h.counts)},
+                        "+Inf": h.counts[-1],
+                    },
+                }
+        return {"counters": counters, "histograms": histograms}
+
+    def write_prometheus(self, path: Path) -> None:
+        # Rename into place so a scraping node_exporter never reads a partial file
+        tmp = path.with_name(path.name + ".tmp")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_text(self.to_prometheus(), encoding="utf-8")
+        tmp.replace(path)
+
+    def write_report(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.report(), indent=2), encoding="utf-8")
+
+    def serve(self, port: int, host: str = "127.0.0.1") -> "ThreadingHTTPServer":
+        """Expose /metrics over HTTP from a daemon thread."""
+        # http.server pulls in http.client, ssl and email; only load it when serving
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                body = registry.to_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                logger.debug("metrics endpoint: " + format, *args)
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+        logger.info("Serving Prometheus metrics on http://%s:%d/metrics", host, port)
+        return server
+
+# Process-wide registry used by the parser, extractors, cleaner and pipeline
+METRICS = MetricsRegistry()
@@ -0,0 +1,171 @@
+import gzip
+import logging
+import os
+from pathlib import Path
+from typing import Any, BinaryIO, Mapping, Optional, Union
+
+from utils.records import CompanyRecord, as_dict
+from utils.serialization import JsonCodec, get_codec
+
+logger = logging.getLogger(__name__)
+
+OUTPUT_FORMATS = ("json", "jsonl")
+COMPRESSIONS = ("gzip", "zstd")
+
+def _import_zstandard() -> Any:
+    try:
+        import zstandard
+    except ImportError as e:
+        raise RuntimeError("zstd output requires the 'zstandard' package") from e
+    return zstandard
+
+class RecordWriter:
+    """
+    Incremental writer for normalized company records.
+
+    The file is opened lazily on the first record, so a run that scrapes
+    nothing leaves no output behind; closing such a run also removes the
+    file an earlier run left at `output_path`. Every record is flushed as soon as it is
+    written, and the file is fsync'ed every `fsync_every` records (0 disables
+    explicit fsync), bounding what a crash can lose. Records are encoded by
+    `codec`, which produces the same bytes whichever JSON library it uses.
+    """
+
+    durable_checkpoints = True
+
+    def __init__(
+        self,
+        output_path: Path,
+        compression: Optional[str] = None,
+        fsync_every: int = 100,
+        codec: Optional[JsonCodec] = None,
+    ) -> None:
+        if compression and compression not in COMPRESSIONS:
+            raise ValueError(f"Unsupported output compression: {compression!r}")
+        if compression == "zstd":
+            _import_zstandard()
+        self.output_path = output_path
+        self.target = output_path.as_posix()
+        self.compression = compression
+        self.fsync_every = fsync_every
+        self.codec = codec or get_codec()
+        self.count = 0
+        self.bytes_written = 0
+        self._append_offset: Optional[int] = None
+        self._raw: Optional[BinaryIO] = None
+        self._stream: Optional[BinaryIO] = None
+        self._closed = False
+
+    def append_from(self, offset: int, count: int) -> None:
+        """
+        Continue an existing output file instead of overwriting it.
+
+        The file is truncated to `offset` (the end of the last committed
+        record) and writing resumes as if `count` records had been written.
+        """
+        if self.compression:
+            raise ValueError("Resuming into a compressed output file is not supported")
+        if offset <= 0 or not self.output_path.exists():
+            return
+        self._append_offset = min(offset, self.output_path.stat().st_size)
+        self.bytes_written = self._append_offset
+        self.count = count
+
+    def _open(self) -> None:
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        if self._append_offset is not None:
+            self._raw = self.output_path.open("r+b")
+            self._raw.truncate(self._append_offset)
+            self._raw.seek(self._append_offset)
+        else:
+            self._raw = self.output_path.open("wb")
+        if self.compression == "gzip":
+            self._stream = gzip.GzipFile(fileobj=self._raw, mode="wb")
+        elif self.compression == "zstd":
+            self._stream = _import_zstandard().ZstdCompressor().stream_writer(self._raw, closefd=False)
+        else:
+            self._stream = self._raw
+
+    def _write_bytes(self, data: bytes) -> None:
+        if self._stream is None:
+            self._open()
+        self._stream.write(data)
+        self.bytes_written += len(data)
+
+    def _flush(self, sync: bool = False) -> None:
+        self._stream.flush()
+        if self._stream is not self._raw:
+            self._raw.flush()
+        if sync:
+            os.fsync(self._raw.fileno())
+
+    def _format_record(self, record: Mapping[str, Any]) -> bytes:
+        raise NotImplementedError
+
+    def _footer(self) -> bytes:
+        return b""
+
+    def write(self, record: Union[CompanyRecord, Mapping[str, Any]]) -> None:
+        self._write_bytes(self._format_record(as_dict(record)))
+        self.count += 1
+        self._flush(sync=self.fsync_every > 0 and self.count % self.fsync_every == 0)
+
+    def checkpoint(self) -> None:
+        """Nothing to do: every record is flushed as soon as it is written."""
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        if self._stream is None:
+            if self._append_offset is None:
+                # Not resuming and nothing written: do not leave the last run's file looking current
+                self.output_path.unlink(missing_ok=True)
+                return
+            # Resumed with nothing left to write; still truncate and restore the footer
+            self._open()
+        self._write_bytes(self._footer())
+        self._flush(sync=self.fsync_every > 0)
+        if self._stream is not self._raw:
+            self._stream.close()
+        self._raw.close()
+        self._stream = self._raw = None
+
+    def __enter__(self) -> "RecordWriter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+class JsonLinesWriter(RecordWriter):
+    """One compact JSON object per line (NDJSON)."""
+
+    def _format_record(self, record: Mapping[str, Any]) -> bytes:
+        return self.codec.line(record) + b"\n"
+
+class JsonArrayWriter(RecordWriter):
+    """
+    Pretty-printed JSON array, byte-identical to
+    `json.dump(records, f, indent=2, ensure_ascii=False)`, written record by record.
+    """
+
+    def _format_record(self, record: Mapping[str, Any]) -> bytes:
+        body = self.codec.pretty(record).replace(b"\n", b"\n  ")
+        prefix = b"[\n  " if self.count == 0 else b",\n  "
+        return prefix + body
+
+    def _footer(self) -> bytes:
+        return b"\n]"
+
+def open_record_writer(
+    output_path: Path,
+    output_format: str = "json",
+    compression: Optional[str] = None,
+    fsync_every: int = 100,
+    codec: Optional[JsonCodec] = None,
+) -> RecordWriter:
+    if output_format == "jsonl":
+        return JsonLinesWriter(output_path, compression=compression, fsync_every=fsync_every, codec=codec)
+    if output_format == "json":
+        return JsonArrayWriter(output_path, compression=compression, fsync_every=fsync_every, codec=codec)
+    raise ValueError(f"Unsupported output format: {output_format!r}")
@@ -0,0 +1,206 @@
+import logging
+import random
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urlparse, urlsplit, urlunsplit
+
+from utils.metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+ROTATION_MODES = ("request", "host")
+
+# Where LinkedIn sends clients it wants to sign in before showing a page
+DEFAULT_BLOCK_URL_PATTERNS = ("/authwall", "/login", "/checkpoint/", "/uas/login")
+
+def proxy_label(proxy: str) -> str:
+    """The proxy URL without credentials, for logs and metric labels."""
+    parts = urlsplit(proxy)
+    netloc = parts.hostname or ""
+    if parts.port:
+        netloc = f"{netloc}:{parts.port}"
+    return urlunsplit((parts.scheme, netloc, "", "", ""))
+
+class ProxyState:
+    def __init__(self, url: str) -> None:
+        self.url = url
+        self.label = proxy_label(url)
+        self.successes = 0
+        self.failures = 0
+        self.blocks = 0
+        self.consecutive_failures = 0
+        self.quarantines = 0
+        self.latency: Optional[float] = None
+        self.quarantined_until = 0.0
+
+    def score(self) -> float:
+        # Laplace-smoothed success rate per second of latency; untried proxies
+        # look fast so each one gets probed early
+        success_rate = (self.successes + 1) / (self.successes + self.failures + self.blocks + 2)
+        return success_rate / max(self.latency if self.latency is not None else 0.1, 0.01)
+
+class ProxyPool:
+    """
+    Rotating pool of egress proxies with health scoring.
+
+    Each proxy keeps a latency average (EWMA of time to headers) and its
+    success, failure and block counts. Requests go to the better-scoring of
+    two random healthy proxies ("power of two choices"): fast, reliable
+    proxies get most of the traffic without the whole run piling onto one.
+    With `rotation: host` a host sticks to one proxy until that proxy is
+    quarantined.
+
+    A block signal (a throttling status or a redirect to a login wall)
+    quarantines the proxy for `quarantine_seconds`, doubling with every
+    further quarantine up to `max_quarantine_seconds`; `failure_threshold`
+    consecutive connection errors do the same. If every proxy is in
+    quarantine, `choose` waits for the first release, or gives up when that
+    is more than `max_wait_seconds` away; a quarantined proxy is never used.
+    """
+
+    def __init__(
+        self,
+        proxies: Iterable[str],
+        rotation: str = "request",
+        quarantine_seconds: float = 300,
+        max_quarantine_seconds: float = 3600,
+        failure_threshold: int = 3,
+        block_url_patterns: Iterable[str] = DEFAULT_BLOCK_URL_PATTERNS,
+        latency_alpha: float = 0.3,
+        max_wait_seconds: float = 300,
+    ) -> None:
+        if rotation not in ROTATION_MODES:
+            raise ValueError(f"Unsupported proxy rotation {rotation!r}")
+        self.proxies: Dict[str, ProxyState] = {url: ProxyState(url) for url in proxies}
+        if not self.proxies:
+            raise ValueError("A proxy pool needs at least one proxy URL")
+        self.rotation = rotation
+        self.quarantine_seconds = quarantine_seconds
+        self.max_quarantine_seconds = max(max_quarantine_seconds, quarantine_seconds)
+        self.failure_threshold = max(1, failure_threshold)
+        self.block_url_patterns = tuple(block_url_patterns)
+        self.latency_alpha = latency_alpha
+        self.max_wait_seconds = max_wait_seconds
+        self._sticky: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings: Any) -> Optional["ProxyPool"]:
+        # A bare list is shorthand for {"urls": [...]}
+        if isinstance(settings, list):
+            settings = {"urls": settings}
+        settings = settings or {}
+        urls = settings.get("urls") or []
+        if not urls:
+            return None
+        return cls(
+            urls,
+            rotation=settings.get("rotation", "request"),
+            quarantine_seconds=float(settings.get("quarantine_seconds", 300)),
+            max_quarantine_seconds=float(settings.get("max_quarantine_seconds", 3600)),
+            failure_threshold=int(settings.get("failure_threshold", 3)),
+            block_url_patterns=settings.get("block_url_patterns") or DEFAULT_BLOCK_URL_PATTERNS,
+            max_wait_seconds=float(settings.get("max_wait_seconds", 300)),
+        )
+
+    def choose(self, url: str) -> Optional[str]:
+        """
+        Pick the proxy for a request to `url`.
+
+        Blocks while every proxy is quarantined; returns None if none will
+        be released within `max_wait_seconds`.
+        """
+        while True:
+            chosen = self._choose_healthy(url)
+            if chosen is not None:
+                return chosen
+            with self._lock:
+                soonest = min(self.proxies.values(), key=lambda p: p.quarantined_until)
+                wait = soonest.quarantined_until - time.monotonic()
+            if wait > self.max_wait_seconds:
+                logger.warning("All proxies are quarantined; %s is released first, in %.0fs.", soonest.label, wait)
+                return None
+            if wait > 0:
+                logger.warning("All proxies are quarantined; waiting %.1fs for %s.", wait, soonest.label)
+                time.sleep(wait)
+
+    def _choose_healthy(self, url: str) -> Optional[str]:
+        now = time.monotonic()
+        with self._lock:
+            healthy = [p for p in self.proxies.values() if p.quarantined_until <= now]
+            if not healthy:
+                return None
+            if self.rotation == "host":
+                host = urlparse(url).netloc.lower()
+                sticky = self.proxies.get(self._sticky.get(host, ""))
+                if sticky is not None and sticky.quarantined_until <= now:
+                    return sticky.url
+            candidates = random.sample(healthy, 2) if len(healthy) > 1 else healthy
+            chosen = max(candidates, key=ProxyState.score)
+            if self.rotation == "host":
+                self._sticky[urlparse(url).netloc.lower()] = chosen.url
+            return chosen.url
+
+    def is_block_redirect(self, final_url: str) -> bool:
+        path = urlparse(final_url).path.lower()
+        return any(pattern in path for pattern in self.block_url_patterns)
+
+    def record_success(self, proxy: str, latency: float) -> None:
+        with self._lock:
+            state = self.proxies[proxy]
+            state.successes += 1
+            state.consecutive_failures = 0
+            if state.latency is None:
+                state.latency = latency
+            else:
+                state.latency += self.latency_alpha * (latency - state.latency)
+        METRICS.inc("proxy_requests_total", proxy=state.label, outcome="success")
+
+    def record_failure(self, proxy: str) -> None:
+        with self._lock:
+            state = self.proxies[proxy]
+            state.failures += 1
+            state.consecutive_failures += 1
+            if state.consecutive_failures >= self.failure_threshold:
+                state.consecutive_failures = 0
+                self._quarantine(state, "connection failures")
+        METRICS.inc("proxy_requests_total", proxy=state.label, outcome="failure")
+
+    def record_block(self, proxy: str, reason: str) -> None:
+        with self._lock:
+            state = self.proxies[proxy]
+            state.blocks += 1
+            # Requests already in flight when the proxy was quarantined don't extend it
+            if state.quarantined_until <= time.monotonic():
+                self._quarantine(state, reason)
+        METRICS.inc("proxy_requests_total", proxy=state.label, outcome="blocked")
+
+    def _quarantine(self, state: ProxyState, reason: str) -> None:
+        # Repeat offenders stay out longer
+        state.quarantines += 1
+        duration = min(self.max_quarantine_seconds, self.quarantine_seconds * 2 ** (state.quarantines - 1))
+        state.quarantined_until = time.monotonic() + duration
+        METRICS.inc("proxy_quarantines_total", proxy=state.label)
+        logger.warning("Quarantining proxy %s for %.0fs after %s.", state.label, duration, reason)
+
+    def summary(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [
+                {
+                    "proxy": state.label,
+                    "successes": state.successes,
+                    "failures": state.failures,
+                    "blocks": state.blocks,
+                    "latency_seconds": round(state.latency, 3) if state.latency is not None else None,
+                }
+                for state in self.proxies.values()
+            ]
+
+    def log_stats(self) -> None:
+        for entry in self.summary():
+            logger.info(
+                "Proxy %s: %d ok, %d failed, %d blocked, latency %s.",
+                entry["proxy"], entry["successes"], entry["failures"], entry["blocks"],
+                f"{entry['latency_seconds']:.3f}s" if entry["latency_seconds"] is not None else "n/a",
+            )
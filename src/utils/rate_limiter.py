@@ -0,0 +1,152 @@
+import email.utils
+import logging
+import random
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_THROTTLE_STATUS_CODES = (429, 999)
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP-date) into seconds."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    Callers reserve a token and are told how long to wait for it, so waiting
+    happens outside the lock and concurrent workers are spaced out evenly.
+    """
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+class RateLimiter:
+    """
+    Per-host rate limiting with adaptive backoff and a global circuit breaker.
+
+    - Every request first takes a token from its host's bucket. Requests sent
+      through a proxy use a separate bucket per (host, proxy) pair, so each
+      egress IP gets the full per-host rate.
+    - A throttling response (429/999 by default) pauses the host for the
+      Retry-After period, or for an exponential backoff with jitter.
+    - After `circuit_breaker_threshold` consecutive throttles the breaker
+      opens and every worker pauses for `circuit_breaker_cooldown_seconds`.
+      Throttles received through a proxy do not count; the proxy pool
+      quarantines that proxy instead.
+    """
+
+    def __init__(self, settings: Optional[Dict[str, Any]] = None, base_delay: float = 2.0) -> None:
+        settings = settings or {}
+        self.requests_per_second = float(settings.get("requests_per_second", 0))
+        self.burst = int(settings.get("burst", 1))
+        self.backoff_base = float(settings.get("backoff_base_seconds", base_delay))
+        self.backoff_max = float(settings.get("backoff_max_seconds", 60))
+        self.max_retry_after = float(settings.get("max_retry_after_seconds", 300))
+        self.breaker_threshold = int(settings.get("circuit_breaker_threshold", 3))
+        self.breaker_cooldown = float(settings.get("circuit_breaker_cooldown_seconds", 60))
+        codes: Iterable[int] = settings.get("throttle_status_codes") or DEFAULT_THROTTLE_STATUS_CODES
+        self.throttle_status_codes = frozenset(int(code) for code in codes)
+
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._host_paused_until: Dict[str, float] = {}
+        self._global_paused_until = 0.0
+        self._consecutive_throttles = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _host(url: str, egress: Optional[str] = None) -> str:
+        host = urlparse(url).netloc.lower()
+        return f"{host} via {egress}" if egress else host
+
+    def _bucket(self, host: str) -> TokenBucket:
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets.setdefault(host, TokenBucket(self.requests_per_second, self.burst))
+        return bucket
+
+    def acquire(self, url: str, egress: Optional[str] = None) -> None:
+        """Block until a request to `url` (through proxy `egress`, if any) is allowed."""
+        host = self._host(url, egress)
+        while True:
+            with self._lock:
+                paused_until = max(self._global_paused_until, self._host_paused_until.get(host, 0.0))
+            pause = paused_until - time.monotonic()
+            if pause <= 0:
+                break
+            logger.debug("Rate limiter paused for %s; waiting %.2fs", host, pause)
+            time.sleep(pause)
+
+        wait = self._bucket(host).reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    def is_throttled(self, status_code: int) -> bool:
+        return status_code in self.throttle_status_codes
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Exponential backoff with equal jitter for the given 1-based attempt."""
+        delay = min(self.backoff_max, self.backoff_base * (2 ** max(0, attempt - 1)))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def record_throttle(self, url: str, attempt: int, retry_after: Optional[str] = None,
+                        egress: Optional[str] = None) -> float:
+        """Register a throttling response and return the pause applied to the host."""
+        delay = parse_retry_after(retry_after)
+        if delay is None:
+            delay = self.backoff_delay(attempt)
+        else:
+            delay = min(delay, self.max_retry_after)
+
+        host = self._host(url, egress)
+        now = time.monotonic()
+        with self._lock:
+            self._host_paused_until[host] = max(self._host_paused_until.get(host, 0.0), now + delay)
+            if egress is not None:
+                return delay
+            self._consecutive_throttles += 1
+            if self.breaker_threshold > 0 and self._consecutive_throttles >= self.breaker_threshold:
+                self._global_paused_until = max(self._global_paused_until, now + self.breaker_cooldown)
+                self._consecutive_throttles = 0
+                logger.warning(
+                    "Circuit breaker opened after repeated throttling; pausing all workers for %.0fs",
+                    self.breaker_cooldown,
+                )
+        return delay
+
+    def record_success(self, url: str) -> None:
+        with self._lock:
+            self._consecutive_throttles = 0
@@ -0,0 +1,139 @@
+import sys
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Tuple, Type, Union
+
+class Location(NamedTuple):
+    address: Optional[str] = None
+    map_url: Optional[str] = None
+
+class Employee(NamedTuple):
+    employee_name: Optional[str] = None
+    employee_position: Optional[str] = None
+    employee_profile_url: Optional[str] = None
+
+class Update(NamedTuple):
+    text: Optional[str] = None
+    articlePostedDate: Optional[str] = None
+    totalLikes: Optional[str] = None
+
+class SimilarCompany(NamedTuple):
+    company_name: Optional[str] = None
+    profile_url: Optional[str] = None
+
+# Shape of a normalized record, in output key order; columnar sinks derive
+# their schema from these, so keep them in step with `CompanyRecord`
+RECORD_SCALAR_FIELDS = (
+    "company_name", "universal_name_id", "background_cover_image_url", "linkedin_internal_id",
+    "industry", "location", "follower_count", "tagline", "company_size_on_linkedin", "about",
+    "website", "company_size", "headquarters", "type", "founded", "specialties",
+)
+RECORD_INT_FIELDS = ("follower_count",)
+RECORD_LIST_ITEMS: Dict[str, Type[Tuple[Any, ...]]] = {
+    "locations": Location,
+    "employees": Employee,
+    "updates": Update,
+    "similar_companies": SimilarCompany,
+}
+RECORD_LIST_FIELDS = {field: item_type._fields for field, item_type in RECORD_LIST_ITEMS.items()}
+RECORD_TRAILING_FIELDS = ("source_url",)
+
+class CompanyRecord(NamedTuple):
+    """
+    A normalized company, as produced by the cleaner.
+
+    A tuple with named fields costs a fraction of the equivalent dict and
+    pickles to little more than its values, which matters when records are
+    buffered by the thousand or shipped back from parser processes. List
+    fields hold `Location`, `Employee`, `Update` and `SimilarCompany` tuples.
+    They and `source_url` are None when the company has none; `to_dict()`
+    leaves those out, giving exactly the mapping the output formats expect.
+    """
+
+    company_name: Optional[str] = None
+    universal_name_id: Optional[str] = None
+    background_cover_image_url: Optional[str] = None
+    linkedin_internal_id: Optional[str] = None
+    industry: Optional[str] = None
+    location: Optional[str] = None
+    follower_count: Optional[int] = None
+    tagline: Optional[str] = None
+    company_size_on_linkedin: Optional[str] = None
+    about: Optional[str] = None
+    website: Optional[str] = None
+    company_size: Optional[str] = None
+    headquarters: Optional[str] = None
+    type: Optional[str] = None
+    founded: Optional[str] = None
+    specialties: Optional[str] = None
+    locations: Optional[List[Location]] = None
+    employees: Optional[List[Employee]] = None
+    updates: Optional[List[Update]] = None
+    similar_companies: Optional[List[SimilarCompany]] = None
+    source_url: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = dict(zip(RECORD_SCALAR_FIELDS, self))
+        for field in RECORD_LIST_FIELDS:
+            items = getattr(self, field)
+            if items is not None:
+                data[field] = [dict(zip(item._fields, item)) for item in items]
+        if self.source_url is not None:
+            data["source_url"] = self.source_url
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "CompanyRecord":
+        """Rebuild a record from `to_dict()` output, e.g. one stored by a previous run."""
+        unknown = set(data) - _FIELD_SET
+        if unknown:
+            raise ValueError(f"Unknown company record fields: {sorted(unknown)}")
+        for field in RECORD_SCALAR_FIELDS + RECORD_TRAILING_FIELDS:
+            value = data.get(field)
+            expected = int if field in RECORD_INT_FIELDS else str
+            if value is not None and type(value) is not expected:
+                raise ValueError(f"Company record field {field!r} must be {expected.__name__} or null")
+        fields = dict(data)
+        for field, item_type in RECORD_LIST_ITEMS.items():
+            items = data.get(field)
+            if items is None:
+                continue
+            if not isinstance(items, list) or not all(isinstance(item, Mapping) for item in items):
+                raise ValueError(f"Company record field {field!r} must be a list of objects or absent")
+            try:
+                fields[field] = [item_type(**item) for item in items]
+            except TypeError as e:
+                raise ValueError(f"Invalid {field!r} entry: {e}") from e
+        return cls(**fields)
+
+_FIELD_SET = frozenset(CompanyRecord._fields)
+
+# Categorical values that repeat across many companies
+INTERNED_FIELDS = (
+    "industry", "location", "company_size_on_linkedin", "company_size", "headquarters", "type", "founded",
+)
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if type(value) is str else value
+
+def intern_record(record: CompanyRecord) -> CompanyRecord:
+    """
+    Share one string object per distinct categorical value.
+
+    Values such as industry, company size or an employee's position repeat
+    across thousands of records; interning keeps one copy of each in memory
+    while records are buffered. Records that cross a process boundary are
+    unpickled with fresh strings, so the receiving side interns them again.
+    """
+    changes: Dict[str, Any] = {field: _intern(getattr(record, field)) for field in INTERNED_FIELDS}
+    if record.employees:
+        changes["employees"] = [
+            emp._replace(employee_position=_intern(emp.employee_position)) for emp in record.employees
+        ]
+    if record.updates:
+        changes["updates"] = [
+            upd._replace(articlePostedDate=_intern(upd.articlePostedDate)) for upd in record.updates
+        ]
+    return record._replace(**changes)
+
+def as_dict(record: Union[CompanyRecord, Mapping[str, Any]]) -> Mapping[str, Any]:
+    """The mapping to serialize for a record; plain mappings pass through."""
+    return record.to_dict() if isinstance(record, CompanyRecord) else record
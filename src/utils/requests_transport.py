@@ -0,0 +1,89 @@
+import socket
+import time
+from typing import Any, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+
+from utils.transport import READ_CHUNK_BYTES, Response, Transport, TransportError
+
+class RequestsTransport(Transport):
+    """
+    requests/urllib3 transport (HTTP/1.1).
+
+    One connection pool per host, each keeping up to `pool_maxsize`
+    keep-alive connections; `pool_block` makes threads wait for a free
+    connection instead of opening throwaway ones beyond that.
+    """
+
+    def __init__(
+        self,
+        headers: Dict[str, str],
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+        tcp_keepalive: bool = True,
+        max_body_bytes: int = 10 * 1024 * 1024,
+        dns_cache_ttl_seconds: float = 300,
+    ) -> None:
+        super().__init__(max_body_bytes, dns_cache_ttl_seconds)
+        self.session = requests.Session()
+        self.session.headers.update(headers)
+        adapter = _KeepAliveAdapter(
+            tcp_keepalive,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get(self, url: str, timeout: float, headers: Optional[Dict[str, str]] = None,
+            proxy: Optional[str] = None) -> Response:
+        proxies = {"http": proxy, "https": proxy} if proxy else None
+        started = time.perf_counter()
+        try:
+            resp = self.session.get(url, timeout=timeout, headers=headers, proxies=proxies, stream=True)
+        except requests.RequestException as e:
+            raise TransportError(str(e), kind=type(e).__name__) from e
+        to_headers = time.perf_counter() - started
+        try:
+            self._check_declared_length(url, resp.headers)
+            chunks: List[bytes] = []
+            size = 0
+            # iter_content decodes gzip/deflate (and br with brotli installed) as it reads
+            for chunk in resp.iter_content(READ_CHUNK_BYTES):
+                size += len(chunk)
+                self._check_read_length(url, size)
+                chunks.append(chunk)
+        except requests.RequestException as e:
+            raise TransportError(str(e), kind=type(e).__name__) from e
+        finally:
+            resp.close()
+        # Hand the body back to requests so .text keeps its charset detection
+        resp._content = b"".join(chunks)
+        return Response(resp.status_code, resp.url, resp.headers, resp.text, size, to_headers)
+
+    def close(self) -> None:
+        self.session.close()
+        super().close()
+
+class _KeepAliveAdapter(HTTPAdapter):
+    def __init__(self, tcp_keepalive: bool, **kwargs: Any) -> None:
+        self.tcp_keepalive = tcp_keepalive
+        super().__init__(**kwargs)
+
+    def _socket_options(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        if self.tcp_keepalive:
+            # Let the OS notice dead idle connections instead of failing the next request
+            kwargs["socket_options"] = HTTPConnection.default_socket_options + [
+                (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+            ]
+        return kwargs
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        super().init_poolmanager(*args, **self._socket_options(kwargs))
+
+    def proxy_manager_for(self, proxy: str, **proxy_kwargs: Any) -> Any:
+        return super().proxy_manager_for(proxy, **self._socket_options(proxy_kwargs))
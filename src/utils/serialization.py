@@ -0,0 +1,114 @@
+import json
+from functools import lru_cache
+from typing import Any, Tuple, Type
+
+JSON_LIBRARIES = ("auto", "orjson", "msgspec", "json")
+
+def _import_orjson() -> Any:
+    try:
+        import orjson
+    except ImportError as e:
+        raise RuntimeError("json_library 'orjson' requires the 'orjson' package") from e
+    return orjson
+
+def _import_msgspec() -> Any:
+    try:
+        import msgspec
+    except ImportError as e:
+        raise RuntimeError("json_library 'msgspec' requires the 'msgspec' package") from e
+    return msgspec
+
+def _try_import(importer: Any) -> Any:
+    try:
+        return importer()
+    except RuntimeError:
+        return None
+
+class JsonCodec:
+    """
+    JSON encoding for output files, change fingerprints and stored records.
+
+    Every method returns exactly the bytes of the stdlib call named in its
+    docstring, whichever library does the work, so output, fingerprints and
+    resume offsets do not depend on what is installed. With `library="auto"`
+    each form uses the fastest installed library that produces it: orjson
+    for indented and canonical JSON, msgspec for the default separators
+    (orjson cannot emit them), and stdlib `json` otherwise. Values a fast
+    library rejects, such as integers beyond 64 bits, are encoded by stdlib
+    `json`, which fails or succeeds as it always has.
+    """
+
+    def __init__(self, library: str = "auto") -> None:
+        if library not in JSON_LIBRARIES:
+            raise ValueError(f"Unsupported JSON library {library!r}; expected one of {list(JSON_LIBRARIES)}")
+        orjson = msgspec = None
+        if library in ("auto", "orjson"):
+            orjson = _import_orjson() if library == "orjson" else _try_import(_import_orjson)
+        if library in ("auto", "msgspec"):
+            msgspec = _import_msgspec() if library == "msgspec" else _try_import(_import_msgspec)
+        self.library = library
+        self._orjson = orjson
+        self._msgspec = msgspec
+        errors: Tuple[Type[Exception], ...] = (TypeError, ValueError, OverflowError)
+        if msgspec is not None:
+            self._encoder = msgspec.json.Encoder()
+            self._sorted_encoder = msgspec.json.Encoder(order="sorted")
+            self._decoder = msgspec.json.Decoder()
+            errors += (msgspec.MsgspecError,)
+        if orjson is not None:
+            errors += (orjson.JSONEncodeError,)
+        self._errors = errors
+
+    def describe(self) -> str:
+        """Libraries in use, for the startup log."""
+        used = [name for name, lib in (("orjson", self._orjson), ("msgspec", self._msgspec)) if lib is not None]
+        return " + ".join(used) if used else "json (stdlib)"
+
+    def pretty(self, value: Any) -> bytes:
+        """`json.dumps(value, indent=2, ensure_ascii=False)`, UTF-8 encoded."""
+        try:
+            if self._orjson is not None:
+                return self._orjson.dumps(value, option=self._orjson.OPT_INDENT_2)
+            if self._msgspec is not None:
+                return self._msgspec.json.format(self._encoder.encode(value), indent=2)
+        except self._errors:
+            pass
+        return json.dumps(value, indent=2, ensure_ascii=False).encode("utf-8")
+
+    def line(self, value: Any) -> bytes:
+        """`json.dumps(value, ensure_ascii=False)`, UTF-8 encoded."""
+        if self._msgspec is not None:
+            try:
+                # indent=0 keeps everything on one line with ", " and ": " separators
+                return self._msgspec.json.format(self._encoder.encode(value), indent=0)
+            except self._errors:
+                pass
+        return json.dumps(value, ensure_ascii=False).encode("utf-8")
+
+    def compact(self, value: Any, sort_keys: bool = False) -> bytes:
+        """`json.dumps(value, sort_keys=..., ensure_ascii=False, separators=(",", ":"))`, UTF-8 encoded."""
+        try:
+            if self._orjson is not None:
+                return self._orjson.dumps(value, option=self._orjson.OPT_SORT_KEYS if sort_keys else 0)
+            if self._msgspec is not None:
+                return (self._sorted_encoder if sort_keys else self._encoder).encode(value)
+        except self._errors:
+            pass
+        return json.dumps(value, sort_keys=sort_keys, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def loads(self, data: Any) -> Any:
+        """`json.loads(data)`, except that orjson reads integers beyond 64 bits as floats."""
+        if self._orjson is not None:
+            return self._orjson.loads(data)
+        if self._msgspec is not None:
+            try:
+                return self._decoder.decode(data.encode("utf-8") if isinstance(data, str) else data)
+            except self._msgspec.DecodeError as e:
+                # Same exception family as json.loads and orjson.loads
+                raise ValueError(str(e)) from e
+        return json.loads(data)
+
+@lru_cache(maxsize=None)
+def get_codec(library: str = "auto") -> JsonCodec:
+    """Shared codec per library setting."""
+    return JsonCodec(library)
@@ -0,0 +1,308 @@
+import logging
+import re
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from utils.output_writer import RecordWriter, open_record_writer
+from utils.records import (
+    RECORD_INT_FIELDS,
+    RECORD_LIST_FIELDS,
+    RECORD_SCALAR_FIELDS,
+    RECORD_TRAILING_FIELDS,
+    CompanyRecord,
+)
+from utils.serialization import JsonCodec, get_codec
+
+logger = logging.getLogger(__name__)
+
+SINKS = ("file", "parquet", "sqlite", "postgres")
+
+COLUMNS = RECORD_SCALAR_FIELDS + tuple(RECORD_LIST_FIELDS) + RECORD_TRAILING_FIELDS
+IDENTIFIER_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+class SinkError(Exception):
+    """A batch could not be loaded into the database."""
+
+def _import_pyarrow() -> Any:
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise RuntimeError("Parquet output requires the 'pyarrow' package") from e
+    return pyarrow
+
+def _import_psycopg() -> Any:
+    try:
+        import psycopg
+    except ImportError as e:
+        raise RuntimeError("Postgres output requires the 'psycopg' package (version 3)") from e
+    return psycopg
+
+def _check_identifier(name: str) -> str:
+    if not IDENTIFIER_RE.match(name):
+        raise ValueError(f"Invalid table name: {name!r}")
+    return name
+
+def _row(record: CompanyRecord, codec: JsonCodec) -> Tuple[Any, ...]:
+    """One table row; nested lists are stored as JSON text."""
+    data = record.to_dict()
+    return tuple(
+        codec.line(data[col]).decode("utf-8") if col in RECORD_LIST_FIELDS and col in data
+        else data.get(col)
+        for col in COLUMNS
+    )
+
+class BatchSink:
+    """
+    Base for sinks that load records in batches rather than as a byte stream.
+
+    Records are buffered and handed to `_write_batch` `batch_size` at a time.
+    `checkpoint()` makes everything written so far durable; the job ledger
+    calls it before committing, so a URL is never marked done while its
+    record is still sitting in a buffer. Sinks that cannot do that mid-run
+    set `durable_checkpoints` to False, and the caller commits only on close.
+    """
+
+    supports_resume = False
+    durable_checkpoints = True
+
+    def __init__(self, target: str, batch_size: int = 500, codec: Optional[JsonCodec] = None) -> None:
+        self.target = target
+        self.batch_size = max(1, batch_size)
+        self.codec = codec or get_codec()
+        self.count = 0
+        # Sinks that are not byte streams have no offsets for the ledger
+        self.bytes_written = 0
+        self._pending: List[CompanyRecord] = []
+        self._closed = False
+
+    def append_from(self, offset: int, count: int) -> None:
+        if not self.supports_resume:
+            raise ValueError(f"Resuming into {type(self).__name__} output is not supported")
+        # Loads are upserts keyed by source_url, so nothing needs truncating
+        self.count = count
+
+    def write(self, record: Union[CompanyRecord, Dict[str, Any]]) -> None:
+        if not isinstance(record, CompanyRecord):
+            record = CompanyRecord.from_dict(record)
+        self._pending.append(record)
+        self.count += 1
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._pending:
+            # Detach first so a failed batch is not retried from close()
+            batch, self._pending = self._pending, []
+            self._write_batch(batch)
+
+    def checkpoint(self) -> None:
+        self.flush()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self.flush()
+        self._close()
+
+    def _write_batch(self, records: List[CompanyRecord]) -> None:
+        raise NotImplementedError
+
+    def _close(self) -> None:
+        pass
+
+    def __enter__(self) -> "BatchSink":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+class ParquetSink(BatchSink):
+    """
+    Parquet file with one row group per `batch_size` records.
+
+    The schema follows the normalized record: strings, an int64
+    follower_count and lists of structs for locations, employees, updates
+    and similar companies. A checkpoint writes the buffered records as a
+    row group, but the file only becomes readable once its footer is written
+    on close, so nothing written by a run is durable before then: checkpoints
+    are not durable and the sink cannot be resumed. A run that writes nothing
+    removes the file an earlier run left behind.
+    """
+
+    durable_checkpoints = False
+
+    def __init__(self, output_path: Path, batch_size: int = 10000, compression: str = "zstd",
+                 codec: Optional[JsonCodec] = None) -> None:
+        super().__init__(output_path.as_posix(), batch_size, codec)
+        self.pa = _import_pyarrow()
+        self.output_path = output_path
+        self.compression = compression
+        self.schema = self.pa.schema(
+            [(col, self.pa.int64() if col in RECORD_INT_FIELDS else self.pa.string())
+             for col in RECORD_SCALAR_FIELDS]
+            + [(col, self.pa.list_(self.pa.struct([(sub, self.pa.string()) for sub in subfields])))
+               for col, subfields in RECORD_LIST_FIELDS.items()]
+            + [(col, self.pa.string()) for col in RECORD_TRAILING_FIELDS]
+        )
+        self._writer = None
+
+    def _write_batch(self, records: List[CompanyRecord]) -> None:
+        if self._writer is None:
+            self.output_path.parent.mkdir(parents=True, exist_ok=True)
+            self._writer = self.pa.parquet.ParquetWriter(
+                self.output_path.as_posix(), self.schema, compression=self.compression
+            )
+        table = self.pa.Table.from_pylist([record.to_dict() for record in records], schema=self.schema)
+        self._writer.write_table(table, row_group_size=len(records))
+        self.bytes_written = self.output_path.stat().st_size
+
+    def _close(self) -> None:
+        if self._writer is None:
+            self.output_path.unlink(missing_ok=True)
+            return
+        self._writer.close()
+        self._writer = None
+        self.bytes_written = self.output_path.stat().st_size
+
+class SqliteSink(BatchSink):
+    """
+    SQLite table loaded with executemany upserts keyed by source_url.
+
+    Nested lists are stored as JSON text columns.
+    """
+
+    supports_resume = True
+
+    def __init__(self, db_path: Path, table: str = "companies", batch_size: int = 500,
+                 codec: Optional[JsonCodec] = None) -> None:
+        super().__init__(db_path.as_posix(), batch_size, codec)
+        self.table = _check_identifier(table)
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn: Optional[sqlite3.Connection] = sqlite3.connect(db_path.as_posix())
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        column_defs = ", ".join(
+            f"{col} TEXT PRIMARY KEY" if col == "source_url"
+            else f"{col} INTEGER" if col in RECORD_INT_FIELDS
+            else f"{col} TEXT"
+            for col in COLUMNS
+        )
+        self._conn.execute(f"CREATE TABLE IF NOT EXISTS {self.table} ({column_defs})")
+        self._conn.commit()
+        self._insert = "INSERT OR REPLACE INTO {} ({}) VALUES ({})".format(
+            self.table, ", ".join(COLUMNS), ", ".join("?" for _ in COLUMNS)
+        )
+
+    def _write_batch(self, records: List[CompanyRecord]) -> None:
+        try:
+            self._conn.executemany(self._insert, [_row(record, self.codec) for record in records])
+        except sqlite3.Error as e:
+            raise SinkError(f"SQLite load into {self.table} failed: {e}") from e
+
+    def checkpoint(self) -> None:
+        if self._conn is None:
+            return
+        self.flush()
+        self._conn.commit()
+
+    def _close(self) -> None:
+        if self._conn is not None:
+            self._conn.commit()
+            self._conn.close()
+            self._conn = None
+
+class PostgresSink(BatchSink):
+    """
+    Postgres table bulk-loaded with COPY into a staging table, then upserted
+    on source_url. Nested lists go into JSONB columns.
+    """
+
+    supports_resume = True
+
+    def __init__(self, dsn: str, table: str = "companies", batch_size: int = 500,
+                 codec: Optional[JsonCodec] = None) -> None:
+        super().__init__(f"postgres table {table}", batch_size, codec)
+        self.table = _check_identifier(table)
+        psycopg = self._psycopg = _import_psycopg()
+        try:
+            self._conn = psycopg.connect(dsn)
+        except psycopg.Error as e:
+            raise RuntimeError(f"Cannot connect to Postgres: {e}") from e
+        column_defs = ", ".join(
+            f"{col} TEXT PRIMARY KEY" if col == "source_url"
+            else f"{col} BIGINT" if col in RECORD_INT_FIELDS
+            else f"{col} JSONB" if col in RECORD_LIST_FIELDS
+            else f"{col} TEXT"
+            for col in COLUMNS
+        )
+        columns = ", ".join(COLUMNS)
+        updates = ", ".join(f"{col} = EXCLUDED.{col}" for col in COLUMNS if col != "source_url")
+        with self._conn.cursor() as cur:
+            cur.execute(f"CREATE TABLE IF NOT EXISTS {self.table} ({column_defs})")
+            cur.execute(
+                f"CREATE TEMP TABLE {self.table}_stage (LIKE {self.table}) ON COMMIT DELETE ROWS"
+            )
+        self._conn.commit()
+        self._copy = f"COPY {self.table}_stage ({columns}) FROM STDIN"
+        self._upsert = (
+            f"INSERT INTO {self.table} ({columns}) SELECT {columns} FROM {self.table}_stage "
+            f"ON CONFLICT (source_url) DO UPDATE SET {updates}"
+        )
+
+    def _write_batch(self, records: List[CompanyRecord]) -> None:
+        # An upsert may touch each key once, so the last record per URL wins
+        latest = {record.source_url: record for record in records}
+        try:
+            with self._conn.cursor() as cur:
+                with cur.copy(self._copy) as copy:
+                    for record in latest.values():
+                        copy.write_row(_row(record, self.codec))
+                cur.execute(self._upsert)
+            self._conn.commit()
+        except self._psycopg.Error as e:
+            self._conn.rollback()
+            raise SinkError(f"Postgres load into {self.table} failed: {e}") from e
+
+    def checkpoint(self) -> None:
+        if self._conn is not None:
+            self.flush()
+
+    def _close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+def open_sink(output_path: Path, output_settings: Dict[str, Any]) -> Union[RecordWriter, BatchSink]:
+    """Build the record sink selected by `output.sink` (default: a JSON/JSONL file)."""
+    sink = output_settings.get("sink") or "file"
+    codec = get_codec(output_settings.get("json_library", "auto"))
+    if sink == "file":
+        return open_record_writer(
+            output_path,
+            output_format=output_settings.get("format", "json"),
+            compression=output_settings.get("compression"),
+            fsync_every=int(output_settings.get("fsync_every", 100)),
+            codec=codec,
+        )
+    if sink == "parquet":
+        parquet_settings = output_settings.get("parquet") or {}
+        return ParquetSink(
+            output_path,
+            batch_size=int(parquet_settings.get("row_group_size", 10000)),
+            compression=parquet_settings.get("compression", "zstd"),
+            codec=codec,
+        )
+    database_settings = output_settings.get("database") or {}
+    table = database_settings.get("table", "companies")
+    batch_size = int(database_settings.get("batch_size", 500))
+    if sink == "sqlite":
+        return SqliteSink(output_path, table=table, batch_size=batch_size, codec=codec)
+    if sink == "postgres":
+        dsn = database_settings.get("dsn")
+        if not dsn:
+            raise ValueError("The postgres sink needs output.database.dsn")
+        return PostgresSink(dsn, table=table, batch_size=batch_size, codec=codec)
+    raise ValueError(f"Unsupported output sink: {sink!r}")
@@ -0,0 +1,235 @@
+import logging
+import socket
+import threading
+import time
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+TRANSPORT_BACKENDS = ("requests", "httpx")
+
+READ_CHUNK_BYTES = 64 * 1024
+
+class TransportError(Exception):
+    """A request failed before a complete response was read."""
+
+    def __init__(self, message: str, kind: Optional[str] = None) -> None:
+        super().__init__(message)
+        # Name of the underlying library error, used as a metrics label
+        self.kind = kind or type(self).__name__
+
+class ResponseTooLarge(TransportError):
+    """The response body exceeded `max_body_bytes`."""
+
+class Response(NamedTuple):
+    status_code: int
+    # Final URL after redirects
+    url: str
+    headers: Mapping[str, str]
+    text: str
+    body_bytes: int
+    # Time from sending the request until the status line and headers were read
+    to_headers_seconds: float
+
+def _import_httpx(http2: bool) -> Any:
+    try:
+        import httpx
+    except ImportError as e:
+        raise RuntimeError("The httpx transport requires the 'httpx' package") from e
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError as e:
+            raise RuntimeError("HTTP/2 requires the 'h2' package (pip install 'httpx[http2]')") from e
+    return httpx
+
+class DnsCache:
+    """
+    Process-wide TTL cache in front of `socket.getaddrinfo`.
+
+    Both urllib3 and httpcore resolve hosts through `socket.getaddrinfo`
+    whenever they open a connection, so while installed every new connection
+    to an already-seen host skips the resolver. Failed lookups are not cached.
+    """
+
+    _lock = threading.Lock()
+    _users = 0
+    _original: Any = None
+    _entries: Dict[Tuple[Any, ...], Tuple[float, List[Any]]] = {}
+    ttl_seconds = 300.0
+
+    @classmethod
+    def install(cls, ttl_seconds: float) -> None:
+        with cls._lock:
+            cls.ttl_seconds = ttl_seconds
+            cls._users += 1
+            if cls._original is None:
+                cls._original = socket.getaddrinfo
+                socket.getaddrinfo = cls._getaddrinfo
+
+    @classmethod
+    def uninstall(cls) -> None:
+        with cls._lock:
+            cls._users = max(0, cls._users - 1)
+            if cls._users == 0 and cls._original is not None:
+                socket.getaddrinfo = cls._original
+                cls._original = None
+                cls._entries.clear()
+
+    @classmethod
+    def _getaddrinfo(cls, host: Any, port: Any, *args: Any, **kwargs: Any) -> List[Any]:
+        key = (host, port, args, tuple(sorted(kwargs.items())))
+        now = time.monotonic()
+        entry = cls._entries.get(key)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+        result = cls._original(host, port, *args, **kwargs)
+        cls._entries[key] = (now + cls.ttl_seconds, result)
+        return result
+
+class Transport:
+    """
+    Pooled HTTP client shared by all fetch threads.
+
+    Subclasses stream the response body so a page larger than
+    `max_body_bytes` (after gzip/brotli decoding) is abandoned as soon as it
+    crosses the limit instead of being buffered whole.
+    """
+
+    def __init__(self, max_body_bytes: int, dns_cache_ttl_seconds: float) -> None:
+        self.max_body_bytes = max_body_bytes
+        self._dns_cache = dns_cache_ttl_seconds > 0
+        if self._dns_cache:
+            DnsCache.install(dns_cache_ttl_seconds)
+
+    def get(self, url: str, timeout: float, headers: Optional[Dict[str, str]] = None,
+            proxy: Optional[str] = None) -> Response:
+        raise NotImplementedError
+
+    def _check_declared_length(self, url: str, headers: Mapping[str, str]) -> None:
+        declared = headers.get("Content-Length")
+        if declared and declared.isdigit() and int(declared) > self.max_body_bytes:
+            raise ResponseTooLarge(f"{url} declares {declared} bytes (limit {self.max_body_bytes})")
+
+    def _check_read_length(self, url: str, size: int) -> None:
+        if size > self.max_body_bytes:
+            raise ResponseTooLarge(f"{url} body exceeds {self.max_body_bytes} bytes")
+
+    def close(self) -> None:
+        if self._dns_cache:
+            DnsCache.uninstall()
+            self._dns_cache = False
+
+class HttpxTransport(Transport):
+    """
+    httpx transport, optionally speaking HTTP/2.
+
+    With HTTP/2 all fetch threads multiplex their requests over a single
+    connection per host, so only the first request pays for the TLS handshake.
+    httpx binds proxies to a client, so each proxy gets its own client (and
+    connection pool), created on first use.
+    """
+
+    def __init__(
+        self,
+        headers: Dict[str, str],
+        http2: bool = True,
+        max_connections: int = 10,
+        keepalive_expiry_seconds: float = 30,
+        max_body_bytes: int = 10 * 1024 * 1024,
+        dns_cache_ttl_seconds: float = 300,
+    ) -> None:
+        self.httpx = _import_httpx(http2)
+        super().__init__(max_body_bytes, dns_cache_ttl_seconds)
+        self._client_options = dict(
+            http2=http2,
+            headers=headers,
+            follow_redirects=True,
+            limits=self.httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=keepalive_expiry_seconds,
+            ),
+        )
+        self.client = self.httpx.Client(**self._client_options)
+        self._proxy_clients: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def _client_for(self, proxy: Optional[str]) -> Any:
+        if not proxy:
+            return self.client
+        client = self._proxy_clients.get(proxy)
+        if client is None:
+            with self._lock:
+                client = self._proxy_clients.get(proxy)
+                if client is None:
+                    client = self._proxy_clients[proxy] = self.httpx.Client(proxy=proxy, **self._client_options)
+        return client
+
+    def get(self, url: str, timeout: float, headers: Optional[Dict[str, str]] = None,
+            proxy: Optional[str] = None) -> Response:
+        client = self._client_for(proxy)
+        started = time.perf_counter()
+        try:
+            with client.stream("GET", url, headers=headers, timeout=timeout) as resp:
+                to_headers = time.perf_counter() - started
+                self._check_declared_length(url, resp.headers)
+                chunks: List[bytes] = []
+                size = 0
+                for chunk in resp.iter_bytes(READ_CHUNK_BYTES):
+                    size += len(chunk)
+                    self._check_read_length(url, size)
+                    chunks.append(chunk)
+                encoding = resp.encoding or "utf-8"
+                return Response(
+                    resp.status_code,
+                    str(resp.url),
+                    resp.headers,
+                    b"".join(chunks).decode(encoding, errors="replace"),
+                    size,
+                    to_headers,
+                )
+        except self.httpx.HTTPError as e:
+            raise TransportError(str(e), kind=type(e).__name__) from e
+
+    def close(self) -> None:
+        self.client.close()
+        for client in self._proxy_clients.values():
+            client.close()
+        super().close()
+
+def open_transport(
+    settings: Optional[Dict[str, Any]], headers: Dict[str, str], concurrency: int = 1
+) -> Transport:
+    """Build the transport configured in `http.transport`."""
+    settings = settings or {}
+    backend = settings.get("backend", "requests")
+    # Enough connections per host that concurrent fetch threads never discard one
+    pool_size = int(settings.get("pool_maxsize_per_host") or max(10, concurrency))
+    max_body_bytes = int(float(settings.get("max_body_mb", 10)) * 1024 * 1024)
+    dns_cache_ttl = float(settings.get("dns_cache_ttl_seconds", 300))
+    if backend == "requests":
+        if settings.get("http2"):
+            logger.warning("HTTP/2 needs the httpx transport; using HTTP/1.1.")
+        # Imported here so processes that never fetch do not load requests/urllib3
+        from utils.requests_transport import RequestsTransport
+
+        return RequestsTransport(
+            headers,
+            pool_connections=int(settings.get("pool_connections", 10)),
+            pool_maxsize=pool_size,
+            pool_block=bool(settings.get("pool_block", False)),
+            tcp_keepalive=bool(settings.get("tcp_keepalive", True)),
+            max_body_bytes=max_body_bytes,
+            dns_cache_ttl_seconds=dns_cache_ttl,
+        )
+    if backend == "httpx":
+        return HttpxTransport(
+            headers,
+            http2=bool(settings.get("http2", True)),
+            max_connections=pool_size,
+            keepalive_expiry_seconds=float(settings.get("keepalive_expiry_seconds", 30)),
+            max_body_bytes=max_body_bytes,
+            dns_cache_ttl_seconds=dns_cache_ttl,
+        )
+    raise ValueError(f"Unsupported HTTP transport backend: {backend!r}")
@@ -0,0 +1,202 @@
+import contextlib
+import csv
+import gzip
+import hashlib
+import logging
+import math
+import sys
+from itertools import chain
+from pathlib import Path
+from typing import Callable, ContextManager, Iterable, Iterator, List, Optional, TextIO, Union
+from urllib.parse import urlsplit
+
+from utils.data_cleaner import extract_universal_name_id
+
+logger = logging.getLogger(__name__)
+
+CSV_URL_COLUMNS = ("url", "company_url", "linkedin_url", "profile_url", "source_url")
+
+def canonicalize_company_url(url: str) -> Optional[str]:
+    """
+    Canonical form of a LinkedIn company URL, or None if it is not one.
+
+    Only linkedin.com (or a locale subdomain) with a /company/<slug> path is
+    accepted, with or without a scheme. Locale subdomains, scheme, query
+    strings, fragments and sub-paths such as /about/ are dropped, so every
+    spelling of a company maps to https://www.linkedin.com/company/<slug>/.
+    The slug is taken with the same logic as `extract_universal_name_id`.
+    """
+    url = url.strip()
+    if not url:
+        return None
+    if "://" not in url:
+        url = "https://" + url.lstrip("/")
+    parts = urlsplit(url)
+    host = parts.netloc.lower()
+    if not host:
+        return None
+    if host != "linkedin.com" and not host.endswith(".linkedin.com"):
+        return None
+    slug = extract_universal_name_id(parts.path) if parts.path.startswith("/company/") else None
+    if not slug:
+        return None
+    return f"https://www.linkedin.com/company/{slug}/"
+
+def dedup_key(canonical_url: str) -> str:
+    slug = extract_universal_name_id(canonical_url)
+    # LinkedIn slugs are case-insensitive
+    return slug.lower() if slug else canonical_url
+
+class SeenSet:
+    """Exact membership over the full dedup keys."""
+
+    def __init__(self) -> None:
+        self._seen = set()
+
+    def add(self, key: str) -> bool:
+        """Add `key`; return False if it was already present."""
+        if key in self._seen:
+            return False
+        self._seen.add(key)
+        return True
+
+class BloomFilter:
+    """
+    Fixed-memory probabilistic membership.
+
+    Sized for `capacity` keys at `error_rate` false positives; a false
+    positive makes the reader skip a URL it has not seen, so keep the rate low.
+    """
+
+    def __init__(self, capacity: int = 10_000_000, error_rate: float = 1e-6) -> None:
+        capacity = max(1, capacity)
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def add(self, key: str) -> bool:
+        """Add `key`; return False if it was (probably) already present."""
+        # Kirsch-Mitzenmacher double hashing over a 16-byte digest of the key
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:], "big") | 1
+        present = True
+        for i in range(self.num_hashes):
+            bit = (h1 + i * h2) % self.num_bits
+            byte, mask = bit >> 3, 1 << (bit & 7)
+            if not self._bits[byte] & mask:
+                present = False
+                self._bits[byte] |= mask
+        return not present
+
+def _open_text(source: Union[str, Path]) -> ContextManager[TextIO]:
+    if str(source) == "-":
+        # Leave stdin open for whoever reads it next
+        return contextlib.nullcontext(sys.stdin)
+    path = Path(source)
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    return path.open("r", encoding="utf-8", newline="")
+
+def _is_csv(source: Union[str, Path]) -> bool:
+    suffixes = Path(str(source)).suffixes
+    return ".csv" in suffixes
+
+def _iter_raw_urls(f: TextIO, as_csv: bool, csv_column: Optional[str]) -> Iterator[str]:
+    if not as_csv:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            yield line
+        return
+
+    reader = csv.reader(f)
+    header = next(reader, None)
+    if header is None:
+        return
+    lowered = [cell.strip().lower() for cell in header]
+    wanted = [csv_column.lower()] if csv_column else list(CSV_URL_COLUMNS)
+    column = next((lowered.index(name) for name in wanted if name in lowered), None)
+    rows: Iterable[List[str]] = reader
+    if column is None:
+        # No recognizable header: the first row is data and URLs are in the first column
+        column = 0
+        rows = chain([header], reader)
+    for row in rows:
+        if len(row) > column:
+            value = row[column].strip()
+            if value and not value.startswith("#"):
+                yield value
+
+def iter_input_urls(
+    source: Union[str, Path],
+    dedup: str = "exact",
+    csv_column: Optional[str] = None,
+    bloom_capacity: int = 10_000_000,
+    bloom_error_rate: float = 1e-6,
+    on_invalid: Optional[Callable[[str], None]] = None,
+) -> Iterator[str]:
+    """
+    Stream canonical, de-duplicated company URLs from `source`.
+
+    `source` may be a text file with one URL per line, a CSV file (URL column
+    picked by `csv_column` or a header such as "url"), either of them gzip
+    compressed (.gz), or "-" for stdin. Duplicates are dropped with an exact
+    set of lower-cased slugs (`dedup="exact"`), a fixed-size Bloom filter
+    that may drop a rare unseen URL (`dedup="bloom"`), or kept (`dedup="none"`). Lines that are not LinkedIn
+    company URLs are skipped and, if given, passed to `on_invalid`.
+    """
+    if dedup == "bloom":
+        seen = BloomFilter(bloom_capacity, bloom_error_rate)
+    elif dedup == "none":
+        seen = None
+    else:
+        seen = SeenSet()
+
+    read = duplicates = invalid = 0
+    with _open_text(source) as f:
+        for raw_url in _iter_raw_urls(f, _is_csv(source), csv_column):
+            read += 1
+            url = canonicalize_company_url(raw_url)
+            if not url:
+                invalid += 1
+                if on_invalid is not None:
+                    on_invalid(raw_url)
+                continue
+            if seen is not None and not seen.add(dedup_key(url)):
+                duplicates += 1
+                continue
+            yield url
+
+    logger.info(
+        "Read %d URL(s) from %s: %d duplicate(s) and %d invalid skipped.",
+        read, "stdin" if str(source) == "-" else Path(source).as_posix(), duplicates, invalid,
+    )
+
+def iter_url_batches(f: TextIO, dedup: bool = True) -> Iterator[List[str]]:
+    """
+    Yield canonical company URLs per batch from a line stream.
+
+    A blank line ends a batch and is answered even when the batch is empty;
+    the end of the stream ends the last one. Lines are read one at a time,
+    so a batch is handed over as soon as its blank line arrives. Duplicates
+    are dropped within a batch only, so a later batch can retry a URL.
+    """
+    batch: List[str] = []
+    seen = SeenSet()
+    while True:
+        line = f.readline()
+        if not line or not line.strip():
+            if line or batch:
+                yield batch
+            if not line:
+                return
+            batch, seen = [], SeenSet()
+            continue
+        url = canonicalize_company_url(line)
+        if not url:
+            logger.warning("Skipping line that is not a LinkedIn company URL: %s", line.strip())
+            continue
+        if not dedup or seen.add(dedup_key(url)):
+            batch.append(url)
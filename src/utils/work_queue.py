@@ -0,0 +1,439 @@
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+STATUS_PENDING = "pending"
+STATUS_LEASED = "leased"
+STATUS_DONE = "done"
+STATUS_DEAD = "dead"
+
+def _import_redis() -> Any:
+    try:
+        import redis
+    except ImportError as e:
+        raise RuntimeError("A Redis work queue requires the 'redis' package") from e
+    return redis
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+class WorkQueue:
+    """
+    Shared queue of URL tasks with leases.
+
+    A worker leases up to `count` URLs for `visibility_timeout` seconds. If it
+    does not complete, fail or extend a lease in time (because it crashed or
+    lost its network), the URLs become visible to other workers again. Every
+    lease counts as an attempt; a URL that fails or times out `max_attempts`
+    times is parked as dead instead of being retried forever.
+
+    Completions and failures only apply while the caller still owns the
+    lease, so a worker that comes back after its lease was handed on cannot
+    overwrite the new owner's state.
+    """
+
+    def __init__(self, visibility_timeout: float = 300, max_attempts: int = 3) -> None:
+        self.visibility_timeout = max(1.0, visibility_timeout)
+        self.max_attempts = max(1, max_attempts)
+
+    def enqueue(self, urls: Iterable[str]) -> int:
+        """Add URLs not seen before; returns how many were added."""
+        raise NotImplementedError
+
+    def lease(self, owner: str, count: int) -> List[str]:
+        raise NotImplementedError
+
+    def extend(self, owner: str, urls: Iterable[str]) -> None:
+        raise NotImplementedError
+
+    def complete(self, owner: str, urls: Iterable[str]) -> None:
+        raise NotImplementedError
+
+    def fail(self, owner: str, url: str, error: str) -> None:
+        raise NotImplementedError
+
+    def counts(self) -> Dict[str, int]:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+class SqliteWorkQueue(WorkQueue):
+    """
+    Work queue in a SQLite file, for several worker processes on one host
+    (and for tests). Leases are taken inside BEGIN IMMEDIATE transactions,
+    so two processes never lease the same URL.
+    """
+
+    def __init__(self, path: Path, visibility_timeout: float = 300, max_attempts: int = 3) -> None:
+        super().__init__(visibility_timeout, max_attempts)
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit mode; transactions are opened explicitly. The lease heartbeat
+        # thread shares the connection, serialized by LeasedUrls.
+        self._conn = sqlite3.connect(path.as_posix(), timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS tasks (
+                url TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                lease_owner TEXT,
+                lease_expires REAL,
+                last_error TEXT,
+                updated_at REAL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, lease_expires)")
+
+    def enqueue(self, urls: Iterable[str]) -> int:
+        added = 0
+        batch: List[tuple] = []
+        for url in urls:
+            batch.append((url, STATUS_PENDING, time.time()))
+            if len(batch) >= 1000:
+                added += self._insert(batch)
+                batch = []
+        if batch:
+            added += self._insert(batch)
+        return added
+
+    def _insert(self, rows: List[tuple]) -> int:
+        before = self._conn.total_changes
+        with self._transaction():
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO tasks (url, status, updated_at) VALUES (?, ?, ?)", rows
+            )
+        return self._conn.total_changes - before
+
+    def _transaction(self) -> "_Immediate":
+        return _Immediate(self._conn)
+
+    def lease(self, owner: str, count: int) -> List[str]:
+        now = time.time()
+        with self._transaction():
+            # Expired leases of workers that ran out of attempts are parked
+            self._conn.execute(
+                "UPDATE tasks SET status = ?, last_error = 'lease expired', lease_owner = NULL, updated_at = ? "
+                "WHERE status = ? AND lease_expires < ? AND attempts >= ?",
+                (STATUS_DEAD, now, STATUS_LEASED, now, self.max_attempts),
+            )
+            rows = self._conn.execute(
+                "SELECT url FROM tasks WHERE status = ? OR (status = ? AND lease_expires < ?) "
+                "ORDER BY attempts, rowid LIMIT ?",
+                (STATUS_PENDING, STATUS_LEASED, now, count),
+            ).fetchall()
+            urls = [url for (url,) in rows]
+            self._conn.executemany(
+                "UPDATE tasks SET status = ?, attempts = attempts + 1, lease_owner = ?, "
+                "lease_expires = ?, updated_at = ? WHERE url = ?",
+                [(STATUS_LEASED, owner, now + self.visibility_timeout, now, url) for url in urls],
+            )
+        return urls
+
+    def extend(self, owner: str, urls: Iterable[str]) -> None:
+        now = time.time()
+        with self._transaction():
+            self._conn.executemany(
+                "UPDATE tasks SET lease_expires = ? WHERE url = ? AND lease_owner = ? AND status = ?",
+                [(now + self.visibility_timeout, url, owner, STATUS_LEASED) for url in urls],
+            )
+
+    def complete(self, owner: str, urls: Iterable[str]) -> None:
+        now = time.time()
+        with self._transaction():
+            self._conn.executemany(
+                "UPDATE tasks SET status = ?, lease_owner = NULL, updated_at = ? "
+                "WHERE url = ? AND lease_owner = ? AND status = ?",
+                [(STATUS_DONE, now, url, owner, STATUS_LEASED) for url in urls],
+            )
+
+    def fail(self, owner: str, url: str, error: str) -> None:
+        with self._transaction():
+            self._conn.execute(
+                "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, "
+                "lease_owner = NULL, last_error = ?, updated_at = ? "
+                "WHERE url = ? AND lease_owner = ? AND status = ?",
+                (self.max_attempts, STATUS_DEAD, STATUS_PENDING, error, time.time(), url, owner, STATUS_LEASED),
+            )
+
+    def counts(self) -> Dict[str, int]:
+        rows = self._conn.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status")
+        return {status: count for status, count in rows}
+
+    def close(self) -> None:
+        self._conn.close()
+
+class _Immediate:
+    """BEGIN IMMEDIATE ... COMMIT, rolled back on error."""
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self.conn = conn
+
+    def __enter__(self) -> None:
+        self.conn.execute("BEGIN IMMEDIATE")
+
+    def __exit__(self, exc_type: Any, *exc_info: Any) -> None:
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+
+# Every state change runs as one server-side script, so concurrent workers on
+# different nodes cannot interleave. Times come from the Redis server clock.
+_REDIS_LEASE = """
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', now)
+for _, url in ipairs(expired) do
+    redis.call('ZREM', KEYS[2], url)
+    redis.call('HDEL', KEYS[3], url)
+    if tonumber(redis.call('HGET', KEYS[4], url) or '0') >= tonumber(ARGV[3]) then
+        redis.call('HSET', KEYS[6], url, 'lease expired')
+    else
+        redis.call('LPUSH', KEYS[1], url)
+    end
+end
+local leased = {}
+for i = 1, tonumber(ARGV[2]) do
+    local url = redis.call('LPOP', KEYS[1])
+    if not url then break end
+    redis.call('HINCRBY', KEYS[4], url, 1)
+    redis.call('ZADD', KEYS[2], now + tonumber(ARGV[4]), url)
+    redis.call('HSET', KEYS[3], url, ARGV[1])
+    leased[#leased + 1] = url
+end
+return leased
+"""
+
+_REDIS_EXTEND = """
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+for i = 3, #ARGV do
+    if redis.call('HGET', KEYS[2], ARGV[i]) == ARGV[1] then
+        redis.call('ZADD', KEYS[1], 'XX', now + tonumber(ARGV[2]), ARGV[i])
+    end
+end
+"""
+
+_REDIS_COMPLETE = """
+for i = 2, #ARGV do
+    if redis.call('HGET', KEYS[2], ARGV[i]) == ARGV[1] then
+        redis.call('ZREM', KEYS[1], ARGV[i])
+        redis.call('HDEL', KEYS[2], ARGV[i])
+        redis.call('SADD', KEYS[3], ARGV[i])
+    end
+end
+"""
+
+_REDIS_FAIL = """
+if redis.call('HGET', KEYS[3], ARGV[1]) ~= ARGV[2] then return 0 end
+redis.call('ZREM', KEYS[2], ARGV[1])
+redis.call('HDEL', KEYS[3], ARGV[1])
+if tonumber(redis.call('HGET', KEYS[4], ARGV[1]) or '0') >= tonumber(ARGV[4]) then
+    redis.call('HSET', KEYS[5], ARGV[1], ARGV[3])
+else
+    redis.call('RPUSH', KEYS[1], ARGV[1])
+end
+return 1
+"""
+
+class RedisWorkQueue(WorkQueue):
+    """
+    Work queue in Redis, shared by workers on any number of nodes.
+
+    Keys (prefixed with `name`): a pending list, a sorted set of leased URLs
+    scored by lease expiry, hashes of lease owners, attempts and dead URLs
+    with their last error, a set of done URLs, and a set of every URL ever
+    enqueued so re-enqueueing the same input is a no-op.
+    """
+
+    def __init__(self, url: str, name: str = "linkedin", visibility_timeout: float = 300,
+                 max_attempts: int = 3) -> None:
+        super().__init__(visibility_timeout, max_attempts)
+        redis = _import_redis()
+        self._client = redis.Redis.from_url(url, decode_responses=True)
+        try:
+            self._client.ping()
+        except redis.RedisError as e:
+            raise RuntimeError(f"Cannot connect to Redis at {url}: {e}") from e
+        self.keys = {part: f"{name}:{part}" for part in ("pending", "leases", "owners", "attempts", "done", "dead", "seen")}
+        self._lease = self._client.register_script(_REDIS_LEASE)
+        self._extend = self._client.register_script(_REDIS_EXTEND)
+        self._complete = self._client.register_script(_REDIS_COMPLETE)
+        self._fail = self._client.register_script(_REDIS_FAIL)
+
+    def enqueue(self, urls: Iterable[str]) -> int:
+        added = 0
+        batch: List[str] = []
+        for url in urls:
+            batch.append(url)
+            if len(batch) >= 1000:
+                added += self._push(batch)
+                batch = []
+        if batch:
+            added += self._push(batch)
+        return added
+
+    def _push(self, urls: List[str]) -> int:
+        pipe = self._client.pipeline()
+        for url in urls:
+            pipe.sadd(self.keys["seen"], url)
+        new = [url for url, is_new in zip(urls, pipe.execute()) if is_new]
+        if new:
+            self._client.rpush(self.keys["pending"], *new)
+        return len(new)
+
+    def lease(self, owner: str, count: int) -> List[str]:
+        k = self.keys
+        return self._lease(
+            keys=[k["pending"], k["leases"], k["owners"], k["attempts"], k["done"], k["dead"]],
+            args=[owner, count, self.max_attempts, self.visibility_timeout],
+        )
+
+    def extend(self, owner: str, urls: Iterable[str]) -> None:
+        urls = list(urls)
+        if urls:
+            self._extend(keys=[self.keys["leases"], self.keys["owners"]],
+                         args=[owner, self.visibility_timeout] + urls)
+
+    def complete(self, owner: str, urls: Iterable[str]) -> None:
+        urls = list(urls)
+        if urls:
+            self._complete(keys=[self.keys["leases"], self.keys["owners"], self.keys["done"]],
+                           args=[owner] + urls)
+
+    def fail(self, owner: str, url: str, error: str) -> None:
+        k = self.keys
+        self._fail(
+            keys=[k["pending"], k["leases"], k["owners"], k["attempts"], k["dead"]],
+            args=[url, owner, error, self.max_attempts],
+        )
+
+    def counts(self) -> Dict[str, int]:
+        pipe = self._client.pipeline()
+        pipe.llen(self.keys["pending"])
+        pipe.zcard(self.keys["leases"])
+        pipe.scard(self.keys["done"])
+        pipe.hlen(self.keys["dead"])
+        pending, leased, done, dead = pipe.execute()
+        return {STATUS_PENDING: pending, STATUS_LEASED: leased, STATUS_DONE: done, STATUS_DEAD: dead}
+
+    def close(self) -> None:
+        self._client.close()
+
+def open_work_queue(settings: Optional[Dict[str, Any]]) -> WorkQueue:
+    """Open the queue at `queue.url`: a redis:// URL or a SQLite file path."""
+    settings = settings or {}
+    url = settings.get("url")
+    if not url:
+        raise ValueError("Worker mode needs queue.url (a redis:// URL or a SQLite file)")
+    visibility_timeout = float(settings.get("visibility_timeout_seconds", 300))
+    max_attempts = int(settings.get("max_attempts", 3))
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisWorkQueue(url, name=settings.get("name", "linkedin"),
+                              visibility_timeout=visibility_timeout, max_attempts=max_attempts)
+    return SqliteWorkQueue(Path(url), visibility_timeout=visibility_timeout, max_attempts=max_attempts)
+
+class LeasedUrls:
+    """
+    URLs leased from a work queue on behalf of one worker.
+
+    Iterating yields one round: leases are taken `lease_size` at a time as
+    the pipeline asks for more URLs, until the queue has nothing left to
+    lease. A heartbeat thread extends every lease still being worked on a
+    few times per visibility timeout, so URLs draining through the pipeline
+    or waiting out a rate-limit pause are not handed to another worker.
+    Queue calls are serialized, as the heartbeat shares the connection.
+    Call `close()` to stop it. Outcomes are buffered with
+    `done`/`failed` and only acknowledged to the queue on `flush()`, which
+    the caller runs after the output sink has made the records durable.
+
+    Between rounds, `wait_for_work()` decides whether to poll again: other
+    workers' leases may still expire and come back, and with
+    `exit_when_idle` false the worker keeps polling for new URLs forever.
+    """
+
+    def __init__(self, queue: WorkQueue, owner: str, lease_size: int = 16,
+                 poll_interval: float = 5, exit_when_idle: bool = True) -> None:
+        self.queue = queue
+        self.owner = owner
+        self.lease_size = max(1, lease_size)
+        self.poll_interval = poll_interval
+        self.exit_when_idle = exit_when_idle
+        self.leased = 0
+        self._outstanding: Dict[str, None] = {}
+        self._done: List[str] = []
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._heartbeat_thread: Optional[threading.Thread] = None
+
+    def __iter__(self) -> Iterator[str]:
+        while True:
+            with self._lock:
+                urls = self.queue.lease(self.owner, self.lease_size)
+                self._outstanding.update(dict.fromkeys(urls))
+            if not urls:
+                return
+            self.leased += len(urls)
+            self._start_heartbeat()
+            yield from urls
+
+    def wait_for_work(self) -> bool:
+        """Sleep before the next round, or return False once the worker should stop."""
+        with self._lock:
+            counts = self.queue.counts()
+            others_leased = counts.get(STATUS_LEASED, 0) - len(self._outstanding)
+        if self.exit_when_idle and not counts.get(STATUS_PENDING) and others_leased <= 0:
+            return False
+        time.sleep(self.poll_interval)
+        return True
+
+    def _start_heartbeat(self) -> None:
+        if self._heartbeat_thread is None:
+            self._heartbeat_thread = threading.Thread(target=self._heartbeat, name="lease-heartbeat", daemon=True)
+            self._heartbeat_thread.start()
+
+    def _heartbeat(self) -> None:
+        # Renew well before the visibility timeout so a slow batch is not handed out twice
+        while not self._stopped.wait(self.queue.visibility_timeout / 3):
+            with self._lock:
+                if not self._outstanding:
+                    continue
+                try:
+                    self.queue.extend(self.owner, list(self._outstanding))
+                except Exception as e:  # Keep renewing; the next beat may get through
+                    logger.warning("Failed to extend %d lease(s): %s", len(self._outstanding), e)
+
+    def done(self, url: str) -> None:
+        self._done.append(url)
+
+    def failed(self, url: str, error: str) -> None:
+        # Nothing was written for a failure, so it can be handed back at once
+        with self._lock:
+            self._outstanding.pop(url, None)
+            self.queue.fail(self.owner, url, error)
+
+    def flush(self) -> None:
+        if self._done:
+            with self._lock:
+                self.queue.complete(self.owner, self._done)
+                for url in self._done:
+                    self._outstanding.pop(url, None)
+            self._done = []
+
+    def rollback(self) -> None:
+        """Forget buffered outcomes; their URLs stay leased until they expire."""
+        self._done = []
+
+    def close(self) -> None:
+        """Stop renewing leases; URLs still outstanding expire and go to other workers."""
+        self._stopped.set()
+        if self._heartbeat_thread is not None:
+            self._heartbeat_thread.join()
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The scraper runs from src/ as its import root
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
@@ -0,0 +1,92 @@
+import json
+
+import main
+from utils.change_tracker import ChangeTracker, diff_records
+from utils.html_archive import HtmlArchive
+from utils.records import CompanyRecord
+
+ACME = "https://www.linkedin.com/company/acme/"
+GLOBEX = "https://www.linkedin.com/company/globex/"
+INITECH = "https://www.linkedin.com/company/initech/"
+
+def _page(name, description):
+    return (
+        "<html><head>"
+        f"<title>{name} | LinkedIn</title>"
+        f'<meta property="og:title" content="{name}">'
+        f'<meta property="og:description" content="{description}">'
+        "</head><body></body></html>"
+    )
+
+def test_diff_records_reports_scalars_and_list_items():
+    old = {"name": "Acme", "industry": "Tools", "locations": [{"address": "A"}, {"address": "B"}]}
+    new = {"name": "Acme", "industry": "Rockets", "locations": [{"address": "B"}, {"address": "C"}],
+           "founded": "1949"}
+
+    assert diff_records(old, new) == {
+        "industry": {"old": "Tools", "new": "Rockets"},
+        "locations": {"added": [{"address": "C"}], "removed": [{"address": "A"}]},
+        "founded": {"old": None, "new": "1949"},
+    }
+
+def test_tracker_tells_new_changed_and_unchanged_apart(tmp_path):
+    tracker = ChangeTracker(tmp_path / "fp.sqlite")
+    record = CompanyRecord.from_dict({"source_url": ACME, "company_name": "Acme", "industry": "Tools"})
+
+    assert tracker.update(ACME, record)["status"] == "new"
+    assert tracker.update(ACME, record) is None
+    changed = tracker.update(ACME, record._replace(industry="Rockets"))
+    assert changed["status"] == "changed"
+    assert changed["changes"] == {"industry": {"old": "Tools", "new": "Rockets"}}
+    tracker.commit()
+    tracker.close()
+
+def test_rolled_back_updates_are_forgotten(tmp_path):
+    tracker = ChangeTracker(tmp_path / "fp.sqlite")
+    tracker.update(ACME, CompanyRecord.from_dict({"source_url": ACME, "company_name": "Acme"}))
+    tracker.rollback()
+    tracker.close()
+
+    tracker = ChangeTracker(tmp_path / "fp.sqlite")
+    assert tracker.previous_record(ACME) is None
+    tracker.close()
+
+def _replay_changed(tmp_path, pages):
+    """Archive `pages` as a fresh capture and replay them with --emit changed."""
+    archive_dir = tmp_path / f"archive-{len(list(tmp_path.glob('archive-*')))}"
+    archive = HtmlArchive(archive_dir)
+    for url, html in pages.items():
+        archive.append(url, html)
+    archive.close()
+    main.main([
+        "--settings-file", str(tmp_path / "missing-settings.json"),
+        "--replay", str(archive_dir),
+        "--output-file", str(tmp_path / "out.jsonl"),
+        "--output-format", "jsonl",
+        "--emit", "changed",
+        "--changes-file", str(tmp_path / "changes.jsonl"),
+    ])
+    outputs = {}
+    for name in ("out.jsonl", "changes.jsonl"):
+        path = tmp_path / name
+        outputs[name] = [json.loads(line) for line in path.read_text().splitlines()] if path.exists() else None
+    return outputs["out.jsonl"], outputs["changes.jsonl"]
+
+def test_emit_changed_writes_only_new_and_changed_companies(tmp_path):
+    records, changes = _replay_changed(tmp_path, {ACME: _page("Acme", "Tools"), GLOBEX: _page("Globex", "Chemicals")})
+    assert [r["source_url"] for r in records] == [ACME, GLOBEX]
+    assert [(c["source_url"], c["status"]) for c in changes] == [(ACME, "new"), (GLOBEX, "new")]
+
+    records, changes = _replay_changed(tmp_path, {
+        ACME: _page("Acme", "Rockets"), GLOBEX: _page("Globex", "Chemicals"), INITECH: _page("Initech", "Software"),
+    })
+    assert [r["source_url"] for r in records] == [ACME, INITECH]
+    assert [(c["source_url"], c["status"]) for c in changes] == [(ACME, "changed"), (INITECH, "new")]
+    assert set(changes[0]["changes"]) == {"tagline"}
+
+def test_run_without_changes_leaves_no_stale_output(tmp_path):
+    pages = {ACME: _page("Acme", "Tools")}
+    records, changes = _replay_changed(tmp_path, pages)
+    assert records and changes
+
+    assert _replay_changed(tmp_path, pages) == (None, None)
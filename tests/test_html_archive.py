@@ -0,0 +1,84 @@
+from urllib.parse import urlsplit
+
+import pytest
+
+from utils.html_archive import INDEX_FILE, HtmlArchive, iter_archived_companies
+
+def _url(slug, page=""):
+    return f"https://www.linkedin.com/company/{slug}/" + (f"{page}/" if page else "")
+
+def _page_of(url):
+    parts = urlsplit(url).path.strip("/").split("/")
+    return parts[1], parts[2] if len(parts) > 2 else "company"
+
+def _replay(archive_dir):
+    return list(iter_archived_companies(archive_dir, _page_of, "company", ("about",)))
+
+def test_archived_pages_replay_grouped_by_company(tmp_path):
+    archive = HtmlArchive(tmp_path)
+    archive.append(_url("acme"), "<html>acme</html>")
+    archive.append(_url("globex", "about"), "<html>globex about</html>")
+    archive.append(_url("globex"), "<html>globex</html>")
+    archive.append(_url("acme", "about"), "<html>acme about é</html>")
+    archive.close()
+
+    assert _replay(tmp_path) == [
+        (_url("acme"), {"company": "<html>acme</html>", "about": "<html>acme about é</html>"}),
+        (_url("globex"), {"company": "<html>globex</html>", "about": "<html>globex about</html>"}),
+    ]
+
+def test_newest_capture_wins_across_runs_and_segments(tmp_path):
+    archive = HtmlArchive(tmp_path, segment_max_bytes=64)
+    archive.append(_url("acme"), "<html>first</html>")
+    archive.close()
+    archive = HtmlArchive(tmp_path, segment_max_bytes=64)
+    archive.append(_url("globex"), "<html>globex</html>")
+    archive.append(_url("acme"), "<html>second</html>")
+    archive.close()
+
+    assert len(list(tmp_path.glob("segment-*.bin"))) > 1
+    assert _replay(tmp_path) == [
+        (_url("acme"), {"company": "<html>second</html>"}),
+        (_url("globex"), {"company": "<html>globex</html>"}),
+    ]
+
+def test_subpages_without_a_main_page_are_skipped(tmp_path):
+    archive = HtmlArchive(tmp_path)
+    archive.append(_url("acme", "about"), "<html>about</html>")
+    archive.close()
+
+    assert _replay(tmp_path) == []
+
+def test_damaged_frames_are_skipped(tmp_path):
+    archive = HtmlArchive(tmp_path)
+    archive.append(_url("acme"), "<html>acme</html>")
+    archive.append(_url("globex"), "<html>globex</html>")
+    archive.close()
+    # A crash mid-write leaves an index entry pointing past the end of the segment
+    segment = next(tmp_path.glob("segment-*.bin"))
+    segment.write_bytes(segment.read_bytes()[:-5])
+    with (tmp_path / INDEX_FILE).open("a", encoding="utf-8") as f:
+        f.write('{"url": "https://www.linkedin.com/company/init')
+
+    assert _replay(tmp_path) == [(_url("acme"), {"company": "<html>acme</html>"})]
+
+def test_zstd_archive_round_trip(tmp_path):
+    pytest.importorskip("zstandard")
+    archive = HtmlArchive(tmp_path, compression="zstd")
+    archive.append(_url("acme"), "<html>acme</html>")
+    archive.close()
+
+    assert _replay(tmp_path) == [(_url("acme"), {"company": "<html>acme</html>"})]
+
+def test_unknown_compression_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        HtmlArchive(tmp_path, compression="brotli")
+
+def test_subpages_that_are_not_configured_are_skipped(tmp_path):
+    archive = HtmlArchive(tmp_path)
+    archive.append(_url("acme"), "<html>acme</html>")
+    archive.append(_url("acme", "about"), "<html>about</html>")
+    archive.append(_url("acme", "people"), "<html>people</html>")
+    archive.close()
+
+    assert _replay(tmp_path) == [(_url("acme"), {"company": "<html>acme</html>", "about": "<html>about</html>"})]
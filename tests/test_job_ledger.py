@@ -0,0 +1,80 @@
+import json
+
+import pytest
+
+from utils.job_ledger import JobLedger
+from utils.output_writer import JsonArrayWriter, JsonLinesWriter
+
+URLS = [f"https://www.linkedin.com/company/c{i}/" for i in range(4)]
+
+def _record(url):
+    return {"url": url, "name": url.rstrip("/").rsplit("/", 1)[-1]}
+
+def _interrupted_run(tmp_path, writer_class):
+    """Write every record but crash after only the first two are committed."""
+    output = tmp_path / "out"
+    ledger = JobLedger(tmp_path / "ledger.sqlite", commit_every=1000)
+    writer = writer_class(output, fsync_every=0)
+    for i, url in enumerate(URLS):
+        ledger.add_pending(url)
+        offset = writer.bytes_written
+        writer.write(_record(url))
+        ledger.record_done(url, 200, offset, writer.bytes_written)
+        if i == 1:
+            ledger.commit()
+    writer._flush()
+    # Simulate the crash: the uncommitted ledger rows are lost, the output keeps every byte
+    ledger._conn.close()
+    return output
+
+def _resume(tmp_path, output, writer_class):
+    ledger = JobLedger(tmp_path / "ledger.sqlite")
+    done = ledger.done_urls()
+    writer = writer_class(output, fsync_every=0)
+    writer.append_from(ledger.committed_output_end(), len(done))
+    with writer:
+        for url in URLS:
+            if url in done:
+                continue
+            ledger.add_pending(url)
+            offset = writer.bytes_written
+            writer.write(_record(url))
+            ledger.record_done(url, 200, offset, writer.bytes_written)
+    counts = ledger.counts()
+    ledger.close()
+    return done, counts
+
+def test_resume_skips_committed_urls_and_drops_uncommitted_output(tmp_path):
+    output = _interrupted_run(tmp_path, JsonLinesWriter)
+    done, counts = _resume(tmp_path, output, JsonLinesWriter)
+
+    assert done == set(URLS[:2])
+    assert counts == {"done": len(URLS)}
+    lines = output.read_bytes().splitlines()
+    assert [json.loads(line) for line in lines] == [_record(url) for url in URLS]
+
+def test_resumed_json_array_stays_valid(tmp_path):
+    output = _interrupted_run(tmp_path, JsonArrayWriter)
+    _resume(tmp_path, output, JsonArrayWriter)
+
+    expected = [_record(url) for url in URLS]
+    assert output.read_text(encoding="utf-8") == json.dumps(expected, indent=2, ensure_ascii=False)
+
+def test_resume_with_nothing_left_restores_the_footer(tmp_path):
+    output = tmp_path / "out.json"
+    ledger = JobLedger(tmp_path / "ledger.sqlite")
+    with JsonArrayWriter(output, fsync_every=0) as writer:
+        for url in URLS:
+            offset = writer.bytes_written
+            writer.write(_record(url))
+            ledger.record_done(url, 200, offset, writer.bytes_written)
+    ledger.close()
+
+    _resume(tmp_path, output, JsonArrayWriter)
+
+    assert json.loads(output.read_text(encoding="utf-8")) == [_record(url) for url in URLS]
+
+def test_resume_into_compressed_output_is_refused(tmp_path):
+    writer = JsonLinesWriter(tmp_path / "out.jsonl.gz", compression="gzip")
+    with pytest.raises(ValueError):
+        writer.append_from(10, 1)
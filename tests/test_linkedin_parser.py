@@ -0,0 +1,42 @@
+import json
+
+import main
+from extractors.linkedin_parser import MAIN_PAGE, LinkedinCompanyParser
+from utils.html_archive import HtmlArchive
+
+ACME = "https://www.linkedin.com/company/acme/"
+
+def _page(name):
+    return f'<html><head><meta property="og:title" content="{name}"></head><body></body></html>'
+
+def test_page_of_names_every_known_subpage():
+    parser = LinkedinCompanyParser(settings={"parser": {"subpages": ["about"]}})
+
+    assert parser.page_of(ACME) == ("acme", MAIN_PAGE)
+    assert parser.page_of(ACME + "about/") == ("acme", "about")
+    # Not configured, but still a subpage rather than a company page of its own
+    assert parser.page_of(ACME + "posts/") == ("acme", "posts")
+    assert parser.page_of("https://www.linkedin.com/company/about/") == ("about", MAIN_PAGE)
+
+def _replay(tmp_path, settings):
+    (tmp_path / "settings.json").write_text(json.dumps(settings), encoding="utf-8")
+    main.main([
+        "--settings-file", str(tmp_path / "settings.json"),
+        "--replay", str(tmp_path / "archive"),
+        "--output-file", str(tmp_path / "out.jsonl"),
+        "--output-format", "jsonl",
+    ])
+    return [json.loads(line) for line in (tmp_path / "out.jsonl").read_text(encoding="utf-8").splitlines()]
+
+def test_replay_groups_only_configured_subpages(tmp_path):
+    archive = HtmlArchive(tmp_path / "archive")
+    # Subpages are fetched alongside the main page and may be archived first
+    archive.append(ACME + "about/", _page("Acme about"))
+    archive.append(ACME, _page("Acme"))
+    archive.close()
+
+    records = _replay(tmp_path, {})
+    assert [(r["source_url"], r["company_name"]) for r in records] == [(ACME, "Acme")]
+
+    records = _replay(tmp_path, {"parser": {"subpages": ["about"]}})
+    assert [(r["source_url"], r["company_name"]) for r in records] == [(ACME, "Acme")]
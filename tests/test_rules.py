@@ -0,0 +1,31 @@
+from extractors.rules import ExtractionRules, load_rules
+
+def _rules(*label_rules):
+    return ExtractionRules({"definition_list": list(label_rules)})
+
+def test_labels_whose_case_folding_does_not_round_trip_are_skipped():
+    rules = load_rules()
+    # Dotted capital I and long s match under re.IGNORECASE but not after lower()
+    assert rules.match_label("WEBSİTE", {}) is None
+    assert rules.match_label("Headquarterſ", {}) is None
+
+def test_first_listed_rule_wins_over_a_longer_keyword():
+    rules = _rules(
+        {"field": "a", "keywords": ["pany"]},
+        {"field": "b", "keywords": ["company size"]},
+    )
+    assert rules.match_label("Company size", {}).field == "a"
+
+def test_keep_existing_rule_falls_through_to_the_next_match():
+    rules = _rules(
+        {"field": "industry", "keywords": ["industry"], "keep_existing": True},
+        {"field": "type", "keywords": ["type"]},
+    )
+    assert rules.match_label("Industry type", {}).field == "industry"
+    assert rules.match_label("Industry type", {"industry": "x"}).field == "type"
+    assert rules.match_label("Industry", {"industry": "x"}) is None
+
+def test_bundled_rules_match_case_insensitively():
+    rules = load_rules()
+    assert rules.match_label("HEADQUARTERS", {}).field == "headquarters"
+    assert rules.match_label("Company size", {}).field == "company_size"
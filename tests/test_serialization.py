@@ -0,0 +1,93 @@
+import json
+
+import pytest
+
+from utils.output_writer import JsonArrayWriter, JsonLinesWriter
+from utils.serialization import JsonCodec
+
+VALUES = [
+    {
+        "company_name": "Müller & Söhne GmbH",
+        "universal_name_id": "muller-sohne",
+        "follower_count": 12345,
+        "tagline": "Tools — since 1949 \U0001F680",
+        "about": 'Line one\nline "two"\ttabbed \\ back\x00\x1f\x7f   ',
+        "website": None,
+        "locations": [{"address": "Straße 1, Berlin", "map_url": "https://maps.example.com/?q=1&x=<y>"}],
+        "employees": [],
+        "updates": [{}],
+        "verified": True,
+        "archived": False,
+    },
+    [],
+    {},
+    "",
+    "日本語のテキスト",
+    0,
+    -1,
+    2 ** 63 - 1,
+    -(2 ** 63),
+    2 ** 64,
+    10 ** 30,
+    {"b": 1, "a": {"d": [3, 2, 1], "c": None}},
+    [[[]], [{}], [None, True, False]],
+]
+
+def _codecs():
+    params = [pytest.param("json", id="json"), pytest.param("auto", id="auto")]
+    for library in ("orjson", "msgspec"):
+        params.append(pytest.param(library, id=library, marks=pytest.mark.skipif(
+            not _installed(library), reason=f"{library} is not installed")))
+    return params
+
+def _installed(module):
+    try:
+        __import__(module)
+    except ImportError:
+        return False
+    return True
+
+@pytest.fixture(params=_codecs())
+def codec(request):
+    return JsonCodec(request.param)
+
+@pytest.mark.parametrize("value", VALUES)
+def test_pretty_matches_stdlib(codec, value):
+    assert codec.pretty(value) == json.dumps(value, indent=2, ensure_ascii=False).encode("utf-8")
+
+@pytest.mark.parametrize("value", VALUES)
+def test_line_matches_stdlib(codec, value):
+    assert codec.line(value) == json.dumps(value, ensure_ascii=False).encode("utf-8")
+
+@pytest.mark.parametrize("sort_keys", [False, True])
+@pytest.mark.parametrize("value", VALUES)
+def test_compact_matches_stdlib(codec, value, sort_keys):
+    expected = json.dumps(value, sort_keys=sort_keys, ensure_ascii=False, separators=(",", ":"))
+    assert codec.compact(value, sort_keys=sort_keys) == expected.encode("utf-8")
+
+@pytest.mark.parametrize("value", [v for v in VALUES if not isinstance(v, int) or -(2 ** 63) <= v < 2 ** 64])
+def test_loads_round_trips(codec, value):
+    assert codec.loads(codec.compact(value)) == value
+    assert codec.loads(codec.compact(value).decode("utf-8")) == value
+
+def test_output_files_match_stdlib(codec, tmp_path):
+    records = [VALUES[0], {"company_name": "Acme", "employees": [{"employee_name": "Zoë"}]}]
+    with JsonArrayWriter(tmp_path / "out.json", codec=codec) as writer:
+        for record in records:
+            writer.write(record)
+    with JsonLinesWriter(tmp_path / "out.jsonl", codec=codec) as writer:
+        for record in records:
+            writer.write(record)
+
+    assert (tmp_path / "out.json").read_bytes() == json.dumps(records, indent=2, ensure_ascii=False).encode("utf-8")
+    assert (tmp_path / "out.jsonl").read_bytes() == b"".join(
+        json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n" for record in records
+    )
+
+def test_invalid_json_raises_value_error(codec):
+    with pytest.raises(ValueError):
+        codec.loads(b'{"a": ')
+
+def test_unknown_library_is_rejected():
+    with pytest.raises(ValueError):
+        JsonCodec("simdjson")
@@ -0,0 +1,84 @@
+import json
+import sqlite3
+
+import pytest
+
+import main
+from utils.html_archive import HtmlArchive
+from utils.job_ledger import JobLedger
+from utils.records import CompanyRecord
+from utils.sinks import ParquetSink, SqliteSink
+
+ACME = "https://www.linkedin.com/company/acme/"
+GLOBEX = "https://www.linkedin.com/company/globex/"
+
+def _page(name):
+    return f'<html><head><meta property="og:title" content="{name}"></head><body></body></html>'
+
+def _replay_into_sqlite(tmp_path, *extra_args):
+    settings = tmp_path / "settings.json"
+    settings.write_text(json.dumps({"output": {"database": {"batch_size": 2}}}), encoding="utf-8")
+    main.main([
+        "--settings-file", str(settings),
+        "--replay", str(tmp_path / "archive"),
+        "--sink", "sqlite",
+        "--output-file", str(tmp_path / "companies.db"),
+        *extra_args,
+    ])
+    ledger = JobLedger(tmp_path / "companies.db.ledger.sqlite")
+    done = ledger.done_urls()
+    ledger.close()
+    return done
+
+def test_urls_of_a_failed_batch_are_not_left_done(tmp_path):
+    archive = HtmlArchive(tmp_path / "archive")
+    archive.append(ACME, _page("Acme"))
+    archive.append(GLOBEX, _page("Globex"))
+    archive.close()
+    db = tmp_path / "companies.db"
+    SqliteSink(db).close()
+    conn = sqlite3.connect(db)
+    conn.execute(
+        "CREATE TRIGGER reject_globex BEFORE INSERT ON companies "
+        "WHEN NEW.company_name = 'Globex' BEGIN SELECT RAISE(ABORT, 'rejected'); END"
+    )
+    conn.commit()
+
+    # Acme was buffered and recorded done before its batch failed together with Globex
+    assert _replay_into_sqlite(tmp_path) == set()
+
+    conn.execute("DROP TRIGGER reject_globex")
+    conn.commit()
+    assert _replay_into_sqlite(tmp_path, "--resume") == {ACME, GLOBEX}
+    rows = conn.execute("SELECT source_url, company_name FROM companies ORDER BY source_url").fetchall()
+    assert rows == [(ACME, "Acme"), (GLOBEX, "Globex")]
+    conn.close()
+
+def test_ledger_without_a_commit_cadence_commits_only_on_close(tmp_path):
+    checkpoints = []
+    ledger = JobLedger(tmp_path / "ledger.sqlite", commit_every=0, before_commit=lambda: checkpoints.append(1))
+    for i in range(200):
+        ledger.record_done(f"https://www.linkedin.com/company/c{i}/", 200, 0, 0)
+    assert checkpoints == []
+    assert JobLedger(tmp_path / "ledger.sqlite").done_urls() == set()
+
+    ledger.close()
+    assert checkpoints == [1]
+    assert len(JobLedger(tmp_path / "ledger.sqlite").done_urls()) == 200
+
+def test_parquet_checkpoint_writes_buffered_rows(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    sink = ParquetSink(tmp_path / "out.parquet", batch_size=100)
+    assert not sink.durable_checkpoints
+    sink.write(CompanyRecord(source_url=ACME, company_name="Acme"))
+    sink.checkpoint()
+    assert sink.bytes_written > 0
+    sink.write(CompanyRecord(source_url=GLOBEX, company_name="Globex"))
+    sink.close()
+
+    table = pq.read_table(tmp_path / "out.parquet", columns=["source_url", "company_name"])
+    assert table.to_pylist() == [
+        {"source_url": ACME, "company_name": "Acme"},
+        {"source_url": GLOBEX, "company_name": "Globex"},
+    ]
+    assert pq.ParquetFile(tmp_path / "out.parquet").num_row_groups == 2
@@ -0,0 +1,105 @@
+import gzip
+
+import pytest
+
+from utils.url_reader import (
+    BloomFilter,
+    SeenSet,
+    canonicalize_company_url,
+    dedup_key,
+    iter_input_urls,
+    iter_url_batches,
+)
+
+CANONICAL = "https://www.linkedin.com/company/acme/"
+
+@pytest.mark.parametrize("url", [
+    "https://www.linkedin.com/company/acme/",
+    "https://www.linkedin.com/company/acme",
+    "http://linkedin.com/company/acme/",
+    "www.linkedin.com/company/acme",
+    "  https://www.linkedin.com/company/acme/  ",
+    "https://WWW.LINKEDIN.COM/company/acme/",
+    "https://de.linkedin.com/company/acme/",
+    "https://www.linkedin.com/company/acme/?trk=public_profile",
+    "https://www.linkedin.com/company/acme/#about",
+    "https://www.linkedin.com/company/acme/about/",
+    "https://www.linkedin.com/company/acme/people/?viewAsMember=true",
+])
+def test_spellings_of_a_company_share_one_canonical_url(url):
+    assert canonicalize_company_url(url) == CANONICAL
+
+@pytest.mark.parametrize("url", [
+    "",
+    "   ",
+    "not a url",
+    "https://example.com/company/acme/",
+    "https://notlinkedin.com/company/acme/",
+    "https://www.linkedin.com/in/someone/",
+    "https://www.linkedin.com/company/",
+    "https://www.linkedin.com/",
+])
+def test_non_company_urls_are_rejected(url):
+    assert canonicalize_company_url(url) is None
+
+def test_dedup_key_ignores_slug_case():
+    assert dedup_key(canonicalize_company_url("linkedin.com/company/Acme")) == dedup_key(CANONICAL)
+    assert dedup_key(CANONICAL) != dedup_key("https://www.linkedin.com/company/acme-labs/")
+
+@pytest.mark.parametrize("seen", [SeenSet(), BloomFilter(capacity=1000)])
+def test_seen_sets_report_repeated_keys(seen):
+    assert seen.add("acme")
+    assert seen.add("acme-labs")
+    assert not seen.add("acme")
+    assert not seen.add("acme-labs")
+
+def test_seen_set_is_exact_over_many_keys():
+    seen = SeenSet()
+    keys = [f"company-{i}" for i in range(50_000)]
+    assert all(seen.add(key) for key in keys)
+    assert not any(seen.add(key) for key in keys)
+
+def _write_input(path):
+    path.write_text(
+        "# seed list\n"
+        "https://www.linkedin.com/company/acme/\n"
+        "\n"
+        "https://de.linkedin.com/company/ACME/about/\n"
+        "https://www.linkedin.com/company/globex?trk=x\n"
+        "https://example.com/company/acme/\n"
+        "linkedin.com/company/globex/\n",
+        encoding="utf-8",
+    )
+    return path
+
+@pytest.mark.parametrize("dedup", ["exact", "bloom"])
+def test_input_duplicates_are_dropped(tmp_path, dedup):
+    invalid = []
+    urls = list(iter_input_urls(_write_input(tmp_path / "urls.txt"), dedup=dedup, on_invalid=invalid.append))
+
+    assert urls == [CANONICAL, "https://www.linkedin.com/company/globex/"]
+    assert invalid == ["https://example.com/company/acme/"]
+
+def test_dedup_none_keeps_duplicates(tmp_path):
+    urls = list(iter_input_urls(_write_input(tmp_path / "urls.txt"), dedup="none"))
+
+    globex = "https://www.linkedin.com/company/globex/"
+    assert urls == [CANONICAL, "https://www.linkedin.com/company/ACME/", globex, globex]
+
+def test_gzipped_csv_input_uses_the_url_column(tmp_path):
+    source = tmp_path / "urls.csv.gz"
+    with gzip.open(source, "wt", encoding="utf-8", newline="") as f:
+        f.write("name,linkedin_url\nAcme,https://www.linkedin.com/company/acme/\nGlobex,linkedin.com/company/globex\n")
+
+    assert list(iter_input_urls(source)) == [CANONICAL, "https://www.linkedin.com/company/globex/"]
+
+def test_batches_are_deduplicated_independently(tmp_path):
+    stream = tmp_path / "batches.txt"
+    stream.write_text(
+        "linkedin.com/company/acme\nhttps://www.linkedin.com/company/acme/about/\n\n"
+        "\n"
+        "https://www.linkedin.com/company/acme/\n",
+        encoding="utf-8",
+    )
+    with stream.open(encoding="utf-8") as f:
+        assert list(iter_url_batches(f)) == [[CANONICAL], [], [CANONICAL]]
@@ -0,0 +1,89 @@
+from types import SimpleNamespace
+
+import pytest
+
+from utils import work_queue
+from utils.work_queue import LeasedUrls, SqliteWorkQueue
+
+URLS = [f"https://www.linkedin.com/company/c{i}/" for i in range(3)]
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+
+    def time(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(work_queue, "time", SimpleNamespace(time=clock.time, sleep=lambda _: None))
+    return clock
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    queue = SqliteWorkQueue(tmp_path / "queue.sqlite", visibility_timeout=60, max_attempts=2)
+    queue.enqueue(URLS)
+    yield queue
+    queue.close()
+
+def test_enqueue_ignores_known_urls(queue):
+    assert queue.enqueue(URLS[:1] + ["https://www.linkedin.com/company/new/"]) == 1
+    assert queue.counts() == {"pending": 4}
+
+def test_expired_lease_is_handed_to_another_worker(queue, clock):
+    assert queue.lease("a", 2) == URLS[:2]
+    clock.now += 30
+    assert queue.lease("b", 5) == URLS[2:]
+
+    clock.now += 31
+    assert queue.lease("b", 5) == URLS[:2]
+    # The first worker lost its lease, so its late acknowledgement is ignored
+    queue.complete("a", URLS[:2])
+    assert queue.counts() == {"leased": 3}
+    queue.complete("b", URLS)
+    assert queue.counts() == {"done": 3}
+
+def test_extended_lease_is_not_handed_out(queue, clock):
+    queue.lease("a", 1)
+    clock.now += 50
+    queue.extend("a", URLS[:1])
+    clock.now += 50
+    assert URLS[0] not in queue.lease("b", 5)
+
+def test_url_expiring_max_attempts_times_is_parked_as_dead(queue, clock):
+    queue.lease("a", 5)
+    clock.now += 61
+    assert queue.lease("b", 5) == URLS
+    clock.now += 61
+
+    assert queue.lease("c", 5) == []
+    assert queue.counts() == {"dead": 3}
+
+def test_failed_url_is_retried_until_max_attempts(queue):
+    queue.lease("a", 1)
+    queue.fail("a", URLS[0], "HTTP 500")
+    assert queue.counts()["pending"] == 3
+
+    assert queue.lease("b", 1) == URLS[1:2]
+    assert queue.lease("b", 1) == URLS[2:]
+    assert queue.lease("b", 1) == URLS[:1]
+    queue.fail("b", URLS[0], "HTTP 500")
+    assert queue.counts() == {"dead": 1, "leased": 2}
+
+def test_leased_urls_acknowledge_only_on_flush(queue):
+    leased = LeasedUrls(queue, owner="a", lease_size=2)
+    urls = list(leased)
+    assert urls == URLS
+
+    leased.done(URLS[0])
+    leased.failed(URLS[1], "no data extracted")
+    assert queue.counts() == {"leased": 2, "pending": 1}
+    leased.flush()
+    assert queue.counts() == {"done": 1, "leased": 1, "pending": 1}
+
+    leased.done(URLS[2])
+    leased.rollback()
+    leased.flush()
+    assert queue.counts() == {"done": 1, "leased": 1, "pending": 1}
+    leased.close()